@@ -0,0 +1,64 @@
+# app/api/conditional.py
+import hashlib
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.compression import strip_encoding
+from app.services import catalog_cache
+
+
+def catalog_etag(db: Session, kind: str, params: Dict[str, Any]) -> str:
+    """Сильный ETag чтения каталога: общие версии разделов + нормализованные параметры.
+
+    Версии лежат в БД (catalog_versions) и поднимаются каждой записью в
+    каталог, поэтому ETag одинаков во всех воркерах и считается без
+    выборки самих данных.
+    """
+    key = repr((kind, catalog_cache.shared_versions(db, kind), catalog_cache.normalize_params(params)))
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:20]}"'
+
+
+def _matches(if_none_match: str, etag: str) -> Optional[str]:
+    """Тег из If-None-Match, совпавший с `etag`, или None.
+
+    Сравнение "слабое": W/-префикс не учитывается, а тег сжатого варианта
+    ("...-gzip", см. CompressionMiddleware) совпадает с тегом тела.
+    """
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in (tag.strip() for tag in if_none_match.split(",")):
+        if strip_encoding(tag.removeprefix("W/")) == etag:
+            return tag
+    return None
+
+
+class ConditionalGet:
+    """Условные GET для роутера: ETag, Cache-Control и 304 до выполнения запроса.
+
+    Вызывается в начале обработчика; если у клиента актуальная версия, бросает
+    304 — ни кэш, ни выборка данных не трогаются (только версии разделов).
+    """
+
+    def __init__(self, cache_control: str) -> None:
+        self.cache_control = cache_control
+
+    def __call__(
+        self,
+        request: Request,
+        response: Response,
+        db: Session,
+        kind: str,
+        params: Dict[str, Any],
+    ) -> None:
+        etag = catalog_etag(db, kind, params)
+        if_none_match = request.headers.get("if-none-match")
+        matched = _matches(if_none_match, etag) if if_none_match else None
+        if matched is not None:
+            # 304 несёт тег того варианта (сжатого или нет), что у клиента
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": matched, "Cache-Control": self.cache_control},
+            )
+        response.headers.update({"ETag": etag, "Cache-Control": self.cache_control})
@@ -1,13 +1,19 @@
 # app/api/deps.py
-from fastapi import Depends, HTTPException, status
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.repositories import UserRepository
-from app.services import auth_service
+from app.schemas.book import BOOK_CARD_FIELDS, BOOK_FIELDS
+from app.schemas.user import UserRead
+from app.services import auth_service, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# для маршрутов, где токен не обязателен: без заголовка даёт None вместо 401
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
 def get_db_session() -> Session:
@@ -23,7 +29,11 @@ def get_db_session() -> Session:
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db_session),
-):
+) -> UserRead:
+    """Пользователь из токена (через principal_cache, без привязки к сессии).
+
+    Чтобы изменить пользователя, маршрут загружает его из БД по user_id.
+    """
     token_data = auth_service.decode_access_token(token)
     if token_data is None or token_data.email is None:
         raise HTTPException(
@@ -31,8 +41,7 @@ def get_current_user(
             detail="Could not validate credentials",
         )
 
-    repo = UserRepository(db)
-    user = repo.get_by_email(token_data.email)
+    user = principal_cache.get_principal(db, token_data.email)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,11 +52,69 @@ def get_current_user(
 
 
 def get_current_admin(
-    current_user=Depends(get_current_user),
-):
+    current_user: UserRead = Depends(get_current_user),
+) -> UserRead:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     return current_user
+
+
+def book_filter_params(
+    q: Optional[str] = Query(
+        None,
+        description="Полнотекстовый поиск по названию, описанию и авторам",
+    ),
+    genre_id: Optional[int] = Query(None),
+    author_id: Optional[int] = Query(None),
+    publisher_id: Optional[int] = Query(None),
+    min_price: Optional[Decimal] = Query(None),
+    max_price: Optional[Decimal] = Query(None),
+    min_year: Optional[int] = Query(None),
+    max_year: Optional[int] = Query(None),
+    fuzzy: bool = Query(
+        False,
+        description="Поиск с опечатками по названию и авторам, по убыванию похожести",
+    ),
+) -> dict:
+    """Фильтры каталога — общие для списка книг, фасетов и выгрузок."""
+    return {
+        "q": q,
+        "genre_id": genre_id,
+        "author_id": author_id,
+        "publisher_id": publisher_id,
+        "min_price": float(min_price) if min_price is not None else None,
+        "max_price": float(max_price) if max_price is not None else None,
+        "min_year": min_year,
+        "max_year": max_year,
+        "fuzzy": fuzzy,
+    }
+
+
+def book_fields_params(
+    fields: Optional[str] = Query(
+        None,
+        description="Поля книги через запятую, например: book_id,title,price",
+    ),
+    view: Optional[str] = Query(
+        None,
+        pattern="^(full|card)$",
+        description="card — компактная карточка: id, название, цена, обложка, авторы",
+    ),
+) -> Optional[Tuple[str, ...]]:
+    """Набор полей книги в ответе; None — полный BookRead."""
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(BOOK_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown book fields: {', '.join(sorted(unknown))}",
+            )
+        # порядок полей — как в BookRead, чтобы одинаковые наборы давали один ключ кэша
+        return tuple(name for name in BOOK_FIELDS if name in requested)
+    if view == "card":
+        return BOOK_CARD_FIELDS
+    return None
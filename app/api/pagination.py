@@ -0,0 +1,51 @@
+# app/api/pagination.py
+"""Метаданные страниц для списочных ручек.
+
+Тело ответа остаётся простым списком (так его ждёт фронтенд), а курсор
+следующей страницы, признак продолжения и общее число строк отдаются
+в заголовках X-Next-Cursor, X-Has-More и X-Total-Count.
+"""
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+
+DICT_PAGE_SIZE = 100
+DICT_PAGE_MAX = 1000
+
+
+def dict_page_params(
+    q: Optional[str] = Query(None, description="Поиск по началу названия без учёта регистра"),
+    limit: int = Query(DICT_PAGE_SIZE, ge=1, le=DICT_PAGE_MAX),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор следующей страницы из заголовка X-Next-Cursor",
+    ),
+) -> dict:
+    """Параметры страницы справочника (жанры, авторы, издательства)."""
+    return {"q": q, "limit": limit, "cursor": cursor}
+
+
+def set_page_headers(
+    response: Response,
+    next_cursor: Optional[str],
+    total: Optional[int] = None,
+) -> None:
+    response.headers["X-Has-More"] = "true" if next_cursor else "false"
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def dict_page(
+    response: Response,
+    list_page: Callable[..., Tuple[List[Any], int, Optional[str]]],
+    **params: Any,
+) -> List[Any]:
+    """Вызывает сервисную выборку страницы и раскладывает метаданные по заголовкам."""
+    try:
+        items, total, next_cursor = list_page(**params)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    set_page_headers(response, next_cursor, total)
+    return items
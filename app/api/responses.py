@@ -0,0 +1,34 @@
+# app/api/responses.py
+"""JSON-ответ на orjson (если установлен) с запасным путём через json.
+
+Ручки с response_model FastAPI и так сериализует в байты через pydantic-core,
+минуя JSONResponse, — это не медленнее orjson. Класс нужен для ответов без
+response_model (словари, ошибки) и включается для всего приложения
+настройкой JSON_RESPONSE=orjson: тогда FastAPI отдаёт ему уже приведённые
+к JSON-типам данные.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, books, cart, orders, admin, dicts, users
+from app.api.routes import auth, books, cart, orders, admin, dicts, search, users
 
 api_router = APIRouter()
 
@@ -10,4 +10,5 @@ api_router.include_router(cart.router)
 api_router.include_router(orders.router)
 api_router.include_router(admin.router)
 api_router.include_router(dicts.router)
+api_router.include_router(search.router)
 api_router.include_router(users.router)
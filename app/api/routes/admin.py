@@ -1,20 +1,37 @@
 # app/api/routes/admin.py
 import base64
 import binascii
+import io
 import os
 import uuid
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db_session, get_current_admin
+from app.api.deps import book_filter_params, get_db_session, get_current_admin
+from app.api.pagination import dict_page, dict_page_params
 from app.schemas.genre import GenreCreate, GenreUpdate, GenreRead
 from app.schemas.author import AuthorCreate, AuthorUpdate, AuthorRead
 from app.schemas.publisher import PublisherCreate, PublisherUpdate, PublisherRead
-from app.schemas.admin import UserAdminRead, UserAdminUpdate, OrderStatusUpdate
+from app.schemas.admin import (
+    CacheStats,
+    ImportReport,
+    OrderStatusUpdate,
+    UserAdminRead,
+    UserAdminUpdate,
+)
 from app.schemas.order import OrderRead
-from app.services import admin_service
+from app.schemas.search import SuggestStats
+from app.services import (
+    admin_service,
+    catalog_cache,
+    catalog_service,
+    export_service,
+    import_service,
+    suggest_service,
+)
 
 from app.schemas.book import BookRead, BookCoverUpload
 from app.repositories import BookRepository
@@ -29,10 +46,12 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/genres", response_model=List[GenreRead])
 def admin_list_genres(
+        response: Response,
+        page: dict = Depends(dict_page_params),
         db: Session = Depends(get_db_session),
         admin=Depends(get_current_admin),
 ):
-    return admin_service.list_genres(db)
+    return dict_page(response, admin_service.list_genres, db=db, **page)
 
 
 @router.post("/genres", response_model=GenreRead, status_code=status.HTTP_201_CREATED)
@@ -74,10 +93,12 @@ def admin_delete_genre(
 
 @router.get("/authors", response_model=List[AuthorRead])
 def admin_list_authors(
+        response: Response,
+        page: dict = Depends(dict_page_params),
         db: Session = Depends(get_db_session),
         admin=Depends(get_current_admin),
 ):
-    return admin_service.list_authors(db)
+    return dict_page(response, admin_service.list_authors, db=db, **page)
 
 
 @router.post("/authors", response_model=AuthorRead, status_code=status.HTTP_201_CREATED)
@@ -86,7 +107,10 @@ def admin_create_author(
         db: Session = Depends(get_db_session),
         admin=Depends(get_current_admin),
 ):
-    return admin_service.create_author(db, author_in)
+    try:
+        return admin_service.create_author(db, author_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/authors/{author_id}", response_model=AuthorRead)
@@ -96,7 +120,10 @@ def admin_update_author(
         db: Session = Depends(get_db_session),
         admin=Depends(get_current_admin),
 ):
-    author = admin_service.update_author(db, author_id, author_in)
+    try:
+        author = admin_service.update_author(db, author_id, author_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
     return author
@@ -119,10 +146,12 @@ def admin_delete_author(
 
 @router.get("/publishers", response_model=List[PublisherRead])
 def admin_list_publishers(
+        response: Response,
+        page: dict = Depends(dict_page_params),
         db: Session = Depends(get_db_session),
         admin=Depends(get_current_admin),
 ):
-    return admin_service.list_publishers(db)
+    return dict_page(response, admin_service.list_publishers, db=db, **page)
 
 
 @router.post(
@@ -262,9 +291,69 @@ async def admin_upload_book_cover(
         f.write(file_bytes)
 
     # сохраняем путь в книгу
-    book.cover_image = f"/static/covers/{filename}"
-    db.add(book)
-    db.commit()
-    db.refresh(book)
+    return catalog_service.set_book_cover(db, book, f"/static/covers/{filename}")
+
+
+@router.post("/books/import", response_model=ImportReport)
+def admin_import_books(
+        file: UploadFile = File(...),
+        format: Optional[str] = Query(None, description="csv или jsonl; по умолчанию — по расширению файла"),
+        chunk_size: int = Query(1000, ge=1, le=10000),
+        db: Session = Depends(get_db_session),
+        admin=Depends(get_current_admin),
+):
+    fmt = format or import_service.detect_format(file.filename)
+    if fmt not in import_service.FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Неизвестный формат файла: ожидается csv или jsonl",
+        )
+
+    # файл читается построчно, целиком в память не поднимается
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    rows = import_service.iter_rows(lines, fmt)
+    return import_service.import_books(db, rows, chunk_size=chunk_size)
+
+
+@router.get("/books/export")
+def admin_export_books(
+        format: str = Query("ndjson", description="ndjson или csv"),
+        filters: dict = Depends(book_filter_params),
+        admin=Depends(get_current_admin),
+):
+    if format not in export_service.FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Неизвестный формат выгрузки: ожидается ndjson или csv",
+        )
+    return StreamingResponse(
+        export_service.export_books(format, filters),
+        media_type=export_service.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="books.{format}"'},
+    )
+
+
+# --- КЭШИ И ИНДЕКСЫ В ПАМЯТИ ---
 
-    return book
+
+@router.get("/cache", response_model=CacheStats)
+def admin_cache_stats(
+        admin=Depends(get_current_admin),
+):
+    return catalog_cache.stats()
+
+
+@router.get("/suggest", response_model=SuggestStats)
+def admin_suggest_stats(
+        admin=Depends(get_current_admin),
+):
+    return suggest_service.stats()
+
+
+@router.post("/suggest/rebuild", response_model=SuggestStats)
+def admin_rebuild_suggest(
+        db: Session = Depends(get_db_session),
+        admin=Depends(get_current_admin),
+):
+    suggest_service.rebuild(db)
+    return suggest_service.stats()
@@ -1,13 +1,12 @@
 # app/api/routes/auth.py
-from datetime import timedelta
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db_session, get_current_user
-from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.api.deps import get_db_session, get_current_user, optional_oauth2_scheme
 from app.schemas.user import UserCreate, UserRead
-from app.schemas.auth import Token, LoginRequest
+from app.schemas.auth import Token, LoginRequest, RefreshRequest
 from app.services import auth_service
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -50,12 +49,47 @@ def login(
             detail="Incorrect email or password",
         )
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth_service.create_access_token(
-        data={"sub": user.email},
-        expires_delta=access_token_expires,
-    )
-    return Token(access_token=access_token)
+    return auth_service.create_session(db, user)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(
+    payload: RefreshRequest,
+    db: Session = Depends(get_db_session),
+):
+    token = auth_service.refresh_session(db, payload.refresh_token)
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    return token
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    payload: Optional[RefreshRequest] = None,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db_session),
+):
+    """Закрывает сессию по refresh-токену из тела.
+
+    Access-токен не обязателен: к моменту выхода он мог истечь. Без тела
+    сессия берётся из access-токена.
+    """
+    if payload is not None:
+        auth_service.revoke_refresh_token(db, payload.refresh_token)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    token_data = auth_service.decode_access_token(token) if token else None
+    if token_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    if token_data.sid is not None:
+        auth_service.revoke_session(db, token_data.sid)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/me", response_model=UserRead)
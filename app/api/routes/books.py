@@ -1,62 +1,138 @@
 # app/api/routes/books.py
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from decimal import Decimal
-from app.api.deps import get_db_session, get_current_admin
-from app.schemas.book import BookCreate, BookRead, BookUpdate
+
+from app.api.conditional import ConditionalGet
+from app.api.deps import (
+    book_fields_params,
+    book_filter_params,
+    get_current_admin,
+    get_db_session,
+)
+from app.api.pagination import set_page_headers
+from app.config import BOOKS_CACHE_CONTROL
+from app.schemas.book import (
+    BookBatch,
+    BookBatchRequest,
+    BookCreate,
+    BookFacets,
+    BookRead,
+    BookUpdate,
+)
 from app.services import catalog_service
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+conditional_get = ConditionalGet(cache_control=BOOKS_CACHE_CONTROL)
+
+BATCH_MAX_IDS = 500
+
 
 @router.get("/", response_model=List[BookRead])
 def list_books(
-    q: Optional[str] = Query(None, description="Поиск по названию"),
-    genre_id: Optional[int] = Query(None),
-    author_id: Optional[int] = Query(None),
-    publisher_id: Optional[int] = Query(None),
-    min_price: Optional[Decimal] = Query(None),
-    max_price: Optional[Decimal] = Query(None),
-    min_year: Optional[int] = Query(None),
-    max_year: Optional[int] = Query(None),
+    request: Request,
+    response: Response,
+    filters: dict = Depends(book_filter_params),
     order_by: Optional[str] = Query(
         None,
         description=(
             "Сортировка: price_asc, price_desc, "
-            "year_asc, year_desc, title_asc, title_desc"
+            "year_asc, year_desc, title_asc, title_desc; "
+            "при поиске по умолчанию — по релевантности"
         ),
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор следующей страницы из заголовка X-Next-Cursor",
+    ),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[Tuple[str, ...]] = Depends(book_fields_params),
+    db: Session = Depends(get_db_session),
+):
+    params = {
+        **filters,
+        "skip": skip,
+        "limit": limit,
+        "order_by": order_by,
+        "cursor": cursor,
+    }
+    conditional_get(request, response, db, "books", {**params, "fields": fields})
+    try:
+        if fields:
+            body, next_cursor = catalog_service.list_books_page_fields(db, fields, **params)
+        else:
+            body, next_cursor = catalog_service.list_books_page_json(db=db, **params)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    # тело ответа остаётся списком книг, метаданные страницы — в заголовках;
+    # тело уже собрано из готовых JSON-фрагментов, response_model — для схемы
+    set_page_headers(response, next_cursor)
+    return Response(content=body, media_type="application/json", headers=response.headers)
+
+
+@router.get("/facets", response_model=BookFacets)
+def get_facets(
+    request: Request,
+    response: Response,
+    filters: dict = Depends(book_filter_params),
     db: Session = Depends(get_db_session),
 ):
-    books = catalog_service.list_books(
-        db=db,
-        skip=skip,
-        limit=limit,
-        q=q,
-        genre_id=genre_id,
-        author_id=author_id,
-        publisher_id=publisher_id,
-        min_price=float(min_price) if min_price is not None else None,
-        max_price=float(max_price) if max_price is not None else None,
-        min_year=min_year,
-        max_year=max_year,
-        order_by=order_by,
-    )
-    return books
+    conditional_get(request, response, db, "facets", filters)
+    return catalog_service.get_facets(db, **filters)
+
+
+def _read_batch(db: Session, ids: List[int]) -> BookBatch:
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids: at most {BATCH_MAX_IDS} per request",
+        )
+    items, missing = catalog_service.read_books(db, ids)
+    return BookBatch(items=items, missing=missing)
+
+
+@router.get("/batch", response_model=BookBatch)
+def get_books_batch(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="id книг через запятую: 1,2,3"),
+    db: Session = Depends(get_db_session),
+):
+    try:
+        book_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers",
+        )
+    conditional_get(request, response, db, "book", {"ids": tuple(book_ids)})
+    return _read_batch(db, book_ids)
+
+
+@router.post("/batch", response_model=BookBatch)
+def post_books_batch(
+    payload: BookBatchRequest,
+    db: Session = Depends(get_db_session),
+):
+    return _read_batch(db, payload.ids)
 
 
 @router.get("/{book_id}", response_model=BookRead)
 def get_book(
     book_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db_session),
 ):
-    book = catalog_service.get_book(db, book_id)
+    conditional_get(request, response, db, "book", {"book_id": book_id})
+    book = catalog_service.read_book(db, book_id)
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,10 +1,13 @@
 # app/api/routes/dicts.py
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
+from app.api.conditional import ConditionalGet
 from app.api.deps import get_db_session
+from app.api.pagination import dict_page, dict_page_params
+from app.config import DICTS_CACHE_CONTROL
 from app.schemas.genre import GenreRead
 from app.schemas.author import AuthorRead
 from app.schemas.publisher import PublisherRead
@@ -12,17 +15,37 @@ from app.services import admin_service
 
 router = APIRouter(prefix="/dicts", tags=["dicts"])
 
+conditional_get = ConditionalGet(cache_control=DICTS_CACHE_CONTROL)
+
 
 @router.get("/genres", response_model=List[GenreRead])
-def list_genres(db: Session = Depends(get_db_session)):
-    return admin_service.list_genres(db)
+def list_genres(
+    request: Request,
+    response: Response,
+    page: dict = Depends(dict_page_params),
+    db: Session = Depends(get_db_session),
+):
+    conditional_get(request, response, db, "genres", page)
+    return dict_page(response, admin_service.list_genres, db=db, **page)
 
 
 @router.get("/authors", response_model=List[AuthorRead])
-def list_authors(db: Session = Depends(get_db_session)):
-    return admin_service.list_authors(db)
+def list_authors(
+    request: Request,
+    response: Response,
+    page: dict = Depends(dict_page_params),
+    db: Session = Depends(get_db_session),
+):
+    conditional_get(request, response, db, "authors", page)
+    return dict_page(response, admin_service.list_authors, db=db, **page)
 
 
 @router.get("/publishers", response_model=List[PublisherRead])
-def list_publishers(db: Session = Depends(get_db_session)):
-    return admin_service.list_publishers(db)
+def list_publishers(
+    request: Request,
+    response: Response,
+    page: dict = Depends(dict_page_params),
+    db: Session = Depends(get_db_session),
+):
+    conditional_get(request, response, db, "publishers", page)
+    return dict_page(response, admin_service.list_publishers, db=db, **page)
@@ -0,0 +1,18 @@
+# app/api/routes/search.py
+from typing import List
+
+from fastapi import APIRouter, Query
+
+from app.schemas.search import Suggestion
+from app.services import suggest_service
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest(
+    q: str = Query("", description="Начало названия книги, имени автора или жанра"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    # только память процесса, без БД и без сессии
+    return suggest_service.suggest(q, limit)
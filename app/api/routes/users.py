@@ -7,7 +7,7 @@ from app.api.deps import get_current_user, get_db_session
 from app.repositories import AddressRepository, UserRepository
 from app.schemas.address import AddressCreate, AddressRead, AddressUpdate
 from app.schemas.user import PasswordUpdate, UserProfile, UserUpdate
-from app.services import auth_service
+from app.services import auth_service, principal_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -59,14 +59,16 @@ def update_profile(
             detail="Пользователь с таким email уже существует",
         )
 
+    user = repo.get_by_id(current_user.user_id)
     updated = repo.update(
-        current_user,
+        user,
         {
             "email": payload.email,
             "full_name": payload.full_name,
             "phone": payload.phone,
         },
     )
+    principal_cache.invalidate(current_user.email, updated.email)
 
     addresses = AddressRepository(db).list_by_user(updated.user_id)
     return _serialize_profile(updated, addresses)
@@ -78,7 +80,8 @@ def change_password(
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db_session),
 ):
-    if not auth_service.verify_password(payload.current_password, current_user.password_hash):
+    user = UserRepository(db).get_by_id(current_user.user_id)
+    if not auth_service.verify_password(payload.current_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Неверный текущий пароль",
@@ -86,9 +89,10 @@ def change_password(
 
     _validate_password_complexity(payload.new_password)
 
-    current_user.password_hash = auth_service.get_password_hash(payload.new_password)
-    db.add(current_user)
+    user.password_hash = auth_service.get_password_hash(payload.new_password)
+    db.add(user)
     db.commit()
+    principal_cache.invalidate(user.email)
 
     return {"detail": "Пароль обновлён"}
 
@@ -0,0 +1,109 @@
+# app/assets.py
+"""Статика с отпечатком содержимого в имени: /assets/js/app.3f2a1b9c0d.js.
+
+При старте файлы фронтенда из app/static (BUNDLED) копируются в ASSETS_DIR под именами с хэшем
+содержимого (рядом — готовые .gz/.br), а манифест "исходный путь -> имя
+с хэшем" остаётся в памяти. Раз имя меняется вместе с содержимым, такие
+файлы отдаются с Cache-Control: immutable на год и браузер их больше не
+перепроверяет. Шаблоны берут адреса через asset_url("js/app.js"); для
+файлов вне манифеста остаётся обычный /static/...
+"""
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, Iterator
+
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.compression import PRECOMPRESS_EXTENSIONS, PrecompressedStaticFiles, precompress_file
+
+MANIFEST_FILE = "manifest.json"
+HASH_LENGTH = 10
+# что входит в манифест: файлы фронтенда, но не загрузки админки (covers/)
+BUNDLED = ("css", "js", "favicon.ico.png")
+
+_manifest: Dict[str, str] = {}
+
+
+def fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def _bundled_files(source_dir: str) -> Iterator[str]:
+    for entry in BUNDLED:
+        path = os.path.join(source_dir, entry)
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in files:
+                if not name.endswith((".gz", ".br", ".tmp")):
+                    yield os.path.join(root, name)
+
+
+def build(source_dir: str, target_dir: str) -> Dict[str, str]:
+    """Копирует статику под имена с отпечатком и возвращает манифест.
+
+    Имена зависят только от содержимого, так что воркеры, собирающие
+    одновременно, пишут одни и те же файлы; запись атомарна (tmp + replace).
+    Прежние версии не удаляются: их ещё могут запросить по старому HTML.
+    """
+    manifest: Dict[str, str] = {}
+    for source in _bundled_files(source_dir):
+        relative = os.path.relpath(source, source_dir).replace(os.sep, "/")
+        stem, ext = os.path.splitext(relative)
+        hashed = f"{stem}.{fingerprint(source)}{ext}"
+        target = os.path.join(target_dir, *hashed.split("/"))
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target + ".tmp")
+            os.replace(target + ".tmp", target)
+        # картинки и так сжаты
+        if target.endswith(PRECOMPRESS_EXTENSIONS):
+            precompress_file(target)
+        manifest[relative] = hashed
+
+    manifest_tmp = os.path.join(target_dir, f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_tmp, os.path.join(target_dir, MANIFEST_FILE))
+    return manifest
+
+
+def load(source_dir: str, target_dir: str) -> None:
+    """Собирает статику при старте; если каталог недоступен на запись —
+    шаблоны продолжают ссылаться на /static."""
+    global _manifest
+    try:
+        os.makedirs(target_dir, exist_ok=True)
+        _manifest = build(source_dir, target_dir)
+    except OSError:
+        _manifest = {}
+
+
+def asset_url(path: str) -> str:
+    """Адрес статики для шаблонов: с отпечатком, если файл есть в манифесте."""
+    hashed = _manifest.get(path)
+    if hashed is None:
+        return f"/static/{path}"
+    return f"/assets/{hashed}"
+
+
+class ImmutableStaticFiles(PrecompressedStaticFiles):
+    """Файлы с отпечатком в имени: кэшируются браузером без перепроверки."""
+
+    def __init__(self, *args, cache_control: str, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = self.cache_control
+        return response
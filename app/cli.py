@@ -0,0 +1,84 @@
+# app/cli.py
+"""Консольные команды.
+
+    python -m app.cli import-books feed.csv
+    python -m app.cli import-books feed.jsonl --chunk-size 5000
+    python -m app.cli catalog-snapshot
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.repositories.book_search import ensure_search_index
+from app.repositories.schema import ensure_schema
+from app.services import columnar_catalog, import_service
+
+
+def import_books(args: argparse.Namespace) -> int:
+    fmt = args.format or import_service.detect_format(args.path)
+    if fmt not in import_service.FORMATS:
+        print("Unknown file format, use --format csv|jsonl", file=sys.stderr)
+        return 2
+
+    Base.metadata.create_all(bind=engine)
+    ensure_schema(engine)
+    ensure_search_index(engine)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", errors="replace", newline="") as f:
+            report = import_service.import_books(
+                db,
+                import_service.iter_rows(f, fmt),
+                chunk_size=args.chunk_size,
+            )
+        # воркеры подхватят новый общий снимок по файлу версии
+        columnar_catalog.publish(db)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    report["seconds"] = round(elapsed, 2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if report["failed"] else 0
+
+
+def catalog_snapshot(args: argparse.Namespace) -> int:
+    if columnar_catalog.CATALOG_ENGINE != "mmap" or not columnar_catalog.available():
+        print("Shared snapshot needs CATALOG_ENGINE=mmap and NumPy", file=sys.stderr)
+        return 2
+    db = SessionLocal()
+    try:
+        columnar_catalog.publish(db)
+    finally:
+        db.close()
+    print(json.dumps(columnar_catalog.catalog.stats()))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import-books", help="импорт книг из CSV/JSONL")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=import_service.FORMATS)
+    import_parser.add_argument("--chunk-size", type=int, default=1000)
+    import_parser.set_defaults(handler=import_books)
+
+    snapshot_parser = commands.add_parser(
+        "catalog-snapshot",
+        help="пересобрать общий снимок каталога (после правок БД в обход приложения)",
+    )
+    snapshot_parser.set_defaults(handler=catalog_snapshot)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# app/compression.py
+"""Сжатие ответов: middleware для динамических ответов и статика с готовыми .gz/.br.
+
+Brotli используется, если установлен пакет brotli (в обязательные
+зависимости не входит); иначе — только gzip из стандартной библиотеки.
+"""
+import gzip
+import os
+import zlib
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+# расширения статики, для которых заранее готовятся сжатые копии
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".svg", ".html", ".json", ".txt")
+
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag сжатого варианта: у байтов другого представления и тег другой."""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_encoding(etag: str) -> str:
+    """Обратное к encoded_etag: тег несжатого ответа."""
+    for encoding in _SUFFIXES:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Лучшая из поддерживаемых кодировок по Accept-Encoding (q=0 — запрет)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in available_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        if encoding == "br":
+            obj = brotli.Compressor(quality=brotli_quality)
+            self.compress, self.finish = obj.process, obj.finish
+        else:
+            # wbits=31 — формат gzip (заголовок и CRC), а не "голый" zlib
+            obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self.compress, self.finish = obj.compress, obj.flush
+
+
+class CompressionMiddleware:
+    """Сжимает ответы gzip/brotli по Accept-Encoding клиента.
+
+    Сжимаются только типы из `content_types` и тела не меньше `minimum_size`
+    (для потоковых ответов размер не известен — они сжимаются всегда).
+    Уже закодированные ответы (Content-Encoding задан) не трогаются.
+    ETag сжатого ответа получает суффикс кодировки ("...-gzip"), чтобы не
+    совпадать с тегом несжатых байтов.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = 1024,
+            content_types: Iterable[str] = ("application/json",),
+            gzip_level: int = 6,
+            brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSend(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+    def compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type in self.content_types
+
+
+class _CompressingSend:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if message["status"] not in (204, 304) and self.middleware.compressible(headers):
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                # решение откладываем до первого куска тела: нужен его размер
+                self.start = message
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+            if more_body:
+                del headers["Content-Length"]
+                await self.send(start)
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+def precompress_file(path: str, gzip_level: int = 9, brotli_quality: int = 11) -> None:
+    """Кладёт рядом с файлом .gz (и .br, если есть brotli), если их нет или они старше."""
+    mtime = os.stat(path).st_mtime
+    data = None
+    for encoding in available_encodings():
+        target = path + _SUFFIXES[encoding]
+        if os.path.exists(target) and os.stat(target).st_mtime >= mtime:
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        if encoding == "br":
+            packed = brotli.compress(data, quality=brotli_quality)
+        else:
+            # mtime=0: одинаковый файл даёт одинаковые байты
+            packed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+        with open(target + ".tmp", "wb") as f:
+            f.write(packed)
+        os.replace(target + ".tmp", target)
+
+
+def precompress_directory(directory: str) -> None:
+    """Сжатые копии для всей текстовой статики каталога (при старте приложения)."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(PRECOMPRESS_EXTENSIONS):
+                try:
+                    precompress_file(os.path.join(root, name))
+                except OSError:
+                    # каталог только для чтения — статика уйдёт без готовых копий
+                    continue
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles, который отдаёт готовые .br/.gz рядом с файлом, если клиент их принимает."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        variant = None
+        if encoding is not None:
+            variant, stat_result = self.lookup_path(path + _SUFFIXES[encoding])
+        if not variant:
+            response.headers.add_vary_header("Accept-Encoding")
+            return response
+
+        compressed = FileResponse(
+            variant,
+            stat_result=stat_result,
+            media_type=response.media_type,
+            headers={"Content-Encoding": encoding},
+        )
+        compressed.headers.add_vary_header("Accept-Encoding")
+        if self.is_not_modified(compressed.headers, request_headers):
+            return NotModifiedResponse(compressed.headers)
+        return compressed
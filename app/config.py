@@ -10,4 +10,73 @@ DATABASE_URL = os.getenv(
 
 SECRET_KEY = os.getenv("SECRET_KEY", "change_me")  # ПОТОМ обязательно поменяй
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# Короткий access-токен; продлевается по refresh-токену (/auth/refresh)
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+# как часто воркер дочитывает из БД сессии, отозванные другими воркерами, секунды
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", "5"))
+# как часто из refresh_tokens удаляются истёкшие сессии, секунды
+REFRESH_TOKEN_PRUNE_INTERVAL = float(os.getenv("REFRESH_TOKEN_PRUNE_INTERVAL", "3600"))
+# Кэш пользователей по токену (get_current_user): сколько живёт запись, секунды;
+# столько же в худшем случае другие воркеры видят старые права и профиль
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_MAXSIZE = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", "10000"))  # 0 — выключен
+# Кэш проверенных JWT (decode_access_token); запись живёт до exp токена
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000"))  # 0 — выключен
+# Пул процессов для pbkdf2 (логин, регистрация, смена пароля); 0 — в потоке запроса
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))
+)
+# сколько хэшей может ждать пула; сверх этого — 503 с Retry-After
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+
+# Кэш чтений каталога (книги, справочники) внутри процесса
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+CATALOG_CACHE_MAXSIZE = int(os.getenv("CATALOG_CACHE_MAXSIZE", "1024"))  # 0 — выключен
+# как часто воркер сверяет общие версии разделов каталога (catalog_versions), секунды
+CATALOG_VERSION_CHECK_INTERVAL = float(os.getenv("CATALOG_VERSION_CHECK_INTERVAL", "1"))
+# Готовые JSON-фрагменты книг для списков (по одному на книгу)
+BOOK_FRAGMENTS_MAXSIZE = int(os.getenv("BOOK_FRAGMENTS_MAXSIZE", "20000"))  # 0 — выключены
+
+# Cache-Control для публичных GET каталога (ответы снабжаются ETag)
+BOOKS_CACHE_CONTROL = os.getenv("BOOKS_CACHE_CONTROL", "public, max-age=0, must-revalidate")
+DICTS_CACHE_CONTROL = os.getenv("DICTS_CACHE_CONTROL", "public, max-age=60")
+
+# Нечёткий поиск (?fuzzy=true): минимальная доля триграмм запроса, найденных в
+# названии/авторах книги (0..1); ниже — книга не считается совпадением
+FUZZY_SEARCH_THRESHOLD = float(os.getenv("FUZZY_SEARCH_THRESHOLD", "0.5"))
+
+# Движок выборок каталога: "sql", "columnar" (снимок в памяти, нужен NumPy)
+# или "mmap" (снимок в файле, общий для всех воркеров через mmap)
+CATALOG_ENGINE = os.getenv("CATALOG_ENGINE", "sql")
+CATALOG_SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", os.path.join(BASE_DIR, "snapshot"))
+# как часто воркер проверяет файл версии снимка, секунды
+CATALOG_SNAPSHOT_CHECK_INTERVAL = float(os.getenv("CATALOG_SNAPSHOT_CHECK_INTERVAL", "1"))
+
+# Класс JSON-ответов по умолчанию: "default" (FastAPI/pydantic) или "orjson"
+# (app.api.responses.FastJSONResponse; без orjson — стандартный json)
+JSON_RESPONSE = os.getenv("JSON_RESPONSE", "default")
+
+# Сжатие ответов gzip/brotli (brotli — если установлен пакет brotli)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # байт
+COMPRESSION_TYPES = tuple(
+    t.strip()
+    for t in os.getenv(
+        "COMPRESSION_TYPES",
+        "application/json,application/x-ndjson,text/csv,text/html,text/plain,"
+        "text/css,text/javascript,application/javascript,image/svg+xml",
+    ).split(",")
+    if t.strip()
+)
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Статика с отпечатком содержимого в имени (собирается при старте, /assets)
+ASSETS_DIR = os.getenv("ASSETS_DIR", os.path.join(BASE_DIR, "assets"))
+ASSETS_CACHE_CONTROL = os.getenv("ASSETS_CACHE_CONTROL", "public, max-age=31536000, immutable")
+
+# Кэш байт-кода шаблонов Jinja: воркеры не компилируют шаблоны заново при
+# каждом старте. Пустой JINJA_CACHE_DIR — временный каталог системы.
+JINJA_BYTECODE_CACHE = os.getenv("JINJA_BYTECODE_CACHE", "1") == "1"
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR") or None
@@ -1,8 +1,8 @@
 # app/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-from .config import DATABASE_URL
+from .config import DATABASE_URL, FUZZY_SEARCH_THRESHOLD
 
 connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
@@ -13,6 +13,45 @@ engine = create_engine(
     connect_args=connect_args,
 )
 
+
+def _lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def lower_copy(source: str):
+    """Умолчание для колонки-копии `source` в нижнем регистре (поиск по справочникам).
+
+    Встроенный lower() в SQLite понимает только ASCII, а своя SQL-функция
+    ломала бы запись в БД из других клиентов, поэтому копия считается
+    приложением: при вставке, в том числе пакетной, — этим умолчанием, при
+    изменении через ORM — слушателем из track_lower_copy.
+    """
+    def default(context):
+        return _lower(context.get_current_parameters().get(source))
+    return default
+
+
+def track_lower_copy(model, source: str, target: str) -> None:
+    """Обновляет `target` при каждой записи `source` у ORM-объекта."""
+    @event.listens_for(getattr(model, source), "set")
+    def _sync(obj, value, oldvalue, initiator):
+        setattr(obj, target, _lower(value))
+
+
+if engine.dialect.name == "postgresql":
+    @event.listens_for(engine, "connect")
+    def _set_trgm_threshold(dbapi_connection, connection_record):
+        # нечёткий поиск (оператор <%, он и использует GIN-индекс) отсекает по
+        # настройке сессии, а не по аргументу запроса. Слушатель стоит до
+        # первого соединения пула, поэтому настройка есть у каждого
+        cursor = dbapi_connection.cursor()
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+            (str(FUZZY_SEARCH_THRESHOLD),),
+        )
+        cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,21 +1,67 @@
 # app/main.py
 import os
 
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.orm import Session
 
+from . import assets, passwords
+from .api.deps import get_db_session
+from .api.responses import FastJSONResponse
 from .api.router import api_router
+from .compression import CompressionMiddleware, PrecompressedStaticFiles, precompress_directory
+from .config import (
+    ASSETS_CACHE_CONTROL,
+    ASSETS_DIR,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_ENABLED,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_TYPES,
+    JINJA_BYTECODE_CACHE,
+    JINJA_CACHE_DIR,
+    JSON_RESPONSE,
+)
 from .database import SessionLocal, engine
 from .models import Base
 from .repositories import UserRepository
+from .repositories.book_search import ensure_search_index
+from .repositories.schema import ensure_schema
+from .services import columnar_catalog, page_service, suggest_service, token_revocation
 from .services.auth_service import get_password_hash
 
-app = FastAPI(title="Bookstore")
+app = FastAPI(
+    title="Bookstore",
+    default_response_class=FastJSONResponse if JSON_RESPONSE == "orjson" else JSONResponse,
+)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        content_types=COMPRESSION_TYPES,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY,
+    )
+
+
+@app.exception_handler(passwords.PasswordHashingBusy)
+async def password_hashing_busy(request: Request, exc: passwords.PasswordHashingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Сервер перегружен, повторите попытку позже"},
+        headers={"Retry-After": "1"},
+    )
+
 
 # Ensure all database tables exist (create missing tables such as new Address)
 Base.metadata.create_all(bind=engine)
+# Constraints and indexes added to the models after the tables were created
+ensure_schema(engine)
+# Full-text index for existing databases (created and filled on first start)
+ensure_search_index(engine)
 
 
 def _create_default_admin() -> None:
@@ -41,58 +87,95 @@ def _create_default_admin() -> None:
 
 _create_default_admin()
 
+
+def _build_memory_indexes() -> None:
+    """Build the in-memory typeahead index, columnar catalog snapshot and
+    the set of revoked sessions."""
+
+    db = SessionLocal()
+    try:
+        suggest_service.rebuild(db)
+        columnar_catalog.rebuild(db)
+        token_revocation.load(db)
+    finally:
+        db.close()
+
+
+_build_memory_indexes()
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+templates.env.globals["asset_url"] = assets.asset_url
+if JINJA_BYTECODE_CACHE:
+    templates.env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+# рядом со статикой кладутся .gz/.br, их отдаёт PrecompressedStaticFiles
+precompress_directory(os.path.join(BASE_DIR, "static"))
+# копии с отпечатком содержимого в имени — для шаблонов (asset_url)
+assets.load(os.path.join(BASE_DIR, "static"), ASSETS_DIR)
 
 app.mount(
     "/static",
-    StaticFiles(directory=os.path.join(BASE_DIR, "static")),
+    PrecompressedStaticFiles(directory=os.path.join(BASE_DIR, "static")),
     name="static",
 )
+app.mount(
+    "/assets",
+    assets.ImmutableStaticFiles(
+        directory=ASSETS_DIR,
+        check_dir=False,
+        cache_control=ASSETS_CACHE_CONTROL,
+    ),
+    name="assets",
+)
 
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
-def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+def index(request: Request, q: str = "", db: Session = Depends(get_db_session)):
+    page = page_service.render_index(templates.env, db, q.strip() or None)
+    return templates.TemplateResponse(request, "index.html", {"page": page})
 
 
 @app.get("/books/{book_id}", response_class=HTMLResponse, include_in_schema=False)
-def book_detail(book_id: int, request: Request):
+def book_detail(book_id: int, request: Request, db: Session = Depends(get_db_session)):
+    page = page_service.render_book(templates.env, db, book_id)
     return templates.TemplateResponse(
+        request,
         "book_detail.html",
-        {"request": request, "book_id": book_id},
+        {"book_id": book_id, "page": page},
+        status_code=200 if page["found"] else 404,
     )
 
 
 @app.get("/cart", response_class=HTMLResponse, include_in_schema=False)
 def cart_page(request: Request):
-    return templates.TemplateResponse("cart.html", {"request": request})
+    return templates.TemplateResponse(request, "cart.html")
 
 
 @app.get("/login", response_class=HTMLResponse, include_in_schema=False)
 def login_page(request: Request):
-    return templates.TemplateResponse("auth/login.html", {"request": request})
+    return templates.TemplateResponse(request, "auth/login.html")
 
 
 @app.get("/register", response_class=HTMLResponse, include_in_schema=False)
 def register_page(request: Request):
-    return templates.TemplateResponse("auth/register.html", {"request": request})
+    return templates.TemplateResponse(request, "auth/register.html")
 
 
 @app.get("/admin", response_class=HTMLResponse, include_in_schema=False)
 def admin_page(request: Request):
-    return templates.TemplateResponse("admin/index.html", {"request": request})
+    return templates.TemplateResponse(request, "admin/index.html")
 
 
 @app.get("/orders", response_class=HTMLResponse, include_in_schema=False)
 def orders_page(request: Request):
-    return templates.TemplateResponse("orders.html", {"request": request})
+    return templates.TemplateResponse(request, "orders.html")
 
 
 @app.get("/profile", response_class=HTMLResponse, include_in_schema=False)
 def profile_page(request: Request):
-    return templates.TemplateResponse("profile.html", {"request": request})
+    return templates.TemplateResponse(request, "profile.html")
 
 
 app.include_router(api_router, prefix="/api")
@@ -8,6 +8,8 @@ from .book_author import BookAuthor
 from .cart import Cart, CartItem
 from .order import Order, OrderItem
 from .address import Address
+from .refresh_token import RefreshToken
+from .catalog_version import CatalogVersion
 
 __all__ = [
     "Base",
@@ -22,4 +24,6 @@ __all__ = [
     "Order",
     "OrderItem",
     "Address",
+    "RefreshToken",
+    "CatalogVersion",
 ]
@@ -1,9 +1,19 @@
-from sqlalchemy import Column, Integer, String
-from ..database import Base
+from sqlalchemy import Column, Index, Integer, String
+from ..database import Base, lower_copy, track_lower_copy
 
 
 class Author(Base):
     __tablename__ = "authors"
 
     author_id = Column(Integer, primary_key=True, index=True)
-    full_name = Column(String(255), nullable=False)
+    full_name = Column(String(255), unique=True, nullable=False)
+    # full_name в нижнем регистре (Unicode): пишется приложением, см. lower_copy
+    full_name_lower = Column(String(255), default=lower_copy("full_name"))
+
+    # префиксный поиск и алфавитная keyset-пагинация справочника
+    __table_args__ = (
+        Index("ix_authors_full_name_lower_id", full_name_lower, author_id),
+    )
+
+
+track_lower_copy(Author, "full_name", "full_name_lower")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -23,12 +23,21 @@ class Book(Base):
     genre = relationship("Genre", backref="books")
     publisher = relationship("Publisher", backref="books")
 
+    # явный порядок: без него он зависел от плана запроса (индексов) и профиля загрузки
     authors = relationship(
         "Author",
         secondary="book_authors",
+        order_by="Author.author_id",
         backref="books",
     )
 
+    # составные индексы под keyset-пагинацию каталога: (ключ сортировки, book_id)
+    __table_args__ = (
+        Index("ix_books_price_book_id", "price", "book_id"),
+        Index("ix_books_publication_year_book_id", "publication_year", "book_id"),
+        Index("ix_books_title_book_id", "title", "book_id"),
+    )
+
     @property
     def genre_name(self):
         return self.genre.name if self.genre else None
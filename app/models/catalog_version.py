@@ -0,0 +1,17 @@
+# app/models/catalog_version.py
+from sqlalchemy import Column, Integer, String
+
+from ..database import Base
+
+
+class CatalogVersion(Base):
+    """Версия раздела каталога (books, genres, authors, publishers).
+
+    Поднимается каждой записью в раздел; общая для всех воркеров, поэтому
+    из неё строятся ETag условных GET (app.api.conditional).
+    """
+
+    __tablename__ = "catalog_versions"
+
+    section = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String
-from ..database import Base
+from sqlalchemy import Column, Index, Integer, String
+from ..database import Base, lower_copy, track_lower_copy
 
 
 class Genre(Base):
@@ -7,3 +7,13 @@ class Genre(Base):
 
     genre_id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), unique=True, nullable=False)
+    # name в нижнем регистре (Unicode): пишется приложением, см. lower_copy
+    name_lower = Column(String(255), default=lower_copy("name"))
+
+    # префиксный поиск и алфавитная keyset-пагинация справочника
+    __table_args__ = (
+        Index("ix_genres_name_lower_id", name_lower, genre_id),
+    )
+
+
+track_lower_copy(Genre, "name", "name_lower")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String
-from ..database import Base
+from sqlalchemy import Column, Index, Integer, String
+from ..database import Base, lower_copy, track_lower_copy
 
 
 class Publisher(Base):
@@ -7,3 +7,13 @@ class Publisher(Base):
 
     publisher_id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), unique=True, nullable=False)
+    # name в нижнем регистре (Unicode): пишется приложением, см. lower_copy
+    name_lower = Column(String(255), default=lower_copy("name"))
+
+    # префиксный поиск и алфавитная keyset-пагинация справочника
+    __table_args__ = (
+        Index("ix_publishers_name_lower_id", name_lower, publisher_id),
+    )
+
+
+track_lower_copy(Publisher, "name", "name_lower")
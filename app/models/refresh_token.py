@@ -0,0 +1,22 @@
+# app/models/refresh_token.py
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class RefreshToken(Base):
+    """Сессия входа: refresh-токен (в БД — только его sha256).
+
+    token_id попадает в access-токены сессии (claim sid): по нему они
+    отзываются вместе с сессией.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    token_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
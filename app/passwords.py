@@ -0,0 +1,104 @@
+# app/passwords.py
+"""Хэширование паролей (pbkdf2_sha256) в отдельном пуле процессов.
+
+Один хэш — сотни миллисекунд CPU. Всплеск логинов, посчитанный прямо в
+воркере, занимает потоки threadpool и процессор, и остальные маршруты
+воркера отвечают с задержкой. Поэтому хэши считаются в ProcessPoolExecutor
+из PASSWORD_HASH_WORKERS процессов. Ждать пула может не больше
+PASSWORD_HASH_QUEUE хэшей; сверх этого сразу поднимается PasswordHashingBusy
+(API отвечает 503), а не растёт очередь, в которой клиент всё равно
+не дождётся ответа.
+
+Модуль нарочно лёгкий: процессы пула запускаются через spawn и
+импортируют только его.
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from passlib.context import CryptContext
+
+from app.config import PASSWORD_HASH_QUEUE, PASSWORD_HASH_WORKERS
+
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256", "bcrypt"],
+    deprecated="auto",
+    default="pbkdf2_sha256",
+)
+
+workers = PASSWORD_HASH_WORKERS
+max_pending = PASSWORD_HASH_QUEUE
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_pending = 0
+
+
+class PasswordHashingBusy(Exception):
+    """Пул хэширования переполнен — запрос стоит повторить позже."""
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, а не fork: форк процесса с потоками и открытыми соединениями БД небезопасен
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        atexit.register(shutdown)
+    return _executor
+
+
+def run(fn: Callable[..., Any], *args: Any) -> Any:
+    """Выполняет `fn(*args)` в пуле и ждёт результата (из потока запроса)."""
+    global _executor, _pending
+    if workers <= 0:
+        return fn(*args)
+    with _lock:
+        if _pending >= max_pending:
+            raise PasswordHashingBusy()
+        _pending += 1
+        executor = _get_executor()
+    try:
+        return executor.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # процесс пула упал — следующий вызов создаст пул заново
+        with _lock:
+            if _executor is executor:
+                _executor = None
+        raise
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+def pending() -> int:
+    return _pending
+
+
+def get_password_hash(password: str) -> str:
+    return run(hash_password, password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return run(check_password, plain_password, hashed_password)
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
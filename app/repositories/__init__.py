@@ -6,6 +6,8 @@ from .address_repository import AddressRepository
 from .genre_repository import GenreRepository
 from .author_repository import AuthorRepository
 from .publisher_repository import PublisherRepository
+from .refresh_token_repository import RefreshTokenRepository
+from .catalog_version_repository import CatalogVersionRepository
 
 __all__ = [
     "UserRepository",
@@ -16,4 +18,6 @@ __all__ = [
     "AuthorRepository",
     "PublisherRepository",
     "AddressRepository",
+    "RefreshTokenRepository",
+    "CatalogVersionRepository",
 ]
@@ -1,5 +1,5 @@
 # app/repositories/author_repository.py
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -21,5 +21,26 @@ class AuthorRepository(BaseRepository[Author]):
             .first()
         )
 
+    def get_or_create_many(self, names: Iterable[str]) -> Dict[str, int]:
+        return self._get_or_create_by_names("full_name", names)
+
+    def get_names_by_ids(self, author_ids: Iterable[int]) -> Dict[int, str]:
+        author_ids = list(author_ids)
+        if not author_ids:
+            return {}
+        return dict(
+            self.db.query(Author.author_id, Author.full_name)
+            .filter(Author.author_id.in_(author_ids))
+            .all()
+        )
+
     def list_all(self) -> List[Author]:
         return self.list()
+
+    def list_page(
+            self,
+            q: Optional[str] = None,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+    ) -> Tuple[List[Author], int, Optional[str]]:
+        return self._list_page_by_name("full_name", q, limit, cursor)
@@ -1,12 +1,56 @@
 # app/repositories/base.py
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar
 
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# верхняя граница для префиксного поиска диапазоном: prefix <= x < prefix + MAX
+_PREFIX_UPPER = "\U0010ffff"
+
+
+def encode_cursor(order_by: Optional[str], value: Any, row_id: int) -> str:
+    """Непрозрачный курсор: режим сортировки + ключ (значение, id) последней строки страницы."""
+    if isinstance(value, Decimal):
+        value = str(value)
+    payload = json.dumps({"o": order_by, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: Optional[str]) -> Tuple[Any, int]:
+    """Разбирает курсор; ValueError, если он битый или от другой сортировки."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, row_id = payload["v"], int(payload["id"])
+        cursor_order = payload["o"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_order != order_by:
+        raise ValueError("Cursor does not match order_by")
+    if order_by in ("price_asc", "price_desc") and value is not None:
+        try:
+            value = Decimal(value)
+        except (InvalidOperation, TypeError):
+            raise ValueError("Invalid cursor")
+    return value, row_id
+
+
+# диалекты с INSERT ... ON CONFLICT DO NOTHING
+_ON_CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 class BaseRepository(Generic[ModelType]):
     """Базовый репозиторий с типичными CRUD-операциями."""
@@ -44,3 +88,91 @@ class BaseRepository(Generic[ModelType]):
     def delete(self, db_obj: ModelType) -> None:
         self.db.delete(db_obj)
         self.db.commit()
+
+    def _list_page_by_name(
+            self,
+            field: str,
+            q: Optional[str] = None,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+    ) -> Tuple[List[ModelType], int, Optional[str]]:
+        """Страница справочника по алфавиту: (строки, всего по фильтру, курсор дальше).
+
+        Поиск — по префиксу без учёта регистра, сортировка — (field_lower, id).
+        Оба идут диапазоном по индексу на копии field_lower, без LIKE и OFFSET.
+        """
+        key = getattr(self.model, f"{field}_lower")
+        pk = self.model.__mapper__.primary_key[0]
+
+        conditions = []
+        prefix = (q or "").strip().lower()
+        if prefix:
+            conditions += [key >= prefix, key < prefix + _PREFIX_UPPER]
+        total = self.db.execute(
+            select(func.count()).select_from(self.model).where(*conditions)
+        ).scalar_one()
+
+        if cursor:
+            value, last_id = decode_cursor(cursor, field)
+            conditions.append(or_(key > value, and_(key == value, pk > last_id)))
+        rows = (
+            self.db.query(self.model)
+            .filter(*conditions)
+            .order_by(key, pk)
+            .limit(limit + 1)
+            .all()
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                field,
+                getattr(last, key.key),
+                getattr(last, pk.key),
+            )
+        return rows, total, next_cursor
+
+    def _get_or_create_by_names(self, field: str, names: Iterable[str]) -> Dict[str, int]:
+        """Имя -> id для справочника: один SELECT ... IN по всем именам и одна
+        пакетная вставка недостающих. Коммит — за вызывающим.
+
+        Столбец `field` должен быть уникальным: если недостающее имя параллельно
+        вставила другая транзакция, вставка его пропускает, а id дочитывается.
+        """
+        unique_names = list(dict.fromkeys(names))
+        if not unique_names:
+            return {}
+        column = getattr(self.model, field)
+        pk = self.model.__mapper__.primary_key[0]
+
+        ids = self._select_ids_by_names(column, pk, unique_names)
+        missing = [name for name in unique_names if name not in ids]
+        if missing:
+            self._insert_missing_names(column, [{field: name} for name in missing])
+            ids.update(self._select_ids_by_names(column, pk, missing))
+        return ids
+
+    def _select_ids_by_names(self, column, pk, names: List[str]) -> Dict[str, int]:
+        return dict(self.db.execute(select(column, pk).where(column.in_(names))).all())
+
+    def _insert_missing_names(self, column, rows: List[Dict[str, str]]) -> None:
+        dialect = self.db.get_bind().dialect.name
+        if dialect in _ON_CONFLICT_INSERTS:
+            stmt = _ON_CONFLICT_INSERTS[dialect](self.model).on_conflict_do_nothing(
+                index_elements=[column]
+            )
+            self.db.execute(stmt, rows)
+            return
+        # без ON CONFLICT: вставка в savepoint, при гонке — построчно
+        try:
+            with self.db.begin_nested():
+                self.db.execute(insert(self.model), rows)
+        except IntegrityError:
+            for row in rows:
+                try:
+                    with self.db.begin_nested():
+                        self.db.execute(insert(self.model), [row])
+                except IntegrityError:
+                    pass
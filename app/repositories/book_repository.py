@@ -1,22 +1,148 @@
-from typing import List, Optional
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Load, Session, joinedload, load_only, selectinload
 
-from app.models import Book, Author
-from .base import BaseRepository
+from app.config import FUZZY_SEARCH_THRESHOLD
+from app.models import Book, Author, BookAuthor, Genre, Publisher
+from .base import BaseRepository, decode_cursor, encode_cursor
+from .book_search import get_search_backend
+
+# Профили загрузки связей для BookRead (genre_name, publisher_name, author_names).
+# Для каждого профиля — стратегия на каждую связь: many-to-one тянем JOIN-ом,
+# коллекцию авторов — отдельным SELECT ... IN, чтобы не плодить строки.
+BOOK_LOADER_PROFILES = {
+    # страница каталога: 1 запрос на книги + 1 на авторов
+    "list": {
+        "genre": joinedload,
+        "publisher": joinedload,
+        "authors": selectinload,
+    },
+    # одна книга: всё одним запросом
+    "detail": {
+        "genre": joinedload,
+        "publisher": joinedload,
+        "authors": joinedload,
+    },
+    # книги внутри корзины/заказа: навешивается на путь от позиции,
+    # авторы догружаются пачкой сразу для всех позиций
+    "cart": {
+        "genre": joinedload,
+        "publisher": joinedload,
+        "authors": selectinload,
+    },
+}
+
+
+def book_loader_options(profile: str, via: Optional[Load] = None) -> list:
+    """Опции загрузки связей книги для профиля.
+
+    `via` — путь до книги от другой сущности (например, selectinload(CartItem.book)),
+    тогда опции навешиваются на него.
+    """
+    try:
+        strategies = BOOK_LOADER_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown book loader profile: {profile}")
+
+    options = [
+        strategy(getattr(Book, attr_name))
+        for attr_name, strategy in strategies.items()
+    ]
+    if via is not None:
+        return [via.options(*options)]
+    return options
+
+
+def book_field_options(fields: Collection[str], extra_columns: Collection[str] = ()) -> list:
+    """Опции загрузки только под поля ответа `fields` (имена полей BookRead).
+
+    Колонки книги — через load_only (описание и прочие тексты не читаются),
+    связи — только те, чьи названия запрошены. `extra_columns` — колонки,
+    нужные самому запросу (ключ сортировки для курсора).
+    """
+    columns = {"book_id", *extra_columns}
+    columns.update(name for name in fields if name in Book.__table__.columns)
+    options = []
+    if "genre_name" in fields:
+        columns.add("genre_id")
+        options.append(joinedload(Book.genre))
+    if "publisher_name" in fields:
+        columns.add("publisher_id")
+        options.append(joinedload(Book.publisher))
+    if "author_names" in fields:
+        options.append(selectinload(Book.authors))
+    options.append(load_only(*(getattr(Book, name) for name in sorted(columns))))
+    return options
+
+
+# order_by -> (колонка, по убыванию). book_id всегда добавляется вторым ключом,
+# чтобы порядок был полным и keyset-пагинация не теряла и не повторяла строки.
+# Режим "relevance" (по умолчанию при поиске) сортирует по рангу полнотекстового поиска.
+ORDER_BY_COLUMNS = {
+    "price_asc": (Book.price, False),
+    "price_desc": (Book.price, True),
+    "year_asc": (Book.publication_year, False),
+    "year_desc": (Book.publication_year, True),
+    "title_asc": (Book.title, False),
+    "title_desc": (Book.title, True),
+}
+
+
+# границы ценовых корзин для фасетов: [0, 500), [500, 1000), ..., [5000, ∞)
+PRICE_FACET_BOUNDS = (500, 1000, 2000, 5000)
+
+
+def _keyset_condition(column, descending: bool, key: Tuple[Any, int]):
+    """Условие "строго после ключа" для сортировки (column NULLS LAST, book_id)."""
+    value, book_id = key
+    after_id = Book.book_id < book_id if descending else Book.book_id > book_id
+    if column is None:
+        return after_id
+    if value is None:
+        # уже в хвосте с NULL-ами
+        return and_(column.is_(None), after_id)
+    after_value = column < value if descending else column > value
+    return or_(
+        after_value,
+        and_(column == value, after_id),
+        column.is_(None),
+    )
 
 
 class BookRepository(BaseRepository[Book]):
     def __init__(self, db: Session) -> None:
         super().__init__(db, Book)
+        self.search = get_search_backend(db.get_bind().dialect.name)
 
-    def get_by_id(self, book_id: int) -> Optional[Book]:
-        return self.get(book_id)
+    def get_by_id(self, book_id: int, profile: Optional[str] = None) -> Optional[Book]:
+        if profile is None:
+            return self.get(book_id)
+        return self.db.get(Book, book_id, options=book_loader_options(profile))
 
-    def list_books(
+    def get_many(
+            self,
+            book_ids: List[int],
+            profile: str = "list",
+            fields: Optional[Collection[str]] = None,
+    ) -> List[Book]:
+        """Книги по списку id одним запросом (+ запросы профиля); порядок не гарантирован.
+
+        `fields` — загрузить только то, что нужно для этих полей ответа
+        (см. book_field_options); профиль тогда не используется.
+        """
+        if not book_ids:
+            return []
+        options = book_field_options(fields) if fields else book_loader_options(profile)
+        return (
+            self.db.query(Book)
+            .options(*options)
+            .filter(Book.book_id.in_(book_ids))
+            .all()
+        )
+
+    def _filtered_query(
             self,
-            skip: int = 0,
-            limit: int = 100,
             q: Optional[str] = None,
             genre_id: Optional[int] = None,
             author_id: Optional[int] = None,
@@ -25,13 +151,27 @@ class BookRepository(BaseRepository[Book]):
             max_price: Optional[float] = None,
             min_year: Optional[int] = None,
             max_year: Optional[int] = None,
-            order_by: Optional[str] = None,
-    ) -> List[Book]:
+            fuzzy: bool = False,
+    ):
+        """Запрос книг с фильтрами и колонка релевантности (None, если поиска нет).
+
+        `fuzzy` — искать с опечатками по триграммам названия и авторов;
+        релевантность тогда — похожесть на запрос.
+        """
         query = self.db.query(Book)
+        rank = None
 
         if q:
-            pattern = f"%{q}%"
-            query = query.filter(Book.title.ilike(pattern))
+            if fuzzy:
+                match = self.search.fuzzy_match(q, FUZZY_SEARCH_THRESHOLD)
+            else:
+                match = self.search.match(q)
+            if match is not None:
+                query = query.join(match, match.c.book_id == Book.book_id)
+                rank = match.c.rank
+            else:
+                pattern = f"%{q}%"
+                query = query.filter(Book.title.ilike(pattern))
 
         if genre_id:
             query = query.filter(Book.genre_id == genre_id)
@@ -54,28 +194,334 @@ class BookRepository(BaseRepository[Book]):
         if max_year is not None:
             query = query.filter(Book.publication_year <= max_year)
 
-        if order_by:
-            if order_by == "price_asc":
-                query = query.order_by(Book.price.asc())
-            elif order_by == "price_desc":
-                query = query.order_by(Book.price.desc())
-            elif order_by == "year_asc":
-                query = query.order_by(Book.publication_year.asc())
-            elif order_by == "year_desc":
-                query = query.order_by(Book.publication_year.desc())
-            elif order_by == "title_asc":
-                query = query.order_by(Book.title.asc())
-            elif order_by == "title_desc":
-                query = query.order_by(Book.title.desc())
+        return query, rank
 
+    def list_books(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            q: Optional[str] = None,
+            genre_id: Optional[int] = None,
+            author_id: Optional[int] = None,
+            publisher_id: Optional[int] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            min_year: Optional[int] = None,
+            max_year: Optional[int] = None,
+            fuzzy: bool = False,
+            order_by: Optional[str] = None,
+            profile: str = "list",
+    ) -> List[Book]:
+        books, _ = self.list_books_page(
+            skip=skip,
+            limit=limit,
+            q=q,
+            genre_id=genre_id,
+            author_id=author_id,
+            publisher_id=publisher_id,
+            min_price=min_price,
+            max_price=max_price,
+            min_year=min_year,
+            max_year=max_year,
+            fuzzy=fuzzy,
+            order_by=order_by,
+            profile=profile,
+        )
         # ВАЖНО: ВСЕГДА возвращаем список, даже если он пустой
-        return query.offset(skip).limit(limit).all()
+        return books
+
+    def list_books_page(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            q: Optional[str] = None,
+            genre_id: Optional[int] = None,
+            author_id: Optional[int] = None,
+            publisher_id: Optional[int] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            min_year: Optional[int] = None,
+            max_year: Optional[int] = None,
+            fuzzy: bool = False,
+            order_by: Optional[str] = None,
+            cursor: Optional[str] = None,
+            profile: str = "list",
+            fields: Optional[Collection[str]] = None,
+    ) -> Tuple[List[Book], Optional[str]]:
+        """Страница каталога и курсор следующей страницы (None — страниц больше нет).
+
+        С курсором страница выбирается по ключу сортировки (keyset), а не
+        через OFFSET, поэтому `skip` в этом случае игнорируется. При поиске без
+        явной сортировки книги идут по релевантности. `fields` — как в get_many.
+        """
+        query, rank = self._filtered_query(
+            q=q,
+            genre_id=genre_id,
+            author_id=author_id,
+            publisher_id=publisher_id,
+            min_price=min_price,
+            max_price=max_price,
+            min_year=min_year,
+            max_year=max_year,
+            fuzzy=fuzzy,
+        )
+        column, descending = ORDER_BY_COLUMNS.get(order_by, (None, False))
+        if fields:
+            sort_columns = (column.key,) if column is not None else ()
+            query = query.options(*book_field_options(fields, sort_columns))
+        else:
+            query = query.options(*book_loader_options(profile))
+
+        order_key = order_by if column is not None else None
+        if rank is not None and column is None:
+            column, descending, order_key = rank, True, "relevance"
+            query = query.add_columns(rank)
+
+        if cursor:
+            query = query.filter(
+                _keyset_condition(column, descending, decode_cursor(cursor, order_key))
+            )
+
+        if column is None:
+            query = query.order_by(Book.book_id.asc())
+        elif descending:
+            query = query.order_by(column.desc().nulls_last(), Book.book_id.desc())
+        else:
+            query = query.order_by(column.asc().nulls_last(), Book.book_id.asc())
+
+        if not cursor and skip:
+            query = query.offset(skip)
+
+        # берём на одну строку больше, чтобы понять, есть ли следующая страница
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if order_key == "relevance":
+            books = [book for book, _ in rows]
+            last_value = rows[-1][1] if rows else None
+        else:
+            books = rows
+            last_value = getattr(books[-1], column.key) if books and column is not None else None
+
+        next_cursor = None
+        if has_more and books:
+            next_cursor = encode_cursor(order_key, last_value, books[-1].book_id)
+        return books, next_cursor
+
+    def iter_books(
+            self,
+            q: Optional[str] = None,
+            genre_id: Optional[int] = None,
+            author_id: Optional[int] = None,
+            publisher_id: Optional[int] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            min_year: Optional[int] = None,
+            max_year: Optional[int] = None,
+            fuzzy: bool = False,
+            batch_size: int = 1000,
+    ) -> Iterator[Book]:
+        """Все книги под фильтрами по порядку book_id, со связями, пачками.
+
+        yield_per включает серверный курсор (где драйвер его умеет), так что
+        в памяти одновременно держится не больше одной пачки.
+        """
+        query, _ = self._filtered_query(
+            q=q,
+            genre_id=genre_id,
+            author_id=author_id,
+            publisher_id=publisher_id,
+            min_price=min_price,
+            max_price=max_price,
+            min_year=min_year,
+            max_year=max_year,
+            fuzzy=fuzzy,
+        )
+        return iter(
+            query.options(*book_loader_options("list"))
+            .order_by(Book.book_id.asc())
+            .yield_per(batch_size)
+        )
+
+    def facet_counts(
+            self,
+            q: Optional[str] = None,
+            genre_id: Optional[int] = None,
+            author_id: Optional[int] = None,
+            publisher_id: Optional[int] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            min_year: Optional[int] = None,
+            max_year: Optional[int] = None,
+            fuzzy: bool = False,
+            limit: int = 50,
+    ) -> Dict[str, list]:
+        """Счётчики фасетов по отфильтрованным книгам.
+
+        Фильтры те же, что у list_books; отфильтрованная выборка используется
+        как подзапрос, и каждый фасет считается одним GROUP BY (всего 4 запроса).
+        """
+        query, _ = self._filtered_query(
+            q=q,
+            genre_id=genre_id,
+            author_id=author_id,
+            publisher_id=publisher_id,
+            min_price=min_price,
+            max_price=max_price,
+            min_year=min_year,
+            max_year=max_year,
+            fuzzy=fuzzy,
+        )
+        filtered = query.with_entities(
+            Book.book_id, Book.genre_id, Book.publisher_id, Book.price
+        ).subquery("filtered_books")
+
+        count = func.count().label("count")
+
+        genres = self.db.execute(
+            select(Genre.genre_id, Genre.name, count)
+            .join(filtered, filtered.c.genre_id == Genre.genre_id)
+            .group_by(Genre.genre_id, Genre.name)
+            .order_by(count.desc(), Genre.name)
+            .limit(limit)
+        ).all()
+
+        publishers = self.db.execute(
+            select(Publisher.publisher_id, Publisher.name, count)
+            .join(filtered, filtered.c.publisher_id == Publisher.publisher_id)
+            .group_by(Publisher.publisher_id, Publisher.name)
+            .order_by(count.desc(), Publisher.name)
+            .limit(limit)
+        ).all()
+
+        authors = self.db.execute(
+            select(Author.author_id, Author.full_name, count)
+            .join(BookAuthor, BookAuthor.author_id == Author.author_id)
+            .join(filtered, filtered.c.book_id == BookAuthor.book_id)
+            .group_by(Author.author_id, Author.full_name)
+            .order_by(count.desc(), Author.full_name)
+            .limit(limit)
+        ).all()
 
-    def create_book(self, data: dict) -> Book:
-        return self.create(data)
+        bucket = case(
+            *[
+                (filtered.c.price < bound, index)
+                for index, bound in enumerate(PRICE_FACET_BOUNDS)
+            ],
+            else_=len(PRICE_FACET_BOUNDS),
+        ).label("bucket")
+        bucket_counts = dict(
+            self.db.execute(select(bucket, count).group_by(bucket)).all()
+        )
+
+        lower_bounds = (0,) + PRICE_FACET_BOUNDS
+        upper_bounds = PRICE_FACET_BOUNDS + (None,)
+        prices = [
+            {"min": low, "max": high, "count": bucket_counts.get(index, 0)}
+            for index, (low, high) in enumerate(zip(lower_bounds, upper_bounds))
+        ]
+
+        return {
+            "total": sum(item["count"] for item in prices),
+            "genres": [
+                {"id": row.genre_id, "name": row.name, "count": row.count}
+                for row in genres
+            ],
+            "publishers": [
+                {"id": row.publisher_id, "name": row.name, "count": row.count}
+                for row in publishers
+            ],
+            "authors": [
+                {"id": row.author_id, "name": row.full_name, "count": row.count}
+                for row in authors
+            ],
+            "prices": prices,
+        }
+
+    # --- пакетные операции (импорт): без коммита, транзакцией управляет сервис ---
+
+    def get_ids_by_isbn(self, isbns: List[str]) -> Dict[str, int]:
+        if not isbns:
+            return {}
+        return dict(
+            self.db.execute(
+                select(Book.isbn, Book.book_id).where(Book.isbn.in_(isbns))
+            ).all()
+        )
+
+    def bulk_insert(self, rows: List[dict]) -> List[int]:
+        """Вставляет книги одним executemany; id возвращаются в порядке rows."""
+        if not rows:
+            return []
+        result = self.db.execute(
+            insert(Book).returning(Book.book_id, sort_by_parameter_order=True),
+            rows,
+        )
+        return list(result.scalars())
+
+    def bulk_update(self, rows: List[dict]) -> None:
+        """Обновляет книги по первичному ключу (в каждой строке есть book_id)."""
+        if rows:
+            self.db.execute(update(Book), rows)
+
+    def replace_authors(self, links: Dict[int, List[int]]) -> None:
+        """Заменяет авторов у книг: book_id -> список author_id."""
+        if not links:
+            return
+        self.db.execute(
+            delete(BookAuthor).where(BookAuthor.book_id.in_(list(links)))
+        )
+        rows = [
+            {"book_id": book_id, "author_id": author_id}
+            for book_id, author_ids in links.items()
+            for author_id in dict.fromkeys(author_ids)
+        ]
+        if rows:
+            self.db.execute(insert(BookAuthor), rows)
+
+    def sync_search_index(self, books: List[Book]) -> None:
+        """Переиндексирует книги для полнотекстового поиска (коммит — за вызывающим)."""
+        self.search.index_books(self.db, books)
+
+    def _authors_by_ids(self, author_ids: List[int]) -> List[Author]:
+        author_ids = list(dict.fromkeys(author_ids))
+        if not author_ids:
+            return []
+        return self.db.query(Author).filter(Author.author_id.in_(author_ids)).all()
+
+    def create_book(self, data: dict, author_ids: Optional[List[int]] = None) -> Book:
+        """Новая книга вместе с авторами и поисковым индексом — одним коммитом."""
+        book = Book(**data)
+        if author_ids:
+            book.authors = self._authors_by_ids(author_ids)
+        self.db.add(book)
+        self.db.flush()
+        self.sync_search_index([book])
+        self.db.commit()
+        self.db.refresh(book)
+        return book
+
+    def update_book(
+            self,
+            book: Book,
+            data: dict,
+            author_ids: Optional[List[int]] = None,
+    ) -> Book:
+        """Обновляет поля и (если передан список) авторов книги — одним коммитом.
 
-    def update_book(self, book: Book, data: dict) -> Book:
-        return self.update(book, data)
+        `author_ids=None` — авторов не трогаем, `[]` — убираем всех.
+        """
+        for field, value in data.items():
+            setattr(book, field, value)
+        if author_ids is not None:
+            book.authors = self._authors_by_ids(author_ids)
+        self.db.add(book)
+        self.db.flush()
+        self.sync_search_index([book])
+        self.db.commit()
+        self.db.refresh(book)
+        return book
 
     def delete_book(self, book: Book) -> None:
+        self.search.remove_books(self.db, [book.book_id])
         self.delete(book)
@@ -0,0 +1,360 @@
+# app/repositories/book_search.py
+"""Полнотекстовый поиск по книгам.
+
+Индексируются название, описание и ФИО авторов. Бэкенд выбирается по диалекту
+БД: на SQLite — виртуальная таблица FTS5, на PostgreSQL — таблица с tsvector и
+GIN-индексом. Для прочих БД остаётся старый поиск по подстроке в названии.
+Индекс обновляется из catalog_service при создании, изменении и удалении книг.
+
+Для нечёткого поиска (опечатки) рядом лежит триграммный индекс по названию и
+авторам: на PostgreSQL — pg_trgm, на SQLite — таблица book_trigrams, которую
+заполняет само приложение. Похожесть — доля триграмм запроса, нашедшихся
+в документе (как word_similarity в pg_trgm).
+"""
+import math
+import re
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import bindparam, column, event, func, literal, literal_column, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models import Book
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_books_fts = table("books_fts", column("rowid"))
+_book_search = table("book_search", column("book_id"), column("document"))
+_book_trigrams = table("book_trigrams", column("trigram"), column("book_id"))
+_book_fuzzy = table("book_fuzzy", column("book_id"), column("document"))
+
+
+def _tokens(q: str) -> List[str]:
+    return _TOKEN_RE.findall(q.lower())
+
+
+def trigrams(value: str) -> Set[str]:
+    """Триграммы строки по правилам pg_trgm: каждое слово дополняется
+    двумя пробелами слева и одним справа.
+    """
+    result = set()
+    for token in _tokens(value):
+        padded = f"  {token} "
+        result.update(padded[i: i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def _fuzzy_text(title: str, authors: str) -> str:
+    return f"{title} {authors}".strip()
+
+
+def book_document(book: Book) -> dict:
+    """Индексируемые поля книги: book_id, title, description, authors."""
+    return {
+        "book_id": book.book_id,
+        "title": book.title or "",
+        "description": book.description or "",
+        "authors": " ".join(book.author_names),
+    }
+
+
+class SearchBackend:
+    """Бэкенд без индекса: поиск по подстроке в названии (как раньше)."""
+
+    name = "like"
+
+    def install(self, connection: Connection) -> None:
+        pass
+
+    def drop(self, connection: Connection) -> None:
+        pass
+
+    def is_empty(self, connection: Connection) -> bool:
+        return False
+
+    def rebuild(self, connection: Connection) -> None:
+        pass
+
+    def index_books(self, db: Session, books: Iterable[Book]) -> None:
+        self.index_documents(db, [book_document(book) for book in books])
+
+    def index_documents(self, db: Session, documents: List[dict]) -> None:
+        """Переиндексация по готовым документам (см. book_document)."""
+        pass
+
+    def remove_books(self, db: Session, book_ids: Iterable[int]) -> None:
+        pass
+
+    def match(self, q: str):
+        """Подзапрос (book_id, rank) для строки поиска; чем больше rank, тем лучше.
+
+        None — бэкенд индекса не держит, и фильтровать нужно по-старому.
+        """
+        return None
+
+    def fuzzy_match(self, q: str, threshold: float):
+        """Как match, но с опечатками: rank — похожесть 0..1, не ниже threshold."""
+        return None
+
+
+class SqliteFtsBackend(SearchBackend):
+    name = "sqlite_fts5"
+
+    # веса колонок для bm25: название важнее авторов, авторы важнее описания
+    _WEIGHTS = (10.0, 1.0, 5.0)
+
+    def install(self, connection: Connection) -> None:
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+            "title, description, authors, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        connection.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS book_trigrams ("
+            "trigram TEXT NOT NULL, book_id INTEGER NOT NULL, "
+            "PRIMARY KEY (trigram, book_id)) WITHOUT ROWID"
+        )
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_book_trigrams_book_id "
+            "ON book_trigrams (book_id)"
+        )
+
+    def drop(self, connection: Connection) -> None:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS books_fts")
+        connection.exec_driver_sql("DROP TABLE IF EXISTS book_trigrams")
+
+    def is_empty(self, connection: Connection) -> bool:
+        # триграммы появились позже FTS: в старой БД заполнен только books_fts
+        return connection.exec_driver_sql(
+            "SELECT NOT EXISTS (SELECT 1 FROM books_fts) "
+            "OR NOT EXISTS (SELECT 1 FROM book_trigrams)"
+        ).scalar() == 1
+
+    def rebuild(self, connection: Connection) -> None:
+        connection.exec_driver_sql("DELETE FROM books_fts")
+        connection.exec_driver_sql("DELETE FROM book_trigrams")
+        # триграммы считаются в Python, поэтому документы идут через приложение пачками
+        result = connection.execution_options(yield_per=5000).exec_driver_sql(
+            "SELECT b.book_id, b.title, coalesce(b.description, ''), "
+            "coalesce(group_concat(a.full_name, ' '), '') "
+            "FROM books b "
+            "LEFT JOIN book_authors ba ON ba.book_id = b.book_id "
+            "LEFT JOIN authors a ON a.author_id = ba.author_id "
+            "GROUP BY b.book_id"
+        )
+        for rows in result.partitions():
+            documents = [
+                {"book_id": book_id, "title": title, "description": description, "authors": authors}
+                for book_id, title, description, authors in rows
+            ]
+            connection.execute(self._INSERT_FTS, documents)
+            self._insert_trigrams(connection, documents)
+
+    _INSERT_FTS = text(
+        "INSERT INTO books_fts (rowid, title, description, authors) "
+        "VALUES (:book_id, :title, :description, :authors)"
+    )
+
+    @staticmethod
+    def _insert_trigrams(connection, documents: List[dict]) -> None:
+        rows = [
+            {"trigram": trigram, "book_id": d["book_id"]}
+            for d in documents
+            for trigram in trigrams(_fuzzy_text(d["title"], d["authors"]))
+        ]
+        if rows:
+            connection.execute(
+                text("INSERT INTO book_trigrams (trigram, book_id) VALUES (:trigram, :book_id)"),
+                rows,
+            )
+
+    def index_documents(self, db: Session, documents: List[dict]) -> None:
+        if not documents:
+            return
+        self.remove_books(db, [d["book_id"] for d in documents])
+        db.execute(self._INSERT_FTS, documents)
+        self._insert_trigrams(db, documents)
+
+    def remove_books(self, db: Session, book_ids: Iterable[int]) -> None:
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+        for statement in (
+            "DELETE FROM books_fts WHERE rowid IN :book_ids",
+            "DELETE FROM book_trigrams WHERE book_id IN :book_ids",
+        ):
+            db.execute(
+                text(statement).bindparams(bindparam("book_ids", expanding=True)),
+                {"book_ids": book_ids},
+            )
+
+    def match(self, q: str):
+        tokens = _tokens(q)
+        if not tokens:
+            return None
+        # каждое слово — префиксный терм в кавычках, между ними неявный AND
+        fts_query = " ".join(f'"{token}"*' for token in tokens)
+        # bm25 тем меньше, чем лучше совпадение — разворачиваем знак
+        bm25 = func.bm25(literal_column("books_fts"), *self._WEIGHTS)
+        return (
+            select(_books_fts.c.rowid.label("book_id"), (-bm25).label("rank"))
+            .where(literal_column("books_fts").op("MATCH")(fts_query))
+            .subquery("book_search")
+        )
+
+    def fuzzy_match(self, q: str, threshold: float):
+        grams = sorted(trigrams(q))
+        if not grams:
+            return None
+        shared = func.count()
+        return (
+            select(
+                _book_trigrams.c.book_id,
+                (shared * (1.0 / len(grams))).label("rank"),
+            )
+            .where(_book_trigrams.c.trigram.in_(grams))
+            .group_by(_book_trigrams.c.book_id)
+            .having(shared >= max(1, math.ceil(threshold * len(grams))))
+            .subquery("book_fuzzy_match")
+        )
+
+
+class PostgresTsvectorBackend(SearchBackend):
+    name = "postgres_tsvector"
+
+    # 'simple' — без стемминга, одинаково работает для русских и английских слов
+    _DOCUMENT_SQL = (
+        "setweight(to_tsvector('simple', {title}), 'A') || "
+        "setweight(to_tsvector('simple', {authors}), 'B') || "
+        "setweight(to_tsvector('simple', {description}), 'C')"
+    )
+
+    def install(self, connection: Connection) -> None:
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        connection.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS book_search ("
+            "book_id INTEGER PRIMARY KEY REFERENCES books (book_id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        # текст для триграмм (название + авторы); колонка добавлена позже таблицы
+        connection.exec_driver_sql(
+            "ALTER TABLE book_search ADD COLUMN IF NOT EXISTS fuzzy text NOT NULL DEFAULT ''"
+        )
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_book_search_document "
+            "ON book_search USING GIN (document)"
+        )
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_book_search_fuzzy "
+            "ON book_search USING GIN (fuzzy gin_trgm_ops)"
+        )
+
+    def drop(self, connection: Connection) -> None:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS book_search")
+
+    def is_empty(self, connection: Connection) -> bool:
+        return not connection.exec_driver_sql(
+            "SELECT EXISTS (SELECT 1 FROM book_search) "
+            "AND NOT EXISTS (SELECT 1 FROM book_search WHERE fuzzy = '')"
+        ).scalar()
+
+    def rebuild(self, connection: Connection) -> None:
+        document = self._DOCUMENT_SQL.format(
+            title="b.title",
+            authors="coalesce(string_agg(a.full_name, ' '), '')",
+            description="coalesce(b.description, '')",
+        )
+        connection.exec_driver_sql("DELETE FROM book_search")
+        connection.exec_driver_sql(
+            f"INSERT INTO book_search (book_id, document, fuzzy) "
+            f"SELECT b.book_id, {document}, "
+            f"trim(b.title || ' ' || coalesce(string_agg(a.full_name, ' '), '')) "
+            f"FROM books b "
+            f"LEFT JOIN book_authors ba ON ba.book_id = b.book_id "
+            f"LEFT JOIN authors a ON a.author_id = ba.author_id "
+            f"GROUP BY b.book_id"
+        )
+
+    def index_documents(self, db: Session, documents: List[dict]) -> None:
+        if not documents:
+            return
+        document = self._DOCUMENT_SQL.format(
+            title=":title", authors=":authors", description=":description"
+        )
+        db.execute(
+            text(
+                f"INSERT INTO book_search (book_id, document, fuzzy) "
+                f"VALUES (:book_id, {document}, :fuzzy) "
+                f"ON CONFLICT (book_id) DO UPDATE "
+                f"SET document = EXCLUDED.document, fuzzy = EXCLUDED.fuzzy"
+            ),
+            [{**d, "fuzzy": _fuzzy_text(d["title"], d["authors"])} for d in documents],
+        )
+
+    def remove_books(self, db: Session, book_ids: Iterable[int]) -> None:
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+        db.execute(
+            text("DELETE FROM book_search WHERE book_id IN :book_ids").bindparams(
+                bindparam("book_ids", expanding=True)
+            ),
+            {"book_ids": book_ids},
+        )
+
+    def match(self, q: str):
+        tokens = _tokens(q)
+        if not tokens:
+            return None
+        ts_query = func.to_tsquery(
+            "simple", " & ".join(f"{token}:*" for token in tokens)
+        )
+        return (
+            select(
+                _book_search.c.book_id,
+                func.ts_rank(_book_search.c.document, ts_query).label("rank"),
+            )
+            .where(_book_search.c.document.op("@@")(ts_query))
+            .subquery("book_search_match")
+        )
+
+    def fuzzy_match(self, q: str, threshold: float):
+        if not _tokens(q):
+            return None
+        similarity = func.word_similarity(q, _book_search.c.fuzzy)
+        return (
+            select(_book_search.c.book_id, similarity.label("rank"))
+            .where(literal(q).op("<%")(_book_search.c.fuzzy), similarity >= threshold)
+            .subquery("book_fuzzy_match")
+        )
+
+
+_BACKENDS = {
+    "sqlite": SqliteFtsBackend(),
+    "postgresql": PostgresTsvectorBackend(),
+}
+_FALLBACK = SearchBackend()
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    return _BACKENDS.get(dialect_name, _FALLBACK)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Создаёт структуры индекса для уже существующей БД и заполняет их при необходимости."""
+    backend = get_search_backend(engine.dialect.name)
+    with engine.begin() as connection:
+        backend.install(connection)
+        if backend.is_empty(connection):
+            backend.rebuild(connection)
+
+
+# индекс живёт и умирает вместе с таблицей books (create_all / drop_all)
+@event.listens_for(Book.__table__, "after_create")
+def _install_search_index(target, connection, **kw):
+    get_search_backend(connection.dialect.name).install(connection)
+
+
+@event.listens_for(Book.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    get_search_backend(connection.dialect.name).drop(connection)
@@ -1,22 +1,32 @@
 # app/repositories/cart_repository.py
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.models import Cart, CartItem
 from .base import BaseRepository
+from .book_repository import book_loader_options
 
 
 class CartRepository(BaseRepository[Cart]):
     def __init__(self, db: Session) -> None:
         super().__init__(db, Cart)
 
-    def get_cart_by_user(self, user_id: int) -> Optional[Cart]:
-        return (
-            self.db.query(Cart)
-            .filter(Cart.user_id == user_id)
-            .first()
-        )
+    def get_cart_by_user(
+        self,
+        user_id: int,
+        profile: Optional[str] = None,
+    ) -> Optional[Cart]:
+        query = self.db.query(Cart).filter(Cart.user_id == user_id)
+        if profile is not None:
+            # позиции и их книги со всеми связями — фиксированным числом запросов
+            query = query.options(
+                *book_loader_options(
+                    profile,
+                    via=selectinload(Cart.items).joinedload(CartItem.book),
+                )
+            )
+        return query.first()
 
     def create_cart_for_user(self, user_id: int) -> Cart:
         cart = Cart(user_id=user_id)
@@ -0,0 +1,39 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models import CatalogVersion
+from .base import BaseRepository
+
+
+class CatalogVersionRepository(BaseRepository[CatalogVersion]):
+    def __init__(self, db: Session) -> None:
+        super().__init__(db, CatalogVersion)
+
+    def get_versions(self, sections: Iterable[str]) -> Dict[str, int]:
+        """Версии разделов; раздела без записей ещё нет в таблице — версия 0."""
+        sections = list(sections)
+        rows = self.db.execute(
+            select(CatalogVersion.section, CatalogVersion.version).where(
+                CatalogVersion.section.in_(sections)
+            )
+        ).all()
+        versions = dict.fromkeys(sections, 0)
+        versions.update(rows)
+        return versions
+
+    def bump(self, sections: Iterable[str]) -> None:
+        """Поднимает версии разделов на 1 (строки создаются при первой записи)."""
+        sections = sorted(set(sections))
+        if not sections:
+            return
+        self._insert_missing_names(
+            CatalogVersion.section, [{"section": section} for section in sections]
+        )
+        self.db.execute(
+            update(CatalogVersion)
+            .where(CatalogVersion.section.in_(sections))
+            .values(version=CatalogVersion.version + 1)
+        )
+        self.db.commit()
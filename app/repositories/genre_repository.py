@@ -1,5 +1,5 @@
 # app/repositories/genre_repository.py
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -17,5 +17,16 @@ class GenreRepository(BaseRepository[Genre]):
     def get_by_name(self, name: str) -> Optional[Genre]:
         return self.db.query(Genre).filter(Genre.name == name).first()
 
+    def get_or_create_many(self, names: Iterable[str]) -> Dict[str, int]:
+        return self._get_or_create_by_names("name", names)
+
     def list_all(self) -> List[Genre]:
         return self.list()
+
+    def list_page(
+            self,
+            q: Optional[str] = None,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+    ) -> Tuple[List[Genre], int, Optional[str]]:
+        return self._list_page_by_name("name", q, limit, cursor)
@@ -1,7 +1,7 @@
 # app/repositories/order_repository.py
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.models import Order, OrderItem, Cart
 from .base import BaseRepository
@@ -17,6 +17,7 @@ class OrderRepository(BaseRepository[Order]):
     def list_by_user(self, user_id: int) -> List[Order]:
         return (
             self.db.query(Order)
+            .options(selectinload(Order.items))
             .filter(Order.user_id == user_id)
             .order_by(Order.created_at.desc())
             .all()
@@ -1,5 +1,5 @@
 # app/repositories/publisher_repository.py
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -21,5 +21,16 @@ class PublisherRepository(BaseRepository[Publisher]):
             .first()
         )
 
+    def get_or_create_many(self, names: Iterable[str]) -> Dict[str, int]:
+        return self._get_or_create_by_names("name", names)
+
     def list_all(self) -> List[Publisher]:
         return self.list()
+
+    def list_page(
+            self,
+            q: Optional[str] = None,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+    ) -> Tuple[List[Publisher], int, Optional[str]]:
+        return self._list_page_by_name("name", q, limit, cursor)
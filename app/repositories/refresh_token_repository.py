@@ -0,0 +1,63 @@
+# app/repositories/refresh_token_repository.py
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models import RefreshToken
+from .base import BaseRepository
+
+
+class RefreshTokenRepository(BaseRepository[RefreshToken]):
+    def __init__(self, db: Session) -> None:
+        super().__init__(db, RefreshToken)
+
+    def get_by_hash(self, token_hash: str) -> Optional[RefreshToken]:
+        return (
+            self.db.query(RefreshToken)
+            .filter(RefreshToken.token_hash == token_hash)
+            .first()
+        )
+
+    def revoke_for_user(self, user_id: int, now: datetime) -> List[Tuple[int, datetime]]:
+        """Отзывает действующие сессии пользователя; возвращает (token_id, expires_at)."""
+        rows = self.db.execute(
+            select(RefreshToken.token_id, RefreshToken.expires_at).where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+        ).all()
+        if rows:
+            self.db.execute(
+                update(RefreshToken)
+                .where(RefreshToken.token_id.in_([row[0] for row in rows]))
+                .values(revoked_at=now)
+            )
+        self.db.commit()
+        return [tuple(row) for row in rows]
+
+    def list_revoked(
+            self,
+            now: datetime,
+            since: Optional[datetime] = None,
+    ) -> List[Tuple[int, datetime]]:
+        """Отозванные и ещё не истёкшие сессии (отозванные не раньше `since`)."""
+        conditions = [RefreshToken.revoked_at.is_not(None), RefreshToken.expires_at > now]
+        if since is not None:
+            conditions.append(RefreshToken.revoked_at >= since)
+        rows = self.db.execute(
+            select(RefreshToken.token_id, RefreshToken.expires_at).where(*conditions)
+        ).all()
+        return [tuple(row) for row in rows]
+
+    def delete_expired(self, now: datetime) -> int:
+        """Удаляет истёкшие сессии (в том числе отозванные); возвращает их число.
+
+        Отозванные, но не истёкшие строки остаются: по ним воркеры
+        восстанавливают множество отзыва (list_revoked).
+        """
+        result = self.db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,121 @@
+# app/repositories/schema.py
+"""Досоздание ограничений и индексов в БД, созданных прежними версиями.
+
+create_all создаёт только отсутствующие таблицы и не трогает существующие,
+поэтому ограничения и индексы, добавленные в модели позже, ставятся здесь
+при старте (рядом с ensure_search_index).
+"""
+import warnings
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import bindparam, delete, exc, inspect, select, text, update
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.engine import Connection, Engine
+
+from app.models import Author, BookAuthor, Genre, Publisher
+
+AUTHORS_UNIQUE_INDEX = "uq_authors_full_name"
+
+# индексы прежних версий по выражениям: на lower(...) (в SQLite lower()
+# подменялся на Unicode-вариант, и без приложения индекс расходился с данными)
+# и на своей функции unicode_lower(...), без которой другие клиенты SQLite
+# не могли писать в таблицу
+_LEGACY_INDEXES = (
+    "ix_authors_full_name_lower",
+    "ix_genres_name_lower",
+    "ix_publishers_name_lower",
+    "ix_authors_full_name_unicode_lower",
+    "ix_genres_name_unicode_lower",
+    "ix_publishers_name_unicode_lower",
+)
+
+# справочник -> имя колонки, копия которой в нижнем регистре ищется и сортируется
+_LOWER_COPIES = ((Author, "full_name"), (Genre, "name"), (Publisher, "name"))
+
+
+def _has_unique(connection: Connection, table: str, column: str) -> bool:
+    inspector = inspect(connection)
+    with warnings.catch_warnings():
+        # индексы по выражениям (lower(...)) SQLAlchemy не отражает и предупреждает
+        warnings.simplefilter("ignore", exc.SAWarning)
+        constraints = inspector.get_unique_constraints(table)
+        indexes = inspector.get_indexes(table)
+    if any(constraint["column_names"] == [column] for constraint in constraints):
+        return True
+    return any(index["unique"] and index["column_names"] == [column] for index in indexes)
+
+
+def merge_duplicate_authors(connection: Connection) -> int:
+    """Сливает авторов с одинаковым ФИО в автора с наименьшим id; возвращает
+    число удалённых дублей. Связи с книгами переносятся на оставшегося."""
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for author_id, full_name in connection.execute(
+        select(Author.author_id, Author.full_name).order_by(Author.author_id)
+    ):
+        groups[full_name].append(author_id)
+
+    removed = 0
+    for keep, *duplicates in (ids for ids in groups.values() if len(ids) > 1):
+        kept_books = set(connection.execute(
+            select(BookAuthor.book_id).where(BookAuthor.author_id == keep)
+        ).scalars())
+        for duplicate in duplicates:
+            books = connection.execute(
+                select(BookAuthor.book_id).where(BookAuthor.author_id == duplicate)
+            ).scalars().all()
+            # книга уже связана с оставшимся автором — связь с дублем не нужна
+            connection.execute(delete(BookAuthor).where(
+                BookAuthor.author_id == duplicate, BookAuthor.book_id.in_(kept_books),
+            ))
+            connection.execute(
+                update(BookAuthor).where(BookAuthor.author_id == duplicate).values(author_id=keep)
+            )
+            kept_books.update(books)
+            connection.execute(delete(Author).where(Author.author_id == duplicate))
+            removed += 1
+    return removed
+
+
+def fill_lower_copies(connection: Connection, model, field: str) -> int:
+    """Сверяет копию `field`_lower с `field` и чинит расхождения (строки старых
+    версий и записанные в обход приложения); возвращает число исправленных."""
+    column = getattr(model, field)
+    lower = getattr(model, f"{field}_lower")
+    pk = model.__mapper__.primary_key[0]
+    stale = [
+        {"row_id": row_id, "value": value.lower()}
+        for row_id, value, copy in connection.execute(select(pk, column, lower))
+        if copy != value.lower()
+    ]
+    if stale:
+        connection.execute(
+            update(model).where(pk == bindparam("row_id")).values({lower: bindparam("value")}),
+            stale,
+        )
+    return len(stale)
+
+
+def ensure_schema(engine: Engine) -> None:
+    """Приводит существующую БД к ограничениям текущих моделей."""
+    with engine.begin() as connection:
+        # ON CONFLICT (full_name) при создании авторов по именам требует уникальности
+        if not _has_unique(connection, Author.__tablename__, "full_name"):
+            merge_duplicate_authors(connection)
+            connection.execute(text(
+                f"CREATE UNIQUE INDEX {AUTHORS_UNIQUE_INDEX} ON authors (full_name)"
+            ))
+
+        # поиск и пагинация справочников идут по индексам на копиях *_lower
+        for name in _LEGACY_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        inspector = inspect(connection)
+        for model, field in _LOWER_COPIES:
+            table = model.__tablename__
+            if not inspector.has_table(table):
+                continue
+            if f"{field}_lower" not in {column["name"] for column in inspector.get_columns(table)}:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {field}_lower VARCHAR(255)"))
+            fill_lower_copies(connection, model, field)
+            for index in model.__table__.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
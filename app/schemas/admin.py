@@ -1,6 +1,6 @@
 # app/schemas/admin.py
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -22,3 +22,25 @@ class UserAdminUpdate(BaseModel):
 
 class OrderStatusUpdate(BaseModel):
     status: str
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+    ttl: float
+    in_flight: int
+    versions: Dict[str, int]
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: List[ImportRowError]
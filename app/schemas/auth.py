@@ -5,11 +5,18 @@ from pydantic import BaseModel, EmailStr
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
 class TokenData(BaseModel):
     email: Optional[EmailStr] = None
+    # id сессии (refresh-токена), к которой относится access-токен
+    sid: Optional[int] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class LoginRequest(BaseModel):
@@ -1,8 +1,9 @@
 # app/schemas/book.py
 from decimal import Decimal
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
 
-from pydantic import BaseModel, ConfigDict, Field  # добавили ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, create_model  # добавили ConfigDict
 
 
 class BookBase(BaseModel):
@@ -47,6 +48,63 @@ class BookRead(BookBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BookCard(BaseModel):
+    """Компактная карточка для списков каталога (?view=card)."""
+    book_id: int
+    title: str
+    price: Decimal
+    cover_image: Optional[str] = None
+    author_names: List[str] = Field(default_factory=list)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+BOOK_FIELDS = tuple(BookRead.model_fields)
+BOOK_CARD_FIELDS = tuple(BookCard.model_fields)
+
+
+@lru_cache(maxsize=128)
+def sparse_book_schema(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Схема с подмножеством полей BookRead (?fields=...), по одной на набор."""
+    if fields == BOOK_CARD_FIELDS:
+        return BookCard
+    return create_model(
+        "BookFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (BookRead.model_fields[name].annotation, BookRead.model_fields[name])
+           for name in fields},
+    )
+
+
 class BookCoverUpload(BaseModel):
     filename: str
     content: str
+
+
+class BookBatchRequest(BaseModel):
+    ids: List[int]
+
+
+class BookBatch(BaseModel):
+    items: List[BookRead]
+    missing: List[int]  # запрошенные id, которых нет в каталоге
+
+
+class FacetValue(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min: Decimal
+    max: Optional[Decimal] = None  # None — без верхней границы
+    count: int
+
+
+class BookFacets(BaseModel):
+    total: int
+    genres: List[FacetValue]
+    publishers: List[FacetValue]
+    authors: List[FacetValue]
+    prices: List[PriceBucket]
@@ -0,0 +1,15 @@
+# app/schemas/search.py
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    kind: str  # book | author | genre
+    id: int
+    label: str
+
+
+class SuggestStats(BaseModel):
+    entries: int
+    entities: int
+    bytes: int
+    bytes_per_entry: int
@@ -1,32 +1,58 @@
 # app/services/admin_service.py
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models import Genre, Author, Publisher, User, Order
 from app.repositories import (
+    BookRepository,
     GenreRepository,
     AuthorRepository,
     PublisherRepository,
     UserRepository,
     OrderRepository,
 )
-from app.schemas.genre import GenreCreate, GenreUpdate
-from app.schemas.author import AuthorCreate, AuthorUpdate
-from app.schemas.publisher import PublisherCreate, PublisherUpdate
+from app.schemas.genre import GenreCreate, GenreRead, GenreUpdate
+from app.schemas.author import AuthorCreate, AuthorRead, AuthorUpdate
+from app.schemas.publisher import PublisherCreate, PublisherRead, PublisherUpdate
+from app.services import (
+    auth_service,
+    book_fragments,
+    catalog_cache,
+    columnar_catalog,
+    principal_cache,
+    suggest_service,
+)
+
+
+def _dict_page(kind: str, repo, schema, **params) -> Tuple[list, int, Optional[str]]:
+    """Страница справочника через кэш каталога: (элементы, всего, курсор дальше)."""
+    def load():
+        rows, total, next_cursor = repo.list_page(**params)
+        return [schema.model_validate(obj) for obj in rows], total, next_cursor
+
+    return catalog_cache.cached(kind, params, load)
 
 
 # --- ЖАНРЫ ---
 
 
-def list_genres(db: Session) -> List[Genre]:
-    repo = GenreRepository(db)
-    return repo.list_all()
+def list_genres(
+    db: Session,
+    q: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[GenreRead], int, Optional[str]]:
+    return _dict_page("genres", GenreRepository(db), GenreRead, q=q, limit=limit, cursor=cursor)
 
 
 def create_genre(db: Session, data: GenreCreate) -> Genre:
     repo = GenreRepository(db)
-    return repo.create(data.model_dump())
+    genre = repo.create(data.model_dump())
+    catalog_cache.bump(db, catalog_cache.GENRES)
+    suggest_service.index_entries([("genre", genre.genre_id, genre.name)])
+    return genre
 
 
 def update_genre(db: Session, genre_id: int, data: GenreUpdate) -> Optional[Genre]:
@@ -35,6 +61,10 @@ def update_genre(db: Session, genre_id: int, data: GenreUpdate) -> Optional[Genr
     if not genre:
         return None
     updated = repo.update(genre, data.model_dump(exclude_unset=True))
+    catalog_cache.bump(db, catalog_cache.GENRES)
+    book_fragments.names_changed()
+    columnar_catalog.names_changed()
+    suggest_service.index_entries([("genre", updated.genre_id, updated.name)])
     return updated
 
 
@@ -44,20 +74,36 @@ def delete_genre(db: Session, genre_id: int) -> bool:
     if not genre:
         return False
     repo.delete(genre)
+    catalog_cache.bump(db, catalog_cache.GENRES)
+    book_fragments.names_changed()
+    columnar_catalog.names_changed()
+    suggest_service.remove_entries("genre", [genre_id])
     return True
 
 
 # --- АВТОРЫ ---
 
 
-def list_authors(db: Session) -> List[Author]:
-    repo = AuthorRepository(db)
-    return repo.list_all()
+def list_authors(
+    db: Session,
+    q: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[AuthorRead], int, Optional[str]]:
+    return _dict_page("authors", AuthorRepository(db), AuthorRead, q=q, limit=limit, cursor=cursor)
 
 
 def create_author(db: Session, data: AuthorCreate) -> Author:
     repo = AuthorRepository(db)
-    return repo.create(data.model_dump())
+    try:
+        author = repo.create(data.model_dump())
+    except IntegrityError:
+        # ФИО авторов уникальны: по ним книги связываются с авторами
+        db.rollback()
+        raise ValueError("Author with this name already exists")
+    catalog_cache.bump(db, catalog_cache.AUTHORS)
+    suggest_service.index_entries([("author", author.author_id, author.full_name)])
+    return author
 
 
 def update_author(db: Session, author_id: int, data: AuthorUpdate) -> Optional[Author]:
@@ -65,7 +111,19 @@ def update_author(db: Session, author_id: int, data: AuthorUpdate) -> Optional[A
     author = repo.get_by_id(author_id)
     if not author:
         return None
-    updated = repo.update(author, data.model_dump(exclude_unset=True))
+    try:
+        updated = repo.update(author, data.model_dump(exclude_unset=True))
+    except IntegrityError:
+        # ФИО авторов уникальны: по ним книги связываются с авторами
+        db.rollback()
+        raise ValueError("Author with this name already exists")
+    # ФИО автора входит в поисковый индекс его книг
+    BookRepository(db).sync_search_index(list(updated.books))
+    db.commit()
+    catalog_cache.bump(db, catalog_cache.AUTHORS)
+    suggest_service.index_entries([("author", updated.author_id, updated.full_name)])
+    book_fragments.names_changed()
+    columnar_catalog.names_changed()
     return updated
 
 
@@ -74,21 +132,35 @@ def delete_author(db: Session, author_id: int) -> bool:
     author = repo.get_by_id(author_id)
     if not author:
         return False
+    books = list(author.books)
+    book_ids = [book.book_id for book in books]
     repo.delete(author)
+    BookRepository(db).sync_search_index(books)
+    db.commit()
+    catalog_cache.bump(db, catalog_cache.AUTHORS)
+    suggest_service.remove_entries("author", [author_id])
+    book_fragments.invalidate(book_ids)
+    columnar_catalog.refresh_books(db, book_ids)
     return True
 
 
 # --- ИЗДАТЕЛЬСТВА ---
 
 
-def list_publishers(db: Session) -> List[Publisher]:
-    repo = PublisherRepository(db)
-    return repo.list_all()
+def list_publishers(
+    db: Session,
+    q: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[PublisherRead], int, Optional[str]]:
+    return _dict_page("publishers", PublisherRepository(db), PublisherRead, q=q, limit=limit, cursor=cursor)
 
 
 def create_publisher(db: Session, data: PublisherCreate) -> Publisher:
     repo = PublisherRepository(db)
-    return repo.create(data.model_dump())
+    publisher = repo.create(data.model_dump())
+    catalog_cache.bump(db, catalog_cache.PUBLISHERS)
+    return publisher
 
 
 def update_publisher(
@@ -101,6 +173,9 @@ def update_publisher(
     if not publisher:
         return None
     updated = repo.update(publisher, data.model_dump(exclude_unset=True))
+    catalog_cache.bump(db, catalog_cache.PUBLISHERS)
+    book_fragments.names_changed()
+    columnar_catalog.names_changed()
     return updated
 
 
@@ -110,6 +185,9 @@ def delete_publisher(db: Session, publisher_id: int) -> bool:
     if not publisher:
         return False
     repo.delete(publisher)
+    catalog_cache.bump(db, catalog_cache.PUBLISHERS)
+    book_fragments.names_changed()
+    columnar_catalog.names_changed()
     return True
 
 
@@ -126,9 +204,14 @@ def set_user_admin(db: Session, user_id: int, is_admin: bool) -> Optional[User]:
     user = repo.get_by_id(user_id)
     if not user:
         return None
+    demoted = user.is_admin and not is_admin
     user.is_admin = is_admin
     db.add(user)
     db.commit()
+    principal_cache.invalidate(user.email)
+    if demoted:
+        # токены, выданные администратору, больше не действуют ни в одном воркере
+        auth_service.revoke_user_sessions(db, user.user_id)
     db.refresh(user)
     return user
 
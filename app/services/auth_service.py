@@ -1,32 +1,39 @@
 # app/services/auth_service.py
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.models import User
-from app.repositories import UserRepository
-from app.schemas.auth import TokenData
-
-pwd_context = CryptContext(
-    schemes=["pbkdf2_sha256", "bcrypt"],
-    deprecated="auto",
-    default="pbkdf2_sha256",
+from app import passwords
+from app.cache import TTLCache
+from app.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ALGORITHM,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    SECRET_KEY,
+    TOKEN_CACHE_MAXSIZE,
 )
+from app.models import User
+from app.repositories import RefreshTokenRepository, UserRepository
+from app.schemas.auth import Token, TokenData
+from app.services import token_revocation
 
 
 # --- Работа с паролем ---
+# хэши считаются в пуле процессов (app.passwords); при переполнении пула
+# поднимается passwords.PasswordHashingBusy — API отвечает 503
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return passwords.get_password_hash(password)
 
 
 # --- JWT ---
@@ -44,17 +51,104 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[TokenData]:
+# Проверенные токены: браузер шлёт один и тот же токен сотни раз, а проверка
+# подписи и разбор claims — самая дорогая часть аутентификации запроса.
+# Ключ — sha256 токена (сами токены в памяти не держим), запись живёт до exp.
+# Невалидные токены не кэшируются.
+verified_tokens = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def _decode(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        return TokenData(email=email)
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
 
 
+def decode_access_token(token: str) -> Optional[TokenData]:
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    token_data = verified_tokens.get(key)
+    if token_data is None:
+        payload = _decode(token)
+        if payload is None or payload.get("sub") is None:
+            return None
+        token_data = TokenData(email=payload["sub"], sid=payload.get("sid"))
+        exp = payload.get("exp")
+        if exp is not None:
+            remaining = exp - time.time()
+            if remaining > 0:
+                verified_tokens.set(key, token_data, ttl=remaining)
+    # отзыв проверяется и для токенов из кэша: сессию могли закрыть позже
+    if token_data.sid is not None and token_revocation.is_revoked(token_data.sid):
+        return None
+    return token_data
+
+
+# --- Сессии (refresh-токены) ---
+# refresh-токен — случайная строка, в БД хранится её sha256; access-токены
+# сессии несут её id (sid) и отзываются вместе с ней (token_revocation)
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _session_token(user: User, session_id: int, refresh_token: str) -> Token:
+    access_token = create_access_token(data={"sub": user.email, "sid": session_id})
+    return Token(access_token=access_token, refresh_token=refresh_token)
+
+
+def create_session(db: Session, user: User) -> Token:
+    """Новая сессия после входа: пара access- и refresh-токена."""
+    refresh_token = secrets.token_urlsafe(32)
+    session = RefreshTokenRepository(db).create(
+        {
+            "user_id": user.user_id,
+            "token_hash": _hash_token(refresh_token),
+            "expires_at": datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        }
+    )
+    return _session_token(user, session.token_id, refresh_token)
+
+
+def refresh_session(db: Session, refresh_token: str) -> Optional[Token]:
+    """Новый access-токен по refresh-токену; None — сессия истекла, отозвана или не найдена."""
+    session = RefreshTokenRepository(db).get_by_hash(_hash_token(refresh_token))
+    if session is None or session.revoked_at is not None:
+        return None
+    if token_revocation.as_utc(session.expires_at) <= datetime.now(timezone.utc):
+        return None
+    user = UserRepository(db).get_by_id(session.user_id)
+    if user is None:
+        return None
+    return _session_token(user, session.token_id, refresh_token)
+
+
+def _revoke(repo: RefreshTokenRepository, session) -> None:
+    if session is None or session.revoked_at is not None:
+        return
+    repo.update(session, {"revoked_at": datetime.now(timezone.utc)})
+    token_revocation.add([(session.token_id, session.expires_at)])
+
+
+def revoke_session(db: Session, session_id: int) -> None:
+    """Выход: сессия и все её access-токены больше не действуют."""
+    repo = RefreshTokenRepository(db)
+    _revoke(repo, repo.get(session_id))
+
+
+def revoke_refresh_token(db: Session, refresh_token: str) -> None:
+    """Выход по refresh-токену; неизвестный токен молча игнорируется."""
+    repo = RefreshTokenRepository(db)
+    _revoke(repo, repo.get_by_hash(_hash_token(refresh_token)))
+
+
+def revoke_user_sessions(db: Session, user_id: int) -> None:
+    """Закрывает все сессии пользователя (например, при снятии прав)."""
+    entries = RefreshTokenRepository(db).revoke_for_user(user_id, datetime.now(timezone.utc))
+    token_revocation.add(entries)
+
+
 # --- Работа с пользователями ---
 
 
@@ -0,0 +1,93 @@
+# app/services/book_fragments.py
+"""Готовые JSON-фрагменты книг: списки собираются без Pydantic.
+
+Фрагмент — байты BookRead одной книги в JSON. Ключ — (book_id, поколение
+справочников). Пути записи каталога вытесняют фрагменты изменённых книг
+(invalidate); загрузка, начатая до записи, свой результат не кладёт — иначе
+вытесненная версия вернулась бы в кэш. Поколение справочников поднимается
+при переименовании/удалении жанров, авторов и издательств — их названия
+входят в книгу, и фрагменты прежнего поколения просто перестают находиться.
+
+Ответ со страницей книг — конкатенация фрагментов: на попаданиях модели
+не создаются и ничего не сериализуется заново. Как и кэш каталога,
+фрагменты свои в каждом воркере и живут не дольше CATALOG_CACHE_TTL.
+"""
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List
+
+from app.cache import TTLCache
+from app.config import BOOK_FRAGMENTS_MAXSIZE, CATALOG_CACHE_TTL
+from app.schemas.book import BookRead
+
+fragments = TTLCache(maxsize=BOOK_FRAGMENTS_MAXSIZE, ttl=CATALOG_CACHE_TTL)
+
+_lock = threading.Lock()
+_names_generation = 0
+# общий счётчик записей: загрузка, начатая до записи, не кладёт фрагменты
+_writes = 0
+
+
+def dump(book: BookRead) -> bytes:
+    return book.model_dump_json().encode("utf-8")
+
+
+def _key(book_id: int) -> Hashable:
+    return book_id, _names_generation
+
+
+def stamp() -> int:
+    """Отметка перед чтением из БД; см. store_many."""
+    return _writes
+
+
+def store_many(books: Iterable[BookRead], since: int) -> None:
+    """Кладёт фрагменты книг, прочитанных после отметки `since`, если с тех
+    пор не было записей (иначе прочитанное могло устареть)."""
+    with _lock:
+        if _writes != since:
+            return
+        for book in books:
+            fragments.set(_key(book.book_id), dump(book))
+
+
+def render(
+        book_ids: List[int],
+        load_missing: Callable[[List[int]], Dict[int, bytes]],
+) -> bytes:
+    """JSON-массив книг в порядке `book_ids`; промахи — через `load_missing`.
+
+    Загруженное кладётся в кэш, только если за время загрузки не было записей
+    каталога (как в store_many).
+    """
+    with _lock:
+        keys = [_key(book_id) for book_id in book_ids]
+        since = _writes
+    parts = [fragments.get(key) for key in keys]
+    missing = [book_id for book_id, part in zip(book_ids, parts) if part is None]
+    if missing:
+        loaded = load_missing(missing)
+        with _lock:
+            fresh = _writes == since
+            for i, (book_id, part) in enumerate(zip(book_ids, parts)):
+                if part is None and book_id in loaded:
+                    parts[i] = loaded[book_id]
+                    if fresh:
+                        fragments.set(keys[i], parts[i])
+    return b"[" + b",".join(part for part in parts if part is not None) + b"]"
+
+
+def invalidate(book_ids: Iterable[int]) -> None:
+    """Книги изменились или удалены (вызывается из путей записи каталога)."""
+    global _writes
+    with _lock:
+        _writes += 1
+        for book_id in book_ids:
+            fragments.pop(_key(book_id))
+
+
+def names_changed() -> None:
+    """Переименован или удалён жанр/автор/издательство."""
+    global _names_generation, _writes
+    with _lock:
+        _writes += 1
+        _names_generation += 1
@@ -16,8 +16,17 @@ def _get_or_create_cart(db: Session, user_id: int) -> Cart:
     return cart
 
 
+def _load_cart_for_read(db: Session, user_id: int) -> Optional[Cart]:
+    # корзина для ответа: книги позиций сразу со всеми связями для BookRead
+    repo = CartRepository(db)
+    return repo.get_cart_by_user(user_id, profile="cart")
+
+
 def get_cart(db: Session, user_id: int) -> Cart:
-    return _get_or_create_cart(db, user_id)
+    cart = _load_cart_for_read(db, user_id)
+    if not cart:
+        cart = _get_or_create_cart(db, user_id)
+    return cart
 
 
 def add_item_to_cart(
@@ -28,8 +37,7 @@ def add_item_to_cart(
     cart = _get_or_create_cart(db, user_id)
     repo = CartRepository(db)
     repo.add_item(cart, book_id=item_in.book_id, quantity=item_in.quantity)
-    db.refresh(cart)
-    return cart
+    return _load_cart_for_read(db, user_id)
 
 
 def update_cart_item(
@@ -56,8 +64,7 @@ def update_cart_item(
         return None
 
     repo.update_item_quantity(item, item_in.quantity)
-    db.refresh(cart)
-    return cart
+    return _load_cart_for_read(db, user_id)
 
 
 def remove_cart_item(
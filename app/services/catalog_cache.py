@@ -0,0 +1,164 @@
+# app/services/catalog_cache.py
+"""Read-through кэш чтений каталога.
+
+Ключ — вид чтения + нормализованные параметры + версии разделов каталога,
+от которых это чтение зависит. Любая запись в раздел поднимает его версию,
+и все зависящие записи кэша перестают находиться (и вытесняются по LRU/TTL).
+Версии кэша живут внутри процесса. Пути записи вызывают bump: он, кроме
+того, поднимает общие версии в таблице catalog_versions. Из общих версий
+строятся ETag (shared_versions); воркер сверяет их с БД не чаще раза
+в CATALOG_VERSION_CHECK_INTERVAL и, увидев чужую запись, сбрасывает свой
+кэш по этому разделу. Чтения без сверки (без ETag) видят чужие записи не
+позже, чем через CATALOG_CACHE_TTL.
+
+Промахи по одному ключу схлопываются: пока одно вычисление в полёте,
+остальные одинаковые запросы ждут его результата, а не идут в БД.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.cache import SingleFlight, TTLCache
+from app.config import CATALOG_CACHE_MAXSIZE, CATALOG_CACHE_TTL, CATALOG_VERSION_CHECK_INTERVAL
+from app.repositories import CatalogVersionRepository
+
+BOOKS = "books"
+GENRES = "genres"
+AUTHORS = "authors"
+PUBLISHERS = "publishers"
+
+# книга в ответе содержит названия жанра, издательства и ФИО авторов
+DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "books": (BOOKS, GENRES, AUTHORS, PUBLISHERS),
+    "book_ids": (BOOKS, GENRES, AUTHORS, PUBLISHERS),
+    "book": (BOOKS, GENRES, AUTHORS, PUBLISHERS),
+    "facets": (BOOKS, GENRES, AUTHORS, PUBLISHERS),
+    # отрендеренные на сервере фрагменты страниц (page_service)
+    "index_page": (BOOKS, GENRES, AUTHORS, PUBLISHERS),
+    "book_page": (BOOKS, GENRES, AUTHORS, PUBLISHERS),
+    "genres": (GENRES,),
+    "authors": (AUTHORS,),
+    "publishers": (PUBLISHERS,),
+}
+
+cache = TTLCache(maxsize=CATALOG_CACHE_MAXSIZE, ttl=CATALOG_CACHE_TTL)
+flights = SingleFlight()
+
+_MISSING = object()
+
+_versions: Dict[str, int] = {BOOKS: 0, GENRES: 0, AUTHORS: 0, PUBLISHERS: 0}
+_versions_lock = threading.Lock()
+
+# общие версии (catalog_versions), как их видел этот процесс при последней сверке
+_shared: Dict[str, int] = {}
+_shared_lock = threading.Lock()
+_next_shared_check = 0.0
+
+
+def normalize_params(params: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Параметры запроса в виде ключа: без пустых значений и в стабильном порядке."""
+    return tuple(sorted((k, v) for k, v in params.items() if v is not None))
+
+
+def versions_for(kind: str) -> Tuple[int, ...]:
+    return tuple(_versions[section] for section in DEPENDENCIES[kind])
+
+
+def make_key(kind: str, params: Dict[str, Any]) -> Hashable:
+    return kind, versions_for(kind), normalize_params(params)
+
+
+def cached(kind: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+    """Значение из кэша или результат `compute()`, который кладётся в кэш.
+
+    `compute` должен возвращать данные, не привязанные к сессии БД
+    (Pydantic-схемы, словари), — они переживают запрос.
+    """
+    # версия читается до вычисления: запись, закоммиченная во время
+    # вычисления, поднимет версию, и устаревший результат не будет найден
+    key = make_key(kind, params)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = flights.do(key, lambda: _load(key, compute))
+    return value
+
+
+def cached_many(
+    kind: str,
+    params_list: List[Dict[str, Any]],
+    compute_missing: Callable[[List[int]], List[Any]],
+) -> List[Any]:
+    """Пакетный вариант cached: промахи вычисляются одним вызовом.
+
+    `compute_missing` получает индексы промахнувшихся параметров и возвращает
+    значения для них в том же порядке.
+    """
+    keys = [make_key(kind, params) for params in params_list]
+    values = [cache.get(key, _MISSING) for key in keys]
+    missing = [i for i, value in enumerate(values) if value is _MISSING]
+    if missing:
+        for i, value in zip(missing, compute_missing(missing)):
+            cache.set(keys[i], value)
+            values[i] = value
+    return values
+
+
+async def cached_async(kind: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+    """cached для async-кода: попадание — без потока, вычисление и ожидание чужого — в потоке."""
+    key = make_key(kind, params)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = await flights.do_async(key, lambda: _load(key, compute))
+    return value
+
+
+def _load(key: Hashable, compute: Callable[[], Any]) -> Any:
+    # предыдущий лидер мог успеть положить значение, пока мы шли сюда
+    value = cache.peek(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value)
+    return value
+
+
+def invalidate(*sections: str) -> None:
+    """Сбрасывает кэш процесса по разделам (версии внутри процесса)."""
+    with _versions_lock:
+        for section in sections:
+            _versions[section] += 1
+
+
+def bump(db: Session, *sections: str) -> None:
+    """Запись в разделы каталога (после коммита): общие версии в БД и кэш процесса."""
+    global _next_shared_check
+    # своя транзакция: коммит не сбрасывает объекты сессии, которая писала
+    with Session(bind=db.get_bind()) as session:
+        CatalogVersionRepository(session).bump(sections)
+    invalidate(*sections)
+    # своя запись должна сразу попасть в ETag
+    _next_shared_check = 0.0
+
+
+def shared_versions(db: Session, kind: str) -> Tuple[int, ...]:
+    """Общие для воркеров версии разделов, от которых зависит чтение `kind`."""
+    global _shared, _next_shared_check
+    with _shared_lock:
+        if time.monotonic() >= _next_shared_check:
+            fresh = CatalogVersionRepository(db).get_versions(_versions)
+            changed = [section for section, version in fresh.items() if _shared.get(section) != version]
+            _shared = fresh
+            _next_shared_check = time.monotonic() + CATALOG_VERSION_CHECK_INTERVAL
+            # чужая запись: кэш процесса по разделу устарел, иначе под новым
+            # ETag ушёл бы старый ответ
+            invalidate(*changed)
+        return tuple(_shared[section] for section in DEPENDENCIES[kind])
+
+
+def stats() -> Dict[str, Any]:
+    data = cache.stats()
+    data["in_flight"] = flights.in_flight()
+    data["versions"] = dict(_versions)
+    data["shared_versions"] = dict(_shared)
+    return data
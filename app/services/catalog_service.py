@@ -1,16 +1,19 @@
 # app/services/catalog_service.py
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
-from app.models import Book, Author
+from app.models import Book
 from app.repositories import (
     AuthorRepository,
     BookRepository,
     GenreRepository,
     PublisherRepository,
 )
-from app.schemas.book import BookCreate, BookUpdate
+from app.schemas.book import BookCreate, BookRead, BookUpdate, sparse_book_schema
+from app.services import book_fragments, catalog_cache, columnar_catalog, suggest_service
 
 
 def list_books(
@@ -25,6 +28,7 @@ def list_books(
     max_price: Optional[float] = None,
     min_year: Optional[int] = None,
     max_year: Optional[int] = None,
+    fuzzy: bool = False,
     order_by: Optional[str] = None,
 ) -> List[Book]:
     repo = BookRepository(db)
@@ -39,149 +43,303 @@ def list_books(
         max_price=max_price,
         min_year=min_year,
         max_year=max_year,
+        fuzzy=fuzzy,
         order_by=order_by,
     )
 
 
+def list_books_page(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    q: Optional[str] = None,
+    genre_id: Optional[int] = None,
+    author_id: Optional[int] = None,
+    publisher_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    fuzzy: bool = False,
+    order_by: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[BookRead], Optional[str]]:
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "q": q,
+        "genre_id": genre_id,
+        "author_id": author_id,
+        "publisher_id": publisher_id,
+        "min_price": min_price,
+        "max_price": max_price,
+        "min_year": min_year,
+        "max_year": max_year,
+        "fuzzy": fuzzy,
+        "order_by": order_by,
+        "cursor": cursor,
+    }
 
-def get_book(db: Session, book_id: int) -> Optional[Book]:
-    repo = BookRepository(db)
-    return repo.get_by_id(book_id)
+    def load() -> Tuple[List[BookRead], Optional[str]]:
+        if _columnar(params):
+            # фильтры и сортировка — по снимку в памяти, книги — из кэша
+            book_ids, next_cursor = _columnar_page(params)
+            books, _ = read_books(db, book_ids)
+            return books, next_cursor
+        books, next_cursor = BookRepository(db).list_books_page(**params)
+        return [BookRead.model_validate(book) for book in books], next_cursor
 
+    return catalog_cache.cached("books", params, load)
 
-def create_book(db: Session, book_in: BookCreate) -> Book:
+
+def _columnar(params: Dict) -> bool:
+    return not params["q"] and columnar_catalog.enabled()
+
+
+def _columnar_page(params: Dict) -> Tuple[List[int], Optional[str]]:
+    page_params = {k: v for k, v in params.items() if k not in ("q", "fuzzy")}
+    return columnar_catalog.catalog.page(**page_params)
+
+
+def list_books_page_json(db: Session, **params) -> Tuple[bytes, Optional[str]]:
+    """Как list_books_page, но сразу JSON-массив книг (из готовых фрагментов)
+    и курсор следующей страницы. Параметры — те же, все обязательны.
+    """
+
+    def load() -> Tuple[List[int], Optional[str]]:
+        if _columnar(params):
+            return _columnar_page(params)
+        since = book_fragments.stamp()
+        books, next_cursor = BookRepository(db).list_books_page(**params)
+        items = [BookRead.model_validate(book) for book in books]
+        # книги уже прочитаны — заодно прогреваем их фрагменты
+        book_fragments.store_many(items, since)
+        return [book.book_id for book in items], next_cursor
+
+    book_ids, next_cursor = catalog_cache.cached("book_ids", params, load)
+    return book_fragments.render(book_ids, lambda missing: _load_fragments(db, missing)), next_cursor
+
+
+def list_books_page_fields(
+    db: Session,
+    fields: Tuple[str, ...],
+    **params,
+) -> Tuple[bytes, Optional[str]]:
+    """Страница книг только с полями `fields` (JSON) и курсор следующей.
+
+    Из БД читаются только нужные колонки и связи; описание книги — лишь
+    если его запросили.
+    """
+    schema = sparse_book_schema(fields)
+    adapter = _list_adapter(schema)
+
+    def load() -> Tuple[bytes, Optional[str]]:
+        repo = BookRepository(db)
+        if _columnar(params):
+            book_ids, next_cursor = _columnar_page(params)
+            found = {book.book_id: book for book in repo.get_many(book_ids, fields=fields)}
+            books = [found[book_id] for book_id in book_ids if book_id in found]
+        else:
+            books, next_cursor = repo.list_books_page(fields=fields, **params)
+        items = adapter.validate_python(books, from_attributes=True)
+        return adapter.dump_json(items), next_cursor
+
+    return catalog_cache.cached("books", {**params, "fields": fields}, load)
+
+
+@lru_cache(maxsize=128)
+def _list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def _load_fragments(db: Session, book_ids: List[int]) -> Dict[int, bytes]:
+    found = {}
+    for book_id in book_ids:
+        # в общем снимке каталога JSON книги уже готов
+        data = columnar_catalog.book_json(book_id)
+        if data is not None:
+            found[book_id] = data
+    rest = [book_id for book_id in book_ids if book_id not in found]
+    if rest:
+        books, _ = read_books(db, rest)
+        found.update((book.book_id, book_fragments.dump(book)) for book in books)
+    return found
+
+
+def get_facets(
+    db: Session,
+    q: Optional[str] = None,
+    genre_id: Optional[int] = None,
+    author_id: Optional[int] = None,
+    publisher_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    fuzzy: bool = False,
+) -> Dict[str, list]:
+    params = {
+        "q": q,
+        "genre_id": genre_id,
+        "author_id": author_id,
+        "publisher_id": publisher_id,
+        "min_price": min_price,
+        "max_price": max_price,
+        "min_year": min_year,
+        "max_year": max_year,
+        "fuzzy": fuzzy,
+    }
+    return catalog_cache.cached(
+        "facets",
+        params,
+        lambda: BookRepository(db).facet_counts(**params),
+    )
+
+
+def get_book(db: Session, book_id: int, profile: Optional[str] = None) -> Optional[Book]:
     repo = BookRepository(db)
-    genre_repo = GenreRepository(db)
-    publisher_repo = PublisherRepository(db)
-    author_repo = AuthorRepository(db)
+    return repo.get_by_id(book_id, profile=profile)
+
+
+def read_book(db: Session, book_id: int) -> Optional[BookRead]:
+    """Книга для публичной выдачи (через кэш); None — книги нет."""
+
+    def load() -> Optional[BookRead]:
+        data = columnar_catalog.book_json(book_id)
+        if data is not None:
+            return BookRead.model_validate_json(data)
+        book = BookRepository(db).get_by_id(book_id, profile="detail")
+        return BookRead.model_validate(book) if book else None
+
+    return catalog_cache.cached("book", {"book_id": book_id}, load)
+
+
+def read_books(db: Session, book_ids: List[int]) -> Tuple[List[BookRead], List[int]]:
+    """Книги по списку id в порядке запроса и id, которых нет в каталоге.
+
+    Книги берутся из того же кэша, что и read_book; промахи — из общего
+    снимка каталога (если он включён), остальное догружается одним запросом.
+    """
+    book_ids = list(dict.fromkeys(book_ids))
+
+    def load(missing: List[int]) -> List[Optional[BookRead]]:
+        ids = [book_ids[i] for i in missing]
+        found = {}
+        for book_id in ids:
+            data = columnar_catalog.book_json(book_id)
+            if data is not None:
+                found[book_id] = BookRead.model_validate_json(data)
+        rest = [book_id for book_id in ids if book_id not in found]
+        if rest:
+            found.update(
+                (book.book_id, BookRead.model_validate(book))
+                for book in BookRepository(db).get_many(rest)
+            )
+        return [found.get(book_id) for book_id in ids]
+
+    books = catalog_cache.cached_many(
+        "book",
+        [{"book_id": book_id} for book_id in book_ids],
+        load,
+    )
+    items = [book for book in books if book is not None]
+    missing_ids = [book_id for book_id, book in zip(book_ids, books) if book is None]
+    return items, missing_ids
+
+
+def _invalidate_after_save(db: Session, book_in) -> None:
+    # новые жанр/издательство/авторы по названию меняют и справочники
+    sections = [catalog_cache.BOOKS]
+    if book_in.genre_name:
+        sections.append(catalog_cache.GENRES)
+    if book_in.publisher_name:
+        sections.append(catalog_cache.PUBLISHERS)
+    if book_in.author_names:
+        sections.append(catalog_cache.AUTHORS)
+    catalog_cache.bump(db, *sections)
+
+
+def _resolve_name(repo, name: Optional[str]) -> Optional[int]:
+    """id жанра/издательства по названию (создаётся при отсутствии); пустое — None."""
+    name = (name or "").strip()
+    if not name:
+        return None
+    return repo.get_or_create_many([name])[name]
 
+
+def _resolve_author_ids(db: Session, names: List[str]) -> List[int]:
+    """id авторов по именам в исходном порядке: один SELECT ... IN и одна
+    пакетная вставка недостающих, без коммита.
+    """
+    clean_names = [name for raw in names if (name := raw.strip())]
+    ids = AuthorRepository(db).get_or_create_many(clean_names)
+    return list(dict.fromkeys(ids[name] for name in clean_names))
+
+
+def create_book(db: Session, book_in: BookCreate) -> Book:
     data = book_in.model_dump(
         exclude={"author_ids", "author_names", "genre_name", "publisher_name"}
     )
 
-    genre_id = book_in.genre_id
-    if genre_id is None and book_in.genre_name:
-        name = book_in.genre_name.strip()
-        if name:
-            genre = genre_repo.get_by_name(name)
-            if not genre:
-                genre = genre_repo.create({"name": name})
-            genre_id = genre.genre_id
-
-    publisher_id = book_in.publisher_id
-    if publisher_id is None and book_in.publisher_name:
-        name = book_in.publisher_name.strip()
-        if name:
-            publisher = publisher_repo.get_by_name(name)
-            if not publisher:
-                publisher = publisher_repo.create({"name": name})
-            publisher_id = publisher.publisher_id
+    # названия справочников разрешаются в той же транзакции, что и книга:
+    # коммит один, и при ошибке сохранения новые записи тоже откатываются
+    if book_in.genre_id is None:
+        data["genre_id"] = _resolve_name(GenreRepository(db), book_in.genre_name)
+    if book_in.publisher_id is None:
+        data["publisher_id"] = _resolve_name(PublisherRepository(db), book_in.publisher_name)
 
     author_ids = list(book_in.author_ids or [])
-    for name in book_in.author_names:
-        clean_name = name.strip()
-        if not clean_name:
-            continue
-        author = author_repo.get_by_name(clean_name)
-        if not author:
-            author = author_repo.create({"full_name": clean_name})
-        author_ids.append(author.author_id)
-
-    data["genre_id"] = genre_id
-    data["publisher_id"] = publisher_id
-
-    book = repo.create_book(data)
-
-    if author_ids:
-        authors = (
-            db.query(Author)
-            .filter(Author.author_id.in_(author_ids))
-            .all()
-        )
-        book.authors = authors
-        db.add(book)
-        db.commit()
-        db.refresh(book)
+    author_ids += _resolve_author_ids(db, book_in.author_names)
 
+    book = BookRepository(db).create_book(data, author_ids)
+    _invalidate_after_save(db, book_in)
+    book_fragments.invalidate([book.book_id])
+    suggest_service.index_book(book)
+    columnar_catalog.refresh_books(db, [book.book_id])
     return book
 
 
 def update_book(db: Session, book: Book, book_in: BookUpdate) -> Book:
-    repo = BookRepository(db)
-    genre_repo = GenreRepository(db)
-    publisher_repo = PublisherRepository(db)
-    author_repo = AuthorRepository(db)
-
     data = book_in.model_dump(
         exclude_unset=True,
         exclude={"author_ids", "author_names", "genre_name", "publisher_name"},
     )
 
-    # жанр: либо по id, либо создаём/находим по названию
-    genre_id = None
-    if "genre_id" in book_in.model_fields_set:
-        genre_id = book_in.genre_id
+    # жанр/издательство: название, если передано, важнее id
     if book_in.genre_name is not None:
-        genre_name = book_in.genre_name.strip()
-        if genre_name:
-            genre = genre_repo.get_by_name(genre_name)
-            if not genre:
-                genre = genre_repo.create({"name": genre_name})
-            genre_id = genre.genre_id
-        else:
-            genre_id = None
-    if "genre_id" in book_in.model_fields_set or book_in.genre_name is not None:
-        data["genre_id"] = genre_id
-
-    # издательство: по id или названию
-    publisher_id = None
-    if "publisher_id" in book_in.model_fields_set:
-        publisher_id = book_in.publisher_id
+        data["genre_id"] = _resolve_name(GenreRepository(db), book_in.genre_name)
     if book_in.publisher_name is not None:
-        publisher_name = book_in.publisher_name.strip()
-        if publisher_name:
-            publisher = publisher_repo.get_by_name(publisher_name)
-            if not publisher:
-                publisher = publisher_repo.create({"name": publisher_name})
-            publisher_id = publisher.publisher_id
-        else:
-            publisher_id = None
-    if "publisher_id" in book_in.model_fields_set or book_in.publisher_name is not None:
-        data["publisher_id"] = publisher_id
-
-    # остальные поля
-    if data:
-        book = repo.update_book(book, data)
+        data["publisher_id"] = _resolve_name(PublisherRepository(db), book_in.publisher_name)
 
     # авторы: по id или по списку имён
-    new_author_ids = None
+    author_ids = None
     if book_in.author_ids is not None:
-        new_author_ids = list(book_in.author_ids)
+        author_ids = list(book_in.author_ids)
     elif book_in.author_names is not None:
-        new_author_ids = []
-        for name in book_in.author_names:
-            clean_name = name.strip()
-            if not clean_name:
-                continue
-            author = author_repo.get_by_name(clean_name)
-            if not author:
-                author = author_repo.create({"full_name": clean_name})
-            new_author_ids.append(author.author_id)
-
-    if new_author_ids is not None:
-        authors = (
-            db.query(Author)
-            .filter(Author.author_id.in_(new_author_ids))
-            .all()
-        )
-        book.authors = authors
-        db.add(book)
-        db.commit()
-        db.refresh(book)
+        author_ids = _resolve_author_ids(db, book_in.author_names)
 
+    book = BookRepository(db).update_book(book, data, author_ids)
+    _invalidate_after_save(db, book_in)
+    book_fragments.invalidate([book.book_id])
+    suggest_service.index_book(book)
+    columnar_catalog.refresh_books(db, [book.book_id])
     return book
 
 
 def delete_book(db: Session, book: Book) -> None:
     repo = BookRepository(db)
+    book_id = book.book_id
     repo.delete_book(book)
+    catalog_cache.bump(db, catalog_cache.BOOKS)
+    book_fragments.invalidate([book_id])
+    suggest_service.remove_entries("book", [book_id])
+    columnar_catalog.remove_books([book_id])
+
+
+def set_book_cover(db: Session, book: Book, cover_image: str) -> Book:
+    repo = BookRepository(db)
+    book = repo.update(book, {"cover_image": cover_image})
+    catalog_cache.bump(db, catalog_cache.BOOKS)
+    book_fragments.invalidate([book.book_id])
+    columnar_catalog.refresh_books(db, [book.book_id])
+    return book
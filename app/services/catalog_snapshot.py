@@ -0,0 +1,409 @@
+# app/services/catalog_snapshot.py
+"""Снимок каталога в файле, общий для всех воркеров (CATALOG_ENGINE=mmap).
+
+Колоночный снимок из columnar_catalog, но не в памяти каждого процесса,
+а в одном файле, который воркеры отображают через mmap только на чтение:
+страницы файла лежат в page cache ОС один раз на всю машину. Формат:
+
+    MAGIC | длина заголовка (u64) | заголовок JSON | секции, выровненные по 8
+
+Секции — массивы фиксированной ширины (id, цена в копейках, год, жанр,
+издательство, ранги названий, пары автор—книга) и пары "смещения + блоб"
+для строк: названия и готовый JSON каждой книги (BookRead, с названиями
+жанра, издательства и авторов). Поэтому снимок отвечает и на списки
+GET /api/books/, и на карточку книги без обращений к БД.
+
+Файл неизменяем. После записи в каталог воркер, который её сделал, в фоне
+собирает новый файл из БД и переписывает файл версии CURRENT (имя текущего
+снимка); остальные воркеры не чаще CATALOG_SNAPSHOT_CHECK_INTERVAL смотрят
+на CURRENT и переотображают снимок. Пока новый снимок не готов, записавший
+воркер отвечает по затронутым книгам из БД, а чужие записи видны с той же
+задержкой, что и в кэше каталога.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import CATALOG_SNAPSHOT_CHECK_INTERVAL
+from app.database import SessionLocal
+from app.repositories import BookRepository
+from app.schemas.book import BookRead
+from app.services import catalog_cache
+from app.services.columnar_catalog import ColumnarCatalog, _Snapshot, np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: без межпроцессной блокировки
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BKSNAP1\0"
+VERSION_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+
+# пауза перед пересборкой: пачка записей подряд даёт один новый снимок
+REBUILD_DELAY = 0.5
+
+# имя секции -> dtype; порядок секций в файле — порядок здесь
+SECTIONS = {
+    "ids": "<i8",
+    "price": "<f8",
+    "year": "<f8",
+    "genre": "<i8",
+    "publisher": "<i8",
+    "title_ranks": "<f8",
+    "title_values": "<i8",  # строка-представитель каждого названия, по порядку названий
+    "pair_authors": "<i8",
+    "pair_books": "<i8",
+    "title_offsets": "<i8",
+    "title_blob": "u1",
+    "json_offsets": "<i8",
+    "json_blob": "u1",
+}
+
+
+def _blob(strings: List[bytes]):
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in strings], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(strings), dtype=np.uint8)
+
+
+def _title_ranks(titles: List[str]):
+    order = sorted(range(len(titles)), key=titles.__getitem__)
+    rank = np.empty(len(titles), dtype=np.float64)
+    values: List[int] = []
+    previous = None
+    for i in order:
+        if not values or titles[i] != previous:
+            values.append(i)
+            previous = titles[i]
+        rank[i] = len(values) - 1
+    return rank, np.array(values, dtype=np.int64)
+
+
+def write_snapshot(
+        path: str,
+        built_at: float,
+        books: List[BookRead],
+        pairs: List[Tuple[int, int]],
+) -> None:
+    """Пишет снимок из книг, упорядоченных по book_id, и пар (автор, книга)."""
+    titles = [book.title for book in books]
+    title_rank, title_values = _title_ranks(titles)
+    title_offsets, title_blob = _blob([t.encode("utf-8") for t in titles])
+    json_offsets, json_blob = _blob([book.model_dump_json().encode("utf-8") for book in books])
+    arrays = {
+        "ids": np.array([b.book_id for b in books], dtype=np.int64),
+        "price": np.array([int(b.price * 100) for b in books], dtype=np.float64),
+        "year": np.array(
+            [np.nan if b.publication_year is None else b.publication_year for b in books],
+            dtype=np.float64,
+        ),
+        "genre": np.array([b.genre_id or 0 for b in books], dtype=np.int64),
+        "publisher": np.array([b.publisher_id or 0 for b in books], dtype=np.int64),
+        "title_ranks": title_rank,
+        "title_values": title_values,
+        "pair_authors": np.array([a for a, _ in pairs], dtype=np.int64),
+        "pair_books": np.array([b for _, b in pairs], dtype=np.int64),
+        "title_offsets": title_offsets,
+        "title_blob": title_blob,
+        "json_offsets": json_offsets,
+        "json_blob": json_blob,
+    }
+
+    # смещения секций зависят от длины заголовка, а она — от смещений;
+    # считаем от конца заголовка с запасом под разрядность чисел
+    layout: Dict[str, list] = {}
+    header_size = 0
+    while True:
+        offset = _align(len(MAGIC) + 8 + header_size)
+        for name, dtype in SECTIONS.items():
+            layout[name] = [offset, dtype, len(arrays[name])]
+            offset = _align(offset + arrays[name].nbytes)
+        header = json.dumps(
+            {"built_at": built_at, "books": len(books), "sections": layout}
+        ).encode("utf-8")
+        if len(header) <= header_size:
+            break
+        header_size = len(header) + 64
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, (offset, dtype, _) in layout.items():
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(arrays[name].astype(dtype, copy=False).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class MappedSnapshot(_Snapshot):
+    """Снимок поверх mmap файла: массивы — представления NumPy без копий."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a catalog snapshot: {path}")
+        (header_size,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start: start + header_size])
+        self.path = path
+        self.built_at: float = header["built_at"]
+        for name, (offset, dtype, count) in header["sections"].items():
+            setattr(self, name, np.frombuffer(self._map, dtype=dtype, count=count, offset=offset))
+
+    def title_rank(self):
+        return self.title_ranks, self.title_values
+
+    def _title_position(self, value: str) -> Tuple[int, bool]:
+        # бинарный поиск по названиям-представителям: строки декодируются
+        # только на пути поиска, а не все сразу
+        lo, hi = 0, len(self.title_values)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.title(int(self.title_values[mid])) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo, lo < len(self.title_values) and self.title(int(self.title_values[lo])) == value
+
+    def _string(self, offsets, blob, i: int) -> bytes:
+        return blob[offsets[i]: offsets[i + 1]].tobytes()
+
+    def title(self, i: int) -> str:
+        return self._string(self.title_offsets, self.title_blob, i).decode("utf-8")
+
+    def position(self, book_id: int) -> Optional[int]:
+        pos = int(np.searchsorted(self.ids, book_id))
+        if pos < len(self.ids) and self.ids[pos] == book_id:
+            return pos
+        return None
+
+    def book_json(self, book_id: int) -> Optional[bytes]:
+        pos = self.position(book_id)
+        if pos is None:
+            return None
+        return self._string(self.json_offsets, self.json_blob, pos)
+
+    def nbytes(self) -> int:
+        return len(self._map)
+
+
+class MappedCatalog(ColumnarCatalog):
+    """Каталог поверх общего файла снимка в `directory`.
+
+    Записи каталога в этом процессе помечают книги "грязными" до снимка,
+    собранного позже записи: по ним fresh()/book_json() отправляют в БД.
+    """
+
+    def __init__(self, directory: str, check_interval: float = CATALOG_SNAPSHOT_CHECK_INTERVAL) -> None:
+        super().__init__()
+        self.directory = directory
+        self.check_interval = check_interval
+        self._checked = float("-inf")
+        self._version: Optional[Tuple[int, str]] = None
+        self._remap_lock = threading.Lock()
+        self._pending: Dict[int, float] = {}
+        self._stale_since: Optional[float] = None
+        self._changes = threading.Condition()
+        self._requested = 0
+        self._published = 0
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def version_path(self) -> str:
+        return os.path.join(self.directory, VERSION_FILE)
+
+    # --- чтение ---
+
+    def snapshot(self) -> Optional[MappedSnapshot]:
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            self._remap_if_changed()
+        return self._snapshot
+
+    def _remap_if_changed(self) -> None:
+        with self._remap_lock:
+            try:
+                mtime = os.stat(self.version_path).st_mtime_ns
+                if self._version and self._version[0] == mtime:
+                    return
+                with open(self.version_path, encoding="utf-8") as f:
+                    name = f.read().strip()
+                if self._version and self._version[1] == name:
+                    self._version = (mtime, name)
+                    return
+                snapshot = MappedSnapshot(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # снимка ещё нет или CURRENT сменился между чтениями — проверим позже
+                return
+            self._version = (mtime, name)
+            self._install(snapshot)
+
+    def _install(self, snapshot: MappedSnapshot) -> None:
+        with self._changes:
+            built_at = snapshot.built_at
+            self._pending = {i: t for i, t in self._pending.items() if t >= built_at}
+            if self._stale_since is not None and self._stale_since < built_at:
+                self._stale_since = None
+            # старое отображение закроется, когда на него не останется ссылок
+            self._snapshot = snapshot
+        # снимок мог собрать другой воркер: его записи этот процесс не видел
+        catalog_cache.invalidate(
+            catalog_cache.BOOKS,
+            catalog_cache.GENRES,
+            catalog_cache.AUTHORS,
+            catalog_cache.PUBLISHERS,
+        )
+
+    def fresh(self) -> bool:
+        return not self._pending and self._stale_since is None
+
+    def book_json(self, book_id: int) -> Optional[bytes]:
+        snapshot = self.snapshot()
+        if snapshot is None or self._stale_since is not None or book_id in self._pending:
+            return None
+        return snapshot.book_json(book_id)
+
+    def stats(self) -> Dict[str, int]:
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return {"books": 0, "bytes": 0}
+        return {"books": len(snapshot), "bytes": snapshot.nbytes()}
+
+    # --- запись ---
+
+    def rebuild(self, db: Session) -> None:
+        """При старте: подключает готовый снимок или собирает первый."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._remap_if_changed()
+        if self._snapshot is None:
+            self.publish(db, only_if_missing=True)
+
+    def publish(self, db: Session, only_if_missing: bool = False) -> None:
+        """Собирает снимок из БД, делает его текущим и отображает у себя."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._file_lock():
+            # воркеры стартуют одновременно: первый соберёт, остальные подключат
+            if only_if_missing and os.path.exists(self.version_path):
+                path = None
+            else:
+                path = self._build(db)
+        self._checked = time.monotonic()
+        if path is None:
+            self._remap_if_changed()
+        else:
+            snapshot = MappedSnapshot(path)
+            with self._remap_lock:
+                self._version = (os.stat(self.version_path).st_mtime_ns, os.path.basename(path))
+                self._install(snapshot)
+
+    def _build(self, db: Session) -> str:
+        # отметка времени — до чтения БД: всё, что закоммичено раньше, в снимке
+        built_at = time.time()
+        books: List[BookRead] = []
+        pairs: List[Tuple[int, int]] = []
+        for book in BookRepository(db).iter_books(batch_size=5000):
+            books.append(BookRead.model_validate(book))
+            pairs += [(author.author_id, book.book_id) for author in book.authors]
+        name = f"catalog-{time.time_ns()}.snap"
+        path = os.path.join(self.directory, name)
+        write_snapshot(path + ".tmp", built_at, books, pairs)
+        os.replace(path + ".tmp", path)
+
+        version_tmp = f"{self.version_path}.{os.getpid()}.tmp"
+        with open(version_tmp, "w", encoding="utf-8") as f:
+            f.write(name)
+        os.replace(version_tmp, self.version_path)
+        self._cleanup(keep=name)
+        return path
+
+    def _cleanup(self, keep: str) -> None:
+        # удаляем всё, кроме нового и предыдущего снимков: уже отображённые
+        # файлы остаются доступны воркерам и после удаления (POSIX)
+        snapshots = sorted(
+            n for n in os.listdir(self.directory)
+            if n.startswith("catalog-") and n.endswith(".snap") and n != keep
+        )
+        for name in snapshots[:-1]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def books_changed(self, db: Optional[Session], book_ids: List[int]) -> None:
+        self._mark_dirty(book_ids)
+
+    def books_removed(self, book_ids: List[int]) -> None:
+        self._mark_dirty(book_ids)
+
+    def names_changed(self) -> None:
+        self._mark_dirty(None)
+
+    def _mark_dirty(self, book_ids: Optional[List[int]]) -> None:
+        now = time.time()
+        with self._changes:
+            if book_ids is None:
+                self._stale_since = now
+            else:
+                for book_id in book_ids:
+                    self._pending[book_id] = now
+            self._requested += 1
+            self._changes.notify_all()
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="catalog-snapshot", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._changes:
+                self._changes.wait_for(lambda: self._requested > self._published)
+            time.sleep(REBUILD_DELAY)
+            with self._changes:
+                target = self._requested
+            db = SessionLocal()
+            try:
+                self.publish(db)
+            except Exception:
+                # грязные книги так и читаются из БД; следующая запись повторит сборку
+                logger.exception("Catalog snapshot rebuild failed")
+            finally:
+                db.close()
+            with self._changes:
+                self._published = target
+                self._changes.notify_all()
+
+    def sync(self, timeout: Optional[float] = None) -> bool:
+        """Ждёт, пока будут опубликованы все записи, сделанные до вызова."""
+        with self._changes:
+            target = self._requested
+            return self._changes.wait_for(lambda: self._published >= target, timeout)
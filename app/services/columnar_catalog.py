@@ -0,0 +1,372 @@
+# app/services/columnar_catalog.py
+"""Колоночный снимок каталога в памяти для фильтрации и сортировки без SQL.
+
+Включается настройкой CATALOG_ENGINE=columnar и требует NumPy (в обязательные
+зависимости не входит; без него каталог работает через SQL). Снимок держит
+цену, год, жанр, издательство и авторство книг в массивах NumPy и отвечает
+на любые сочетания фильтров и order_by из BookRepository.list_books_page
+масками и argpartition/lexsort. Возвращает только id страницы — сами книги
+берутся через кэш каталога (catalog_service.read_books).
+
+Полнотекстовый и нечёткий поиск (q) остаются за SQL: их индексы живут в БД.
+Снимок неизменяем: запись собирает новый и подменяет ссылку, так что чтения
+идут без блокировок. Как и остальные кэши, он свой в каждом воркере; общий
+для всех воркеров снимок в файле (CATALOG_ENGINE=mmap) — в catalog_snapshot.
+"""
+import threading
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import CATALOG_ENGINE, CATALOG_SNAPSHOT_DIR
+from app.models import Book, BookAuthor
+from app.repositories.base import decode_cursor, encode_cursor
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+# order_by -> (колонка снимка, по убыванию); как ORDER_BY_COLUMNS в репозитории
+ORDER_BY_COLUMNS = {
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+    "year_asc": ("year", False),
+    "year_desc": ("year", True),
+    "title_asc": ("title", False),
+    "title_desc": ("title", True),
+}
+
+# (book_id, цена в копейках, год или None, genre_id, publisher_id, название)
+BookRow = Tuple[int, int, Optional[int], Optional[int], Optional[int], str]
+
+
+def available() -> bool:
+    return np is not None
+
+
+class _Snapshot:
+    """Колонки, упорядоченные по book_id, плюс пары (автор, книга)."""
+
+    def __init__(self, rows: Sequence[BookRow], pairs: Sequence[Tuple[int, int]]) -> None:
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        self.ids = ids[order]
+        self.price = np.array([r[1] for r in rows], dtype=np.float64)[order]
+        self.year = np.array(
+            [np.nan if r[2] is None else r[2] for r in rows], dtype=np.float64
+        )[order]
+        self.genre = np.array([r[3] or 0 for r in rows], dtype=np.int64)[order]
+        self.publisher = np.array([r[4] or 0 for r in rows], dtype=np.int64)[order]
+        self.titles = np.array([r[5] for r in rows], dtype=object)[order]
+        self.pair_authors = np.array([a for a, _ in pairs], dtype=np.int64)
+        self.pair_books = np.array([b for _, b in pairs], dtype=np.int64)
+        self._title_lock = threading.Lock()
+        self._title_rank = None
+        self._title_values = None
+
+    @classmethod
+    def from_arrays(cls, **columns) -> "_Snapshot":
+        snapshot = cls.__new__(cls)
+        snapshot.__dict__.update(columns)
+        snapshot._title_lock = threading.Lock()
+        snapshot._title_rank = None
+        snapshot._title_values = None
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def title_rank(self):
+        """Плотный ранг названия (равные названия — равный ранг) и
+        отсортированные уникальные названия. Считается при первом запросе
+        с сортировкой по названию после изменения снимка.
+        """
+        with self._title_lock:
+            if self._title_rank is None:
+                order = np.argsort(self.titles, kind="stable")
+                ordered = self.titles[order]
+                starts = np.ones(len(ordered), dtype=bool)
+                starts[1:] = ordered[1:] != ordered[:-1]
+                rank = np.empty(len(ordered), dtype=np.float64)
+                rank[order] = np.cumsum(starts) - 1
+                self._title_rank = rank
+                self._title_values = ordered[starts]
+            return self._title_rank, self._title_values
+
+    def column(self, name: str):
+        if name == "title":
+            return self.title_rank()[0]
+        return getattr(self, name)
+
+    def key_position(self, name: str, value: Any) -> float:
+        """Значение из курсора в координатах колонки снимка."""
+        if name == "price":
+            return float(int(Decimal(value) * 100))
+        if name == "year":
+            return float(value)
+        # название: позиция среди уникальных названий; если такого уже нет —
+        # точка между соседями, чтобы сравнение "строго после" осталось верным
+        pos, found = self._title_position(value)
+        return float(pos) if found else pos - 0.5
+
+    def _title_position(self, value: str) -> Tuple[int, bool]:
+        values = self.title_rank()[1]
+        pos = int(np.searchsorted(values, value, side="left"))
+        return pos, pos < len(values) and values[pos] == value
+
+    def title(self, i: int) -> str:
+        return self.titles[i]
+
+    def cursor_value(self, name: str, i: int) -> Any:
+        if name == "price":
+            return Decimal(int(self.price[i])).scaleb(-2)
+        if name == "year":
+            return None if np.isnan(self.year[i]) else int(self.year[i])
+        return self.title(i)
+
+
+class ColumnarCatalog:
+    def __init__(self) -> None:
+        self._snapshot: Optional[_Snapshot] = None
+        self._write_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.snapshot() is not None
+
+    def snapshot(self) -> Optional[_Snapshot]:
+        return self._snapshot
+
+    def fresh(self) -> bool:
+        """Отражает ли снимок все записи этого процесса (см. MappedCatalog)."""
+        return True
+
+    def book_json(self, book_id: int) -> Optional[bytes]:
+        """Готовый JSON книги из снимка; в памяти процесса книги не хранятся."""
+        return None
+
+    def rebuild(self, db: Session) -> None:
+        self.load(*_book_rows(db))
+
+    def books_changed(self, db: Session, book_ids: List[int]) -> None:
+        rows, pairs = _book_rows(db, book_ids)
+        found = {row[0] for row in rows}
+        self.replace_books(rows, pairs, removed=[i for i in book_ids if i not in found])
+
+    def books_removed(self, book_ids: List[int]) -> None:
+        self.replace_books([], [], removed=book_ids)
+
+    def names_changed(self) -> None:
+        """Переименованы жанры/авторы/издательства; названий снимок не хранит."""
+
+    def load(self, rows: Sequence[BookRow], pairs: Sequence[Tuple[int, int]]) -> None:
+        self._snapshot = _Snapshot(rows, pairs)
+
+    def replace_books(
+            self,
+            rows: Sequence[BookRow],
+            pairs: Sequence[Tuple[int, int]],
+            removed: Iterable[int] = (),
+    ) -> None:
+        """Заменяет/добавляет книги `rows` (с их авторами `pairs`) и удаляет `removed`."""
+        with self._write_lock:
+            old = self._snapshot
+            if old is None:
+                return
+            touched = np.array(
+                [r[0] for r in rows] + list(removed), dtype=np.int64
+            )
+            keep = ~np.isin(old.ids, touched)
+            keep_pairs = ~np.isin(old.pair_books, touched)
+            new = _Snapshot(rows, pairs)
+            ids = np.concatenate([old.ids[keep], new.ids])
+            order = np.argsort(ids, kind="stable")
+            self._snapshot = _Snapshot.from_arrays(
+                ids=ids[order],
+                price=np.concatenate([old.price[keep], new.price])[order],
+                year=np.concatenate([old.year[keep], new.year])[order],
+                genre=np.concatenate([old.genre[keep], new.genre])[order],
+                publisher=np.concatenate([old.publisher[keep], new.publisher])[order],
+                titles=np.concatenate([old.titles[keep], new.titles])[order],
+                pair_authors=np.concatenate([old.pair_authors[keep_pairs], new.pair_authors]),
+                pair_books=np.concatenate([old.pair_books[keep_pairs], new.pair_books]),
+            )
+
+    def page(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            genre_id: Optional[int] = None,
+            author_id: Optional[int] = None,
+            publisher_id: Optional[int] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            min_year: Optional[int] = None,
+            max_year: Optional[int] = None,
+            order_by: Optional[str] = None,
+            cursor: Optional[str] = None,
+    ) -> Tuple[List[int], Optional[str]]:
+        """id книг страницы и курсор следующей — с той же семантикой, что у
+        BookRepository.list_books_page (NULLS LAST, book_id вторым ключом).
+        """
+        snap = self.snapshot()
+        conditions = []
+        if genre_id:
+            conditions.append(snap.genre == genre_id)
+        if publisher_id:
+            conditions.append(snap.publisher == publisher_id)
+        if min_price is not None:
+            conditions.append(snap.price >= round(min_price * 100))
+        if max_price is not None:
+            conditions.append(snap.price <= round(max_price * 100))
+        if min_year is not None:
+            conditions.append(snap.year >= min_year)
+        if max_year is not None:
+            conditions.append(snap.year <= max_year)
+        if author_id:
+            conditions.append(
+                np.isin(snap.ids, snap.pair_books[snap.pair_authors == author_id])
+            )
+        if conditions:
+            idx = np.flatnonzero(np.logical_and.reduce(conditions))
+        else:
+            idx = np.arange(len(snap))
+
+        name, descending = ORDER_BY_COLUMNS.get(order_by, (None, False))
+        order_key = order_by if name is not None else None
+        offset = skip if not cursor and skip else 0
+        need = offset + limit + 1
+
+        if name is None:
+            # без сортировки — по book_id, а idx уже идёт по возрастанию
+            if cursor:
+                _, last_id = decode_cursor(cursor, None)
+                idx = idx[np.searchsorted(snap.ids[idx], last_id, side="right"):]
+            rows = idx[offset:need]
+        else:
+            # ключи сортировки в виде "чем меньше, тем раньше"; NULL — в хвост
+            sign = -1.0 if descending else 1.0
+            ids = snap.ids[idx] * (-1 if descending else 1)
+            primary = snap.column(name)[idx] * sign
+            primary[np.isnan(primary)] = np.inf
+
+            if cursor:
+                value, last_id = decode_cursor(cursor, order_key)
+                last_id = -last_id if descending else last_id
+                if value is None:
+                    after = (primary == np.inf) & (ids > last_id)
+                else:
+                    position = snap.key_position(name, value) * sign
+                    after = (primary > position) | ((primary == position) & (ids > last_id))
+                idx, ids, primary = idx[after], ids[after], primary[after]
+
+            if len(idx) > need:
+                # сначала грубо отбираем need лучших по первичному ключу
+                kth = np.partition(primary, need - 1)[need - 1]
+                top = primary <= kth
+                idx, ids, primary = idx[top], ids[top], primary[top]
+            rows = idx[np.lexsort((ids, primary))[offset:need]]
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more and len(rows):
+            last = int(rows[-1])
+            value = snap.cursor_value(name, last) if name is not None else None
+            next_cursor = encode_cursor(order_key, value, int(snap.ids[last]))
+        return [int(book_id) for book_id in snap.ids[rows]], next_cursor
+
+    def stats(self) -> Dict[str, int]:
+        """Число книг и память массивов (строки названий — только указатели)."""
+        snap = self.snapshot()
+        if snap is None:
+            return {"books": 0, "bytes": 0}
+        arrays = (snap.ids, snap.price, snap.year, snap.genre, snap.publisher,
+                  snap.pair_authors, snap.pair_books)
+        return {
+            "books": len(snap),
+            "bytes": sum(a.nbytes for a in arrays) + snap.titles.nbytes,
+        }
+
+
+def _make_catalog() -> ColumnarCatalog:
+    if CATALOG_ENGINE == "mmap":
+        # импорт здесь: catalog_snapshot сам строится поверх этого модуля
+        from app.services.catalog_snapshot import MappedCatalog
+
+        return MappedCatalog(CATALOG_SNAPSHOT_DIR)
+    return ColumnarCatalog()
+
+
+catalog = _make_catalog()
+
+
+def _active() -> bool:
+    return CATALOG_ENGINE in ("columnar", "mmap") and available() and catalog.ready
+
+
+def enabled() -> bool:
+    """Можно ли отвечать на выборки из снимка прямо сейчас."""
+    return _active() and catalog.fresh()
+
+
+def _book_rows(db: Session, book_ids: Optional[List[int]] = None):
+    query = select(
+        Book.book_id,
+        Book.price,
+        Book.publication_year,
+        Book.genre_id,
+        Book.publisher_id,
+        Book.title,
+    )
+    pairs_query = select(BookAuthor.author_id, BookAuthor.book_id)
+    if book_ids is not None:
+        query = query.where(Book.book_id.in_(book_ids))
+        pairs_query = pairs_query.where(BookAuthor.book_id.in_(book_ids))
+    rows = [
+        (book_id, int(price * 100), year, genre_id, publisher_id, title)
+        for book_id, price, year, genre_id, publisher_id, title in db.execute(
+            query.execution_options(yield_per=10000)
+        )
+    ]
+    pairs = db.execute(pairs_query.execution_options(yield_per=10000)).all()
+    return rows, pairs
+
+
+def rebuild(db: Session) -> None:
+    """Строит (или подключает общий) снимок при старте, если движок включён."""
+    if CATALOG_ENGINE not in ("columnar", "mmap") or not available():
+        return
+    catalog.rebuild(db)
+
+
+def refresh_books(db: Session, book_ids: Iterable[int]) -> None:
+    """Перечитывает из БД книги после записи (вызывается после коммита)."""
+    book_ids = list(book_ids)
+    if book_ids and _active():
+        catalog.books_changed(db, book_ids)
+
+
+def remove_books(book_ids: Iterable[int]) -> None:
+    book_ids = list(book_ids)
+    if book_ids and _active():
+        catalog.books_removed(book_ids)
+
+
+def publish(db: Session) -> None:
+    """Пересобирает общий файл снимка (для консольных команд)."""
+    if CATALOG_ENGINE == "mmap" and available():
+        catalog.publish(db)
+
+
+def names_changed() -> None:
+    """После правки справочников: названия входят в книги общего снимка."""
+    if _active():
+        catalog.names_changed()
+
+
+def book_json(book_id: int) -> Optional[bytes]:
+    return catalog.book_json(book_id) if _active() else None
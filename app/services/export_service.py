@@ -0,0 +1,89 @@
+# app/services/export_service.py
+"""Потоковая выгрузка каталога в NDJSON или CSV.
+
+Книги читаются пачками через BookRepository.iter_books и сразу отдаются
+клиенту, поэтому память не растёт с размером каталога. CSV совместим
+с форматом импорта (import_service).
+"""
+import csv
+import io
+from typing import Any, Dict, Iterator
+
+from app.database import SessionLocal
+from app.repositories import BookRepository
+from app.schemas.book import BookRead
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+CSV_COLUMNS = (
+    "book_id",
+    "title",
+    "description",
+    "price",
+    "publication_year",
+    "pages",
+    "isbn",
+    "cover_image",
+    "genre_name",
+    "publisher_name",
+    "author_names",
+)
+
+# сколько байт копить перед отправкой очередного куска ответа
+_FLUSH_SIZE = 64 * 1024
+
+
+def _iter_books(filters: Dict[str, Any], batch_size: int) -> Iterator[BookRead]:
+    # у потока своя сессия: генератор живёт дольше обработчика запроса
+    db = SessionLocal()
+    try:
+        for book in BookRepository(db).iter_books(batch_size=batch_size, **filters):
+            yield BookRead.model_validate(book)
+    finally:
+        db.close()
+
+
+def _buffered(pieces: Iterator[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    for piece in pieces:
+        buffer.write(piece)
+        if buffer.tell() >= _FLUSH_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_lines(filters: Dict[str, Any], batch_size: int) -> Iterator[str]:
+    for book in _iter_books(filters, batch_size):
+        yield book.model_dump_json() + "\n"
+
+
+def _csv_lines(filters: Dict[str, Any], batch_size: int) -> Iterator[str]:
+    line = io.StringIO()
+    writer = csv.writer(line)
+
+    def render(values) -> str:
+        line.seek(0)
+        line.truncate()
+        writer.writerow(values)
+        return line.getvalue()
+
+    yield render(CSV_COLUMNS)
+    for book in _iter_books(filters, batch_size):
+        data = book.model_dump()
+        data["author_names"] = ";".join(book.author_names)
+        yield render(["" if data[c] is None else data[c] for c in CSV_COLUMNS])
+
+
+def export_books(fmt: str, filters: Dict[str, Any], batch_size: int = 1000) -> Iterator[bytes]:
+    """Генератор кусков ответа в формате `fmt` (ndjson или csv)."""
+    if fmt == "ndjson":
+        return _buffered(_ndjson_lines(filters, batch_size))
+    if fmt == "csv":
+        return _buffered(_csv_lines(filters, batch_size))
+    raise ValueError(f"Unsupported export format: {fmt}")
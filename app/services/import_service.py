@@ -0,0 +1,333 @@
+# app/services/import_service.py
+"""Потоковый импорт каталога из CSV или JSON Lines.
+
+Строки читаются по одной и обрабатываются пачками по `chunk_size`: на пачку —
+по одному SELECT ... IN для жанров, издательств, авторов и ISBN, пакетные
+вставки/обновления книг и связей book_authors и один коммит. Книги с уже
+известным ISBN обновляются — только поля, заданные в строке (пустая ячейка
+CSV значения не задаёт), и авторы, если строка их перечисляет; остальные
+книги создаются. Ошибки валидации и БД
+собираются построчно и не прерывают импорт остальных строк.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.repositories import (
+    AuthorRepository,
+    BookRepository,
+    GenreRepository,
+    PublisherRepository,
+)
+from app.schemas.book import BookCreate
+from app.services import book_fragments, catalog_cache, columnar_catalog, suggest_service
+
+FORMATS = ("csv", "jsonl")
+
+# сколько ошибок держать в отчёте: файл может быть целиком битым
+MAX_REPORTED_ERRORS = 1000
+
+_BOOK_FIELDS = (
+    "title",
+    "description",
+    "price",
+    "publication_year",
+    "pages",
+    "isbn",
+    "cover_image",
+    "genre_id",
+    "publisher_id",
+)
+
+# (номер строки, данные строки или ошибка разбора)
+ParsedRow = Tuple[int, Any]
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def _split_names(value: Any) -> List[str]:
+    # в CSV авторы перечисляются через ";" или "|"
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [part for part in str(value).replace("|", ";").split(";")]
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    # номер строки считаем сами: после csv.Error line_num у reader отстаёт
+    line_num = 0
+
+    def counted() -> Iterator[str]:
+        nonlocal line_num
+        for line in lines:
+            line_num += 1
+            yield line
+
+    reader = csv.DictReader(counted())
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # битая строка — ошибка этой строки, а не всего импорта
+            yield line_num, ValueError(f"Invalid CSV: {e}")
+            continue
+        # пустая ячейка — значения нет: при обновлении по ISBN поле не трогается
+        data = {key: value for key, value in row.items() if key and value not in ("", None)}
+        if "author_names" in data:
+            data["author_names"] = _split_names(data["author_names"])
+        if "author_ids" in data:
+            data["author_ids"] = [
+                part.strip() for part in _split_names(data["author_ids"]) if part.strip()
+            ]
+        yield line_num, data
+
+
+def iter_jsonl_rows(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(data, dict):
+            yield line_num, ValueError("Each line must be a JSON object")
+            continue
+        if "author_names" in data:
+            data["author_names"] = _split_names(data["author_names"])
+        yield line_num, data
+
+
+def iter_rows(lines: Iterable[str], fmt: str) -> Iterator[ParsedRow]:
+    if fmt == "csv":
+        return iter_csv_rows(lines)
+    if fmt == "jsonl":
+        return iter_jsonl_rows(lines)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+class _Report:
+    def __init__(self) -> None:
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def _validate(row_num: int, data: Any, report: _Report) -> Optional[Tuple[int, BookCreate]]:
+    if isinstance(data, Exception):
+        report.error(row_num, str(data))
+        return None
+    try:
+        return row_num, BookCreate.model_validate(data)
+    except (ValidationError, ValueError) as e:
+        report.error(row_num, str(e).replace("\n", "; "))
+        return None
+
+
+def _check_author_ids(
+    db: Session,
+    chunk: List[Tuple[int, BookCreate]],
+    report: _Report,
+) -> List[Tuple[int, BookCreate]]:
+    """Строки с несуществующими author_ids уходят в ошибки, а не теряют авторов."""
+    requested = {a for _, book_in in chunk for a in book_in.author_ids}
+    if not requested:
+        return chunk
+    known = set(AuthorRepository(db).get_names_by_ids(requested))
+    valid = []
+    for row_num, book_in in chunk:
+        unknown = [a for a in book_in.author_ids if a not in known]
+        if unknown:
+            report.error(row_num, f"Unknown author_ids: {', '.join(map(str, unknown))}")
+        else:
+            valid.append((row_num, book_in))
+    return valid
+
+
+def _clean(name: Optional[str]) -> Optional[str]:
+    name = (name or "").strip()
+    return name or None
+
+
+def _save_chunk(
+    db: Session,
+    chunk: List[Tuple[int, BookCreate]],
+) -> Tuple[int, int, List[Tuple[str, int, str]]]:
+    """Сохраняет пачку в текущей транзакции.
+
+    Возвращает (создано, обновлено, записи для индекса подсказок).
+    """
+    repo = BookRepository(db)
+    author_repo = AuthorRepository(db)
+
+    # одна запись на ISBN: при повторах внутри пачки побеждает последняя строка
+    by_isbn: Dict[str, BookCreate] = {}
+    without_isbn: List[BookCreate] = []
+    for _, book_in in chunk:
+        isbn = _clean(book_in.isbn)
+        if isbn:
+            by_isbn[isbn] = book_in
+        else:
+            without_isbn.append(book_in)
+    books_in = list(by_isbn.values()) + without_isbn
+
+    genre_ids = GenreRepository(db).get_or_create_many(
+        name for b in books_in if b.genre_id is None and (name := _clean(b.genre_name))
+    )
+    publisher_ids = PublisherRepository(db).get_or_create_many(
+        name for b in books_in if b.publisher_id is None and (name := _clean(b.publisher_name))
+    )
+    author_ids = author_repo.get_or_create_many(
+        name for b in books_in for raw in b.author_names if (name := _clean(raw))
+    )
+    author_names = {author_id: name for name, author_id in author_ids.items()}
+    author_names.update(
+        author_repo.get_names_by_ids(
+            {a for b in books_in for a in b.author_ids if a not in author_names}
+        )
+    )
+    existing = repo.get_ids_by_isbn(list(by_isbn))
+
+    inserts: List[Tuple[dict, List[int]]] = []
+    # обновление: только поля, которые есть в строке; авторы — None, если их нет
+    updates: List[Tuple[dict, Optional[List[int]]]] = []
+    for book_in in books_in:
+        present = book_in.model_fields_set
+        values = {field: getattr(book_in, field) for field in _BOOK_FIELDS}
+        values["isbn"] = _clean(book_in.isbn)
+        if values["genre_id"] is None:
+            values["genre_id"] = genre_ids.get(_clean(book_in.genre_name))
+        if values["publisher_id"] is None:
+            values["publisher_id"] = publisher_ids.get(_clean(book_in.publisher_name))
+        book_authors = list(book_in.author_ids) + [
+            author_ids[name] for raw in book_in.author_names if (name := _clean(raw))
+        ]
+        book_id = existing.get(values["isbn"]) if values["isbn"] else None
+        if book_id is None:
+            inserts.append((values, book_authors))
+            continue
+        fields = set(present) & set(_BOOK_FIELDS)
+        if present & {"genre_id", "genre_name"}:
+            fields.add("genre_id")
+        if present & {"publisher_id", "publisher_name"}:
+            fields.add("publisher_id")
+        changed = {field: values[field] for field in fields}
+        changed["book_id"] = book_id
+        supplies_authors = bool(present & {"author_ids", "author_names"})
+        updates.append((changed, book_authors if supplies_authors else None))
+
+    repo.bulk_update([values for values, _ in updates])
+    new_ids = repo.bulk_insert([values for values, _ in inserts])
+    for (values, _), book_id in zip(inserts, new_ids):
+        values["book_id"] = book_id
+
+    repo.replace_authors({
+        values["book_id"]: book_authors
+        for values, book_authors in updates + inserts
+        if book_authors is not None
+    })
+    repo.search.index_documents(
+        db,
+        [
+            {
+                "book_id": values["book_id"],
+                "title": values["title"],
+                "description": values["description"] or "",
+                "authors": " ".join(author_names[a] for a in dict.fromkeys(book_authors)),
+            }
+            for values, book_authors in inserts
+        ],
+    )
+    if updates:
+        # у обновлённых книг часть полей и авторов осталась прежней — индексируем из БД
+        repo.sync_search_index(repo.get_many([values["book_id"] for values, _ in updates]))
+    saved = updates + inserts
+    suggestions = [("book", values["book_id"], values["title"]) for values, _ in saved]
+    suggestions += [("genre", genre_id, name) for name, genre_id in genre_ids.items()]
+    suggestions += [("author", author_id, name) for name, author_id in author_ids.items()]
+    # строки, перекрытые более поздней с тем же ISBN, считаем обновлениями
+    return len(inserts), len(updates) + len(chunk) - len(books_in), suggestions
+
+
+def _import_chunk(db: Session, chunk: List[Tuple[int, BookCreate]], report: _Report) -> None:
+    try:
+        created, updated, suggestions = _save_chunk(db, chunk)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        if len(chunk) == 1:
+            report.error(chunk[0][0], f"Database error: {getattr(e, 'orig', e)}")
+            return
+        # пачка не легла целиком — повторяем построчно, чтобы найти виновных
+        for item in chunk:
+            _import_chunk(db, [item], report)
+        return
+    suggest_service.index_entries(suggestions)
+    book_ids = [entity_id for kind, entity_id, _ in suggestions if kind == "book"]
+    book_fragments.invalidate(book_ids)
+    columnar_catalog.refresh_books(db, book_ids)
+    report.created += created
+    report.updated += updated
+
+
+def import_books(
+    db: Session,
+    rows: Iterable[ParsedRow],
+    chunk_size: int = 1000,
+) -> Dict[str, Any]:
+    """Импортирует строки пачками и возвращает отчёт (created/updated/failed/errors)."""
+    report = _Report()
+    rows = iter(rows)
+    try:
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
+            chunk = [
+                item
+                for row_num, data in batch
+                if (item := _validate(row_num, data, report)) is not None
+            ]
+            chunk = _check_author_ids(db, chunk, report)
+            if chunk:
+                _import_chunk(db, chunk, report)
+    finally:
+        if report.created or report.updated:
+            catalog_cache.bump(
+                db,
+                catalog_cache.BOOKS,
+                catalog_cache.GENRES,
+                catalog_cache.AUTHORS,
+                catalog_cache.PUBLISHERS,
+            )
+    return report.as_dict()
@@ -11,7 +11,7 @@ def create_order_from_cart(db: Session, user_id: int) -> Optional[Order]:
     cart_repo = CartRepository(db)
     order_repo = OrderRepository(db)
 
-    cart: Optional[Cart] = cart_repo.get_cart_by_user(user_id)
+    cart: Optional[Cart] = cart_repo.get_cart_by_user(user_id, profile="cart")
     if not cart or not cart.items:
         return None
 
@@ -0,0 +1,81 @@
+# app/services/page_service.py
+"""Первый экран страниц каталога, отрендеренный на сервере.
+
+Данные берутся из тех же сервисов, что и у API, разметка — из
+templates/partials/books.html (повторяет ту, что строит app.js). Рядом
+с разметкой в страницу кладётся JSON с теми же данными (#initial-data):
+скрипт подхватывает его и не делает первых запросов к API.
+
+Готовые фрагменты кэшируются в catalog_cache и зависят от версий всех
+разделов каталога, так что любая запись в каталог их сбрасывает.
+"""
+from typing import Any, Dict, Optional
+
+from jinja2 import Environment
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import Markup
+from sqlalchemy.orm import Session
+
+from app.services import admin_service, catalog_cache, catalog_service
+
+# совпадает с PAGE_SIZE в app.js
+INDEX_PAGE_SIZE = 10
+# столько же отдаёт /dicts/* без параметров
+INDEX_DICT_LIMIT = 100
+
+PARTIALS = "partials/books.html"
+
+
+def index_data(db: Session, q: Optional[str] = None) -> Dict[str, Any]:
+    """Первая страница каталога и справочники для фильтров (в JSON-типах)."""
+    books, next_cursor = catalog_service.list_books_page(db, limit=INDEX_PAGE_SIZE, q=q)
+    genres, _, _ = admin_service.list_genres(db, limit=INDEX_DICT_LIMIT)
+    authors, _, authors_cursor = admin_service.list_authors(db, limit=INDEX_DICT_LIMIT)
+    return {
+        "q": q,
+        "books": [book.model_dump(mode="json") for book in books],
+        "has_more": next_cursor is not None,
+        "genres": [genre.model_dump(mode="json") for genre in genres],
+        "authors": [author.model_dump(mode="json") for author in authors],
+        # остальные авторы подгружаются с /dicts/authors по курсору
+        "authors_next_cursor": authors_cursor,
+    }
+
+
+def book_data(db: Session, book_id: int) -> Dict[str, Any]:
+    book = catalog_service.read_book(db, book_id)
+    return {"book": book.model_dump(mode="json") if book is not None else None}
+
+
+def render_index(env: Environment, db: Session, q: Optional[str] = None) -> Dict[str, Markup]:
+    """Фрагменты главной: карточки, опции фильтров и JSON для скрипта."""
+
+    def render() -> Dict[str, Markup]:
+        data = index_data(db, q)
+        partials = env.get_template(PARTIALS).module
+        return {
+            "books_html": partials.book_cards(data["books"]),
+            "genre_options": partials.options(data["genres"], "genre_id", "name"),
+            "author_options": partials.options(data["authors"], "author_id", "full_name"),
+            "initial_data": htmlsafe_json_dumps(data),
+            "empty": not data["books"],
+        }
+
+    return catalog_cache.cached("index_page", {"q": q}, render)
+
+
+def render_book(env: Environment, db: Session, book_id: int) -> Dict[str, Any]:
+    """Фрагменты страницы книги; found=False — книги нет."""
+
+    def render() -> Dict[str, Any]:
+        data = book_data(db, book_id)
+        book = data["book"]
+        partials = env.get_template(PARTIALS).module
+        return {
+            "found": book is not None,
+            "title": book["title"] if book is not None else None,
+            "book_html": partials.book_detail(book) if book is not None else Markup(""),
+            "initial_data": htmlsafe_json_dumps(data),
+        }
+
+    return catalog_cache.cached("book_page", {"book_id": book_id}, render)
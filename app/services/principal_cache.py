@@ -0,0 +1,52 @@
+# app/services/principal_cache.py
+"""Кэш аутентифицированных пользователей: запрос с токеном не ходит в users.
+
+Ключ — email из токена (поле sub), значение — UserRead: id, email, имя,
+телефон и is_admin, без хэша пароля и без привязки к сессии БД. Пути,
+меняющие эти поля (профиль, пароль, права администратора), вызывают
+invalidate. Записи свои в каждом воркере: изменения, сделанные в другом
+воркере, видны не позже PRINCIPAL_CACHE_TTL.
+"""
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import PRINCIPAL_CACHE_MAXSIZE, PRINCIPAL_CACHE_TTL
+from app.repositories import UserRepository
+from app.schemas.user import UserRead
+
+principals = TTLCache(maxsize=PRINCIPAL_CACHE_MAXSIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+_lock = threading.Lock()
+# счётчик инвалидаций: пользователь, прочитанный до инвалидации, не кладётся
+_writes = 0
+
+
+def get_principal(db: Session, email: str) -> Optional[UserRead]:
+    """Пользователь по email из токена; None — такого пользователя нет."""
+    principal = principals.get(email)
+    if principal is not None:
+        return principal
+
+    since = _writes
+    user = UserRepository(db).get_by_email(email)
+    if user is None:
+        # промахи не кэшируются: пользователь может зарегистрироваться
+        return None
+    principal = UserRead.model_validate(user)
+    with _lock:
+        if _writes == since:
+            principals.set(email, principal)
+    return principal
+
+
+def invalidate(*emails: Optional[str]) -> None:
+    """Пользователь изменился (старый и новый email при смене адреса)."""
+    global _writes
+    with _lock:
+        _writes += 1
+        for email in emails:
+            if email is not None:
+                principals.pop(email)
@@ -0,0 +1,264 @@
+# app/services/suggest_service.py
+"""Подсказки для строки поиска: названия книг, авторы и жанры по префиксу.
+
+Индекс живёт в памяти процесса: отсортированный массив ключей и параллельный
+массив ссылок, поиск — bisect по префиксу, без обращений к БД. Строится
+из каталога при старте и обновляется точечно из путей записи каталога.
+В каждом воркере свой индекс; изменения из других процессов он увидит
+только после перестроения (rebuild).
+"""
+import bisect
+import sys
+import threading
+from array import array
+from itertools import islice
+from typing import Collection, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Author, Book, Genre
+
+# вид сущности хранится в младших битах ссылки: ref = id << 2 | код
+KINDS = ("book", "author", "genre")
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# ключи обрезаются: для префиксного поиска хвост длинных названий не нужен
+MAX_KEY_LENGTH = 32
+# кроме начала строки, ищем ещё по началу нескольких следующих слов
+# ("мир" найдёт "Война и мир"); короткие слова вроде "и", "of" не индексируются
+WORD_STARTS = 3
+MIN_WORD_LENGTH = 3
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def make_ref(kind: str, id_: int) -> int:
+    return id_ << 2 | _KIND_CODES[kind]
+
+
+def split_ref(ref: int) -> Tuple[str, int]:
+    return KINDS[ref & 3], ref >> 2
+
+
+def _sort_entries(keys: List[str], refs: List[int]) -> Tuple[List[str], array]:
+    # сортировка перестановки по одним строкам заметно быстрее сортировки кортежей
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return [keys[i] for i in order], array("q", [refs[i] for i in order])
+
+
+def _sizeof_items(items: Collection, sample: int = 1000) -> int:
+    # оценка по первым `sample` элементам: точный обход миллионов строк дорог
+    if not items:
+        return 0
+    head = list(islice(items, sample))
+    return sum(map(sys.getsizeof, head)) * len(items) // len(head)
+
+
+def _scan(keys, refs, prefix: str, limit: int, dead=None) -> List[Tuple[str, int]]:
+    """Первые `limit` разных ссылок с ключом на `prefix`: [(ключ, ссылка)]."""
+    found: Dict[int, str] = {}
+    pos = bisect.bisect_left(keys, prefix)
+    while pos < len(keys) and len(found) < limit and keys[pos].startswith(prefix):
+        ref = refs[pos]
+        if ref not in found and (dead is None or ref not in dead):
+            found[ref] = keys[pos]
+        pos += 1
+    return [(key, ref) for ref, key in found.items()]
+
+
+class PrefixIndex:
+    """Отсортированный массив (ключ, ссылка) с поиском по префиксу.
+
+    Ключи одной сущности — нормализованная строка целиком и её суффиксы
+    с начала слов. Основной массив большой и меняется только целиком;
+    изменения копятся в небольшом отсортированном "дельта"-массиве,
+    удалённые из основного ссылки — в множестве `_dead`. Когда дельта
+    дорастает до доли основного массива, они сливаются. Потокобезопасен.
+    """
+
+    def __init__(
+            self,
+            max_key_length: int = MAX_KEY_LENGTH,
+            word_starts: int = WORD_STARTS,
+    ) -> None:
+        self.max_key_length = max_key_length
+        self.word_starts = word_starts
+        self._lock = threading.Lock()
+        self._keys: List[str] = []
+        self._refs = array("q")
+        self._delta_keys: List[str] = []
+        self._delta_refs: List[int] = []
+        self._dead: Set[int] = set()
+        self._labels: Dict[int, str] = {}
+
+    def keys_for(self, label: str) -> List[str]:
+        text = normalize(label)
+        if not text:
+            return []
+        limit = self.max_key_length
+        keys = [text[:limit]]
+        offset = 0
+        for word in text.split(" "):
+            if offset and len(word) >= MIN_WORD_LENGTH:
+                keys.append(text[offset: offset + limit])
+                if len(keys) > self.word_starts:
+                    break
+            offset += len(word) + 1
+        return keys
+
+    def build(self, items: Iterable[Tuple[int, str]]) -> None:
+        """Полностью перестраивает индекс из пар (ссылка, подпись)."""
+        labels: Dict[int, str] = {}
+        keys: List[str] = []
+        refs: List[int] = []
+        for ref, label in items:
+            labels[ref] = label
+            for key in self.keys_for(label):
+                keys.append(key)
+                refs.append(ref)
+        keys, refs = _sort_entries(keys, refs)
+        with self._lock:
+            self._keys, self._refs, self._labels = keys, refs, labels
+            self._delta_keys, self._delta_refs, self._dead = [], [], set()
+
+    def update(self, items: Iterable[Tuple[int, str]] = (), removed: Iterable[int] = ()) -> None:
+        """Добавляет/заменяет сущности и удаляет перечисленные ссылки."""
+        items = dict(items)
+        with self._lock:
+            for ref in set(removed) | set(items):
+                if ref in self._labels:
+                    self._remove(ref)
+            for ref, label in items.items():
+                self._add(ref, label)
+            if len(self._delta_keys) + len(self._dead) > max(10000, len(self._keys) // 8):
+                self._compact()
+
+    def _add(self, ref: int, label: str) -> None:
+        for key in self.keys_for(label):
+            pos = bisect.bisect_right(self._delta_keys, key)
+            self._delta_keys.insert(pos, key)
+            self._delta_refs.insert(pos, ref)
+        self._labels[ref] = label
+
+    def _remove(self, ref: int) -> None:
+        label = self._labels.pop(ref)
+        # записи в основном массиве просто помечаются, из дельты — удаляются
+        self._dead.add(ref)
+        for key in self.keys_for(label):
+            pos = bisect.bisect_left(self._delta_keys, key)
+            while pos < len(self._delta_keys) and self._delta_keys[pos] == key:
+                if self._delta_refs[pos] == ref:
+                    del self._delta_keys[pos]
+                    del self._delta_refs[pos]
+                    break
+                pos += 1
+
+    def _compact(self) -> None:
+        # обе части уже отсортированы, так что сортировка сводится к слиянию
+        keys: List[str] = []
+        refs: List[int] = []
+        for key, ref in zip(self._keys, self._refs):
+            if ref not in self._dead:
+                keys.append(key)
+                refs.append(ref)
+        keys += self._delta_keys
+        refs += self._delta_refs
+        self._keys, self._refs = _sort_entries(keys, refs)
+        self._delta_keys, self._delta_refs, self._dead = [], [], set()
+
+    def search(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """До `limit` сущностей, у которых строка или слово начинается с `prefix`."""
+        prefix = normalize(prefix)[: self.max_key_length]
+        if not prefix or limit <= 0:
+            return []
+        with self._lock:
+            candidates = _scan(self._keys, self._refs, prefix, limit, self._dead)
+            candidates += _scan(self._delta_keys, self._delta_refs, prefix, limit)
+            found: Dict[int, str] = {}
+            for _, ref in sorted(candidates):
+                if ref not in found:
+                    found[ref] = self._labels[ref]
+                    if len(found) == limit:
+                        break
+        return list(found.items())
+
+    def stats(self) -> Dict[str, int]:
+        """Размер индекса; память — приблизительно, по sys.getsizeof."""
+        with self._lock:
+            entries = len(self._keys) + len(self._delta_keys)
+            memory = (
+                sys.getsizeof(self._keys)
+                + _sizeof_items(self._keys)
+                + self._refs.buffer_info()[1] * self._refs.itemsize
+                + sys.getsizeof(self._delta_keys)
+                + _sizeof_items(self._delta_keys)
+                + sys.getsizeof(self._delta_refs)
+                + sys.getsizeof(self._dead)
+                + sys.getsizeof(self._labels)
+                + _sizeof_items(self._labels.values())
+            )
+            return {
+                "entries": entries,
+                "entities": len(self._labels),
+                "bytes": memory,
+                "bytes_per_entry": memory // entries if entries else 0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._delta_keys)
+
+
+index = PrefixIndex()
+
+
+def _catalog_items(db: Session) -> Iterable[Tuple[int, str]]:
+    for kind, id_column, label_column in (
+        ("book", Book.book_id, Book.title),
+        ("author", Author.author_id, Author.full_name),
+        ("genre", Genre.genre_id, Genre.name),
+    ):
+        rows = db.execute(
+            select(id_column, label_column).execution_options(yield_per=10000)
+        )
+        for id_, label in rows:
+            yield make_ref(kind, id_), label
+
+
+def rebuild(db: Session) -> None:
+    """Строит индекс подсказок из каталога (при старте приложения)."""
+    index.build(_catalog_items(db))
+
+
+def suggest(q: str, limit: int = 10) -> List[Dict[str, object]]:
+    result = []
+    for ref, label in index.search(q, limit):
+        kind, id_ = split_ref(ref)
+        result.append({"kind": kind, "id": id_, "label": label})
+    return result
+
+
+def index_entries(entries: Iterable[Tuple[str, int, Optional[str]]]) -> None:
+    """Добавляет/обновляет сущности (вид, id, подпись) после коммита."""
+    index.update(
+        (make_ref(kind, id_), label) for kind, id_, label in entries if label
+    )
+
+
+def index_book(book: Book) -> None:
+    """Книга после сохранения: название, а также её авторы и жанр."""
+    entries = [("book", book.book_id, book.title)]
+    entries += [("author", author.author_id, author.full_name) for author in book.authors]
+    if book.genre is not None:
+        entries.append(("genre", book.genre.genre_id, book.genre.name))
+    index_entries(entries)
+
+
+def remove_entries(kind: str, ids: Iterable[int]) -> None:
+    index.update(removed=[make_ref(kind, id_) for id_ in ids])
+
+
+def stats() -> Dict[str, int]:
+    return index.stats()
@@ -0,0 +1,98 @@
+# app/services/token_revocation.py
+"""Отозванные сессии в памяти: проверка access-токена без запроса в БД.
+
+Access-токен несёт id своей сессии (claim sid). Сессия отзывается выходом
+(/auth/logout) или снятием прав администратора, и её id попадает в
+множество ниже. Вместе с id хранится срок сессии: после него
+её токены недействительны и так, и запись выбрасывается.
+
+При старте множество загружается из refresh_tokens целиком. Дальше воркер
+сам добавляет сессии, которые отзывает, а отозванные другими воркерами
+дочитывает из БД не чаще раза в REVOCATION_SYNC_INTERVAL (только те, что
+отозваны после прошлой сверки).
+
+Истёкшие сессии больше никому не нужны: раз в REFRESH_TOKEN_PRUNE_INTERVAL
+сверка удаляет их строки из refresh_tokens.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import REFRESH_TOKEN_PRUNE_INTERVAL, REVOCATION_SYNC_INTERVAL
+from app.database import SessionLocal
+from app.repositories import RefreshTokenRepository
+
+# запас на расхождение часов и на транзакции, закоммиченные во время сверки
+_SYNC_OVERLAP = timedelta(seconds=REVOCATION_SYNC_INTERVAL + 1)
+
+_revoked: Dict[int, float] = {}  # sid -> конец сессии (unix time)
+_lock = threading.Lock()
+_sync_lock = threading.Lock()
+_last_sync: Optional[datetime] = None
+_next_sync = 0.0
+_next_prune = 0.0
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite возвращает даты без часового пояса; пишутся они в UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def add(entries: Iterable[Tuple[int, datetime]]) -> None:
+    """Сессии (sid, expires_at) отозваны."""
+    with _lock:
+        for sid, expires_at in entries:
+            _revoked[sid] = as_utc(expires_at).timestamp()
+
+
+def load(db: Session) -> None:
+    """Полная загрузка при старте."""
+    global _last_sync, _next_sync
+    now = datetime.now(timezone.utc)
+    entries = RefreshTokenRepository(db).list_revoked(now)
+    with _lock:
+        _revoked.clear()
+    add(entries)
+    _last_sync = now
+    _next_sync = time.monotonic() + REVOCATION_SYNC_INTERVAL
+
+
+def is_revoked(sid: int) -> bool:
+    if time.monotonic() >= _next_sync:
+        _sync()
+    return sid in _revoked
+
+
+def _sync() -> None:
+    global _last_sync, _next_sync, _next_prune
+    # сверяет один поток, остальные проверяют по текущему множеству
+    if not _sync_lock.acquire(blocking=False):
+        return
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        since = _last_sync - _SYNC_OVERLAP if _last_sync is not None else None
+        repo = RefreshTokenRepository(db)
+        add(repo.list_revoked(now, since=since))
+        if time.monotonic() >= _next_prune:
+            _next_prune = time.monotonic() + REFRESH_TOKEN_PRUNE_INTERVAL
+            repo.delete_expired(now)
+        with _lock:
+            for sid in [sid for sid, end in _revoked.items() if end <= now.timestamp()]:
+                del _revoked[sid]
+        _last_sync = now
+    except SQLAlchemyError:
+        # БД недоступна — проверяем по тому, что есть, и пробуем в следующий раз
+        pass
+    finally:
+        _next_sync = time.monotonic() + REVOCATION_SYNC_INTERVAL
+        db.close()
+        _sync_lock.release()
+
+
+def size() -> int:
+    return len(_revoked)
@@ -1,5 +1,6 @@
 const API_BASE = "/api";
 const TOKEN_KEY = "bookstore_token";
+const REFRESH_TOKEN_KEY = "bookstore_refresh_token";
 
 function debounce(fn, delay = 300) {
     let timeoutId;
@@ -14,15 +15,51 @@ function getToken() {
     return localStorage.getItem(TOKEN_KEY);
 }
 
-function setToken(token) {
+function setToken(token, refreshToken) {
     if (token) {
         localStorage.setItem(TOKEN_KEY, token);
     } else {
         localStorage.removeItem(TOKEN_KEY);
     }
+    if (refreshToken) {
+        localStorage.setItem(REFRESH_TOKEN_KEY, refreshToken);
+    } else if (!token) {
+        localStorage.removeItem(REFRESH_TOKEN_KEY);
+    }
 }
 
-async function apiFetch(path, options = {}) {
+// Access-токен короткий: по истечении берём новый по refresh-токену
+async function refreshAccessToken() {
+    const refreshToken = localStorage.getItem(REFRESH_TOKEN_KEY);
+    if (!refreshToken) return false;
+    const response = await fetch(API_BASE + "/auth/refresh", {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({refresh_token: refreshToken}),
+    });
+    if (!response.ok) {
+        setToken(null);
+        return false;
+    }
+    const data = await response.json();
+    setToken(data.access_token, data.refresh_token);
+    return true;
+}
+
+// Сессия закрывается по refresh-токену: access-токен к этому моменту мог истечь
+async function logout() {
+    const refreshToken = localStorage.getItem(REFRESH_TOKEN_KEY);
+    if (refreshToken) {
+        await fetch(API_BASE + "/auth/logout", {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify({refresh_token: refreshToken}),
+        }).catch(() => null);
+    }
+    setToken(null);
+}
+
+async function apiResponse(path, options = {}, retry = true) {
     const token = getToken();
     const headers = options.headers || {};
 
@@ -39,6 +76,10 @@ async function apiFetch(path, options = {}) {
         headers,
     });
 
+    if (response.status === 401 && token && retry && (await refreshAccessToken())) {
+        return apiResponse(path, options, false);
+    }
+
     if (!response.ok) {
         let detail = "Ошибка запроса";
         try {
@@ -52,6 +93,12 @@ async function apiFetch(path, options = {}) {
         throw new Error(detail);
     }
 
+    return response;
+}
+
+async function apiFetch(path, options = {}) {
+    const response = await apiResponse(path, options);
+
     if (response.status === 204) {
         return null;
     }
@@ -59,6 +106,53 @@ async function apiFetch(path, options = {}) {
     return response.json();
 }
 
+// Справочники отдаются страницами: тело — список, курсор следующей страницы
+// в заголовке X-Next-Cursor, поиск q — по началу имени
+async function fetchDictPage(path, {q = "", cursor = null, limit = null} = {}) {
+    const params = new URLSearchParams();
+    if (q) params.append("q", q);
+    if (cursor) params.append("cursor", cursor);
+    if (limit) params.append("limit", limit);
+    const query = params.toString();
+    const response = await apiResponse(`${path}${query ? "?" + query : ""}`);
+    return {
+        items: await response.json(),
+        nextCursor: response.headers.get("X-Next-Cursor"),
+    };
+}
+
+// Список из справочника с поиском и кнопкой «Ещё»: load(q) рисует первую
+// страницу заново, more() дописывает следующую. render(items, reset, hasMore)
+function dictPager(path, render, {limit = null} = {}) {
+    let query = "";
+    let cursor = null;
+    let request = 0;
+
+    const fetchPage = async (reset) => {
+        const id = ++request;
+        const page = await fetchDictPage(path, {q: query, cursor: reset ? null : cursor, limit});
+        // пока ждали ответ, поиск поменялся — эта страница уже не нужна
+        if (id !== request) return;
+        cursor = page.nextCursor;
+        render(page.items, reset, Boolean(cursor));
+    };
+
+    return {
+        load(q = query) {
+            query = q.trim();
+            cursor = null;
+            return fetchPage(true);
+        },
+        more() {
+            return cursor ? fetchPage(false) : Promise.resolve();
+        },
+        // первая страница уже на месте (отрисована сервером)
+        resume(nextCursor) {
+            cursor = nextCursor;
+        },
+    };
+}
+
 // --- UI helpers ---
 
 function updateNavAuthState() {
@@ -70,9 +164,9 @@ function updateNavAuthState() {
         if (token) {
             link.textContent = "Выйти";
             link.href = "#";
-            link.onclick = (e) => {
+            link.onclick = async (e) => {
                 e.preventDefault();
-                setToken(null);
+                await logout();
                 window.location.href = "/";
             };
         } else {
@@ -91,6 +185,18 @@ function updateNavAuthState() {
     });
 }
 
+// Данные первого экрана, встроенные сервером в страницу (#initial-data)
+function readInitialData() {
+    const el = document.getElementById("initial-data");
+    if (!el) return null;
+    try {
+        return JSON.parse(el.textContent);
+    } catch (e) {
+        console.error("Ошибка разбора начальных данных:", e);
+        return null;
+    }
+}
+
 function renderCardSkeletons(count = 6) {
     const items = Array.from({ length: count })
         .map(() => {
@@ -188,6 +294,8 @@ async function initIndexPage() {
 
     const genreSelect = document.getElementById("filter-genre");
     const authorSelect = document.getElementById("filter-author");
+    const authorSearch = document.getElementById("filter-author-search");
+    const authorMoreBtn = document.getElementById("filter-author-more");
     const minPriceInput = document.getElementById("filter-min-price");
     const maxPriceInput = document.getElementById("filter-max-price");
     const minYearInput = document.getElementById("filter-min-year");
@@ -331,6 +439,10 @@ async function initIndexPage() {
         if (searchInput) searchInput.value = "";
         if (genreSelect) genreSelect.value = "";
         if (authorSelect) authorSelect.value = "";
+        if (authorSearch?.value) {
+            authorSearch.value = "";
+            authorPager.load("").catch(() => null);
+        }
         if (minPriceInput) minPriceInput.value = "";
         if (maxPriceInput) maxPriceInput.value = "";
         if (minYearInput) minYearInput.value = "";
@@ -345,11 +457,46 @@ async function initIndexPage() {
         loadBooks();
     };
 
+    // Авторов много: в списке страница по поиску, остальные — кнопкой «Ещё»
+    const renderAuthorOptions = (authors, reset, hasMore) => {
+        if (!authorSelect) return;
+        if (reset) {
+            // выбранный автор остаётся в списке, даже если не подходит под поиск
+            Array.from(authorSelect.options).forEach((opt) => {
+                if (opt.value && opt.value !== authorSelect.value) opt.remove();
+            });
+        }
+        authors.forEach((a) => {
+            if (String(a.author_id) === authorSelect.value) return;
+            const opt = document.createElement("option");
+            opt.value = a.author_id;
+            opt.textContent = a.full_name;
+            authorSelect.appendChild(opt);
+        });
+        if (authorMoreBtn) authorMoreBtn.hidden = !hasMore;
+    };
+    const authorPager = dictPager("/dicts/authors", renderAuthorOptions);
+
+    authorSearch?.addEventListener(
+        "input",
+        debounce(() => {
+            authorPager.load(authorSearch.value).catch((e) => {
+                console.error("Ошибка загрузки авторов:", e);
+            });
+        })
+    );
+    authorMoreBtn?.addEventListener("click", (e) => {
+        e.preventDefault();
+        authorPager.more().catch((err) => {
+            console.error("Ошибка загрузки авторов:", err);
+        });
+    });
+
     async function loadFilters() {
         try {
-            const [genres, authors] = await Promise.all([
+            const [genres] = await Promise.all([
                 apiFetch("/dicts/genres"),
-                apiFetch("/dicts/authors"),
+                authorPager.load(""),
             ]);
 
             genres.forEach((g) => {
@@ -358,13 +505,6 @@ async function initIndexPage() {
                 opt.textContent = g.name;
                 genreSelect.appendChild(opt);
             });
-
-            authors.forEach((a) => {
-                const opt = document.createElement("option");
-                opt.value = a.author_id;
-                opt.textContent = a.full_name;
-                authorSelect.appendChild(opt);
-            });
         } catch (e) {
             console.error("Ошибка загрузки фильтров:", e);
         }
@@ -603,6 +743,18 @@ async function initIndexPage() {
     updateSearchState();
     syncQuickFiltersWithInputs();
     announceFilters();
+
+    // первый экран уже отрисован сервером: карточки и фильтры на месте
+    const initial = readInitialData();
+    if (initial && Array.isArray(initial.books)) {
+        hasMore = initial.has_more;
+        authorPager.resume(initial.authors_next_cursor);
+        if (authorMoreBtn) authorMoreBtn.hidden = !initial.authors_next_cursor;
+        updatePagination();
+        listEl.setAttribute("aria-busy", "false");
+        if (!initial.books.length) showEmptyState();
+        return;
+    }
     await loadFilters();
     await loadBooks();
 }
@@ -617,39 +769,45 @@ async function initBookDetailPage() {
     const contentEl = document.getElementById("book-content");
     const btn = document.getElementById("add-to-cart-btn");
 
-    try {
-        const book = await apiFetch(`/books/${bookId}`);
-        const authors =
-            book.author_names?.length
-                ? book.author_names.join(", ")
-                : "Не указан";
-        const genre = book.genre_name || "Не указан";
-        const publisher = book.publisher_name || "Не указано";
-        const cover = book.cover_image
-            ? `<div class="book-detail__cover"><img src="${book.cover_image}" alt="Обложка"></div>`
-            : `<div class="book-detail__cover book-detail__cover_placeholder">Нет обложки</div>`;
-
-        contentEl.innerHTML = `
-            <div class="book-detail__layout">
-                ${cover}
-                <div class="book-detail__info">
-                    <h2>${book.title}</h2>
-                    <div class="book-detail__meta">
-                        <p><strong>Автор:</strong> ${authors}</p>
-                        <p><strong>Жанр:</strong> ${genre}</p>
-                        <p><strong>Издательство:</strong> ${publisher}</p>
+    // книга уже отрисована сервером (или сервер сообщил, что её нет)
+    const initial = readInitialData();
+    if (initial && !initial.book) return;
+
+    if (!initial) {
+        try {
+            const book = await apiFetch(`/books/${bookId}`);
+            const authors =
+                book.author_names?.length
+                    ? book.author_names.join(", ")
+                    : "Не указан";
+            const genre = book.genre_name || "Не указан";
+            const publisher = book.publisher_name || "Не указано";
+            const cover = book.cover_image
+                ? `<div class="book-detail__cover"><img src="${book.cover_image}" alt="Обложка"></div>`
+                : `<div class="book-detail__cover book-detail__cover_placeholder">Нет обложки</div>`;
+
+            contentEl.innerHTML = `
+                <div class="book-detail__layout">
+                    ${cover}
+                    <div class="book-detail__info">
+                        <h2>${book.title}</h2>
+                        <div class="book-detail__meta">
+                            <p><strong>Автор:</strong> ${authors}</p>
+                            <p><strong>Жанр:</strong> ${genre}</p>
+                            <p><strong>Издательство:</strong> ${publisher}</p>
+                        </div>
+                        <p>${book.description || ""}</p>
+                        <p><strong>Цена:</strong> ${book.price} ₽</p>
+                        <p><strong>Год:</strong> ${book.publication_year || "-"}</p>
+                        <p><strong>Страниц:</strong> ${book.pages || "-"}</p>
                     </div>
-                    <p>${book.description || ""}</p>
-                    <p><strong>Цена:</strong> ${book.price} ₽</p>
-                    <p><strong>Год:</strong> ${book.publication_year || "-"}</p>
-                    <p><strong>Страниц:</strong> ${book.pages || "-"}</p>
                 </div>
-            </div>
-        `;
-    } catch (e) {
-        contentEl.innerHTML = `<p class="message message_error">${e.message}</p>`;
-        if (btn) btn.disabled = true;
-        return;
+            `;
+        } catch (e) {
+            contentEl.innerHTML = `<p class="message message_error">${e.message}</p>`;
+            if (btn) btn.disabled = true;
+            return;
+        }
     }
 
     btn.addEventListener("click", async () => {
@@ -927,7 +1085,7 @@ function initLoginPage() {
             }
 
             const data = await response.json();
-            setToken(data.access_token);
+            setToken(data.access_token, data.refresh_token);
             window.location.href = "/";
         }
     );
@@ -1366,10 +1524,10 @@ function initAdminPage() {
         if (!genreList && !authorList && !publisherList) return;
 
         try {
-            const [genres, authors, publishers] = await Promise.all([
+            const [genres, publishers] = await Promise.all([
                 apiFetch("/admin/genres"),
-                apiFetch("/admin/authors"),
                 apiFetch("/admin/publishers"),
+                suggestAuthors(""),
             ]);
 
             if (genreList) {
@@ -1378,12 +1536,6 @@ function initAdminPage() {
                     .join("");
             }
 
-            if (authorList) {
-                authorList.innerHTML = authors
-                    .map((a) => `<option value="${a.full_name}"></option>`)
-                    .join("");
-            }
-
             if (publisherList) {
                 publisherList.innerHTML = publishers
                     .map((p) => `<option value="${p.name}"></option>`)
@@ -1394,6 +1546,40 @@ function initAdminPage() {
         }
     }
 
+    // Подсказки авторов в форме книги: авторов много, поэтому подсказываются
+    // те, чьё имя начинается с вводимого (последнего после запятой)
+    const AUTHOR_SUGGEST_LIMIT = 20;
+    let authorSuggestRequest = 0;
+
+    async function suggestAuthors(value) {
+        const authorList = document.getElementById("admin-author-options");
+        if (!authorList) return;
+        const parts = value.split(",");
+        const prefix = parts.pop().trim();
+        const head = parts.map((p) => p.trim()).filter(Boolean);
+        const id = ++authorSuggestRequest;
+        const {items} = await fetchDictPage("/admin/authors", {q: prefix, limit: AUTHOR_SUGGEST_LIMIT});
+        if (id !== authorSuggestRequest) return;
+        // вариант — вся строка целиком, чтобы выбор не стирал уже введённых авторов
+        authorList.innerHTML = items
+            .map((a) => {
+                const full = [...head, a.full_name].join(", ");
+                return `<option value="${full.replace(/"/g, "&quot;")}"></option>`;
+            })
+            .join("");
+    }
+
+    const debouncedSuggestAuthors = debounce((value) => {
+        suggestAuthors(value).catch((err) => {
+            console.warn("Не удалось загрузить авторов", err);
+        });
+    });
+    root.addEventListener("input", (e) => {
+        if (e.target.getAttribute("list") === "admin-author-options") {
+            debouncedSuggestAuthors(e.target.value);
+        }
+    });
+
     async function loadBooks() {
         const el = document.getElementById("admin-books-list");
         el.innerHTML = "Загрузка...";
@@ -1860,72 +2046,91 @@ function initAdminPage() {
         }
     }
 
-    async function loadAuthors() {
-        const el = document.getElementById("admin-authors-list");
-        el.innerHTML = "Загрузка...";
-        try {
-            const authors = await apiFetch("/admin/authors");
+    // Авторов много: таблица грузится страницами по поиску, дальше — «Показать ещё»
+    const authorsListEl = document.getElementById("admin-authors-list");
+    const authorsSearch = document.getElementById("admin-authors-search");
+    const authorsMoreBtn = document.getElementById("admin-authors-more");
+
+    const renderAuthorRows = (authors, reset, hasMore) => {
+        if (authorsMoreBtn) authorsMoreBtn.hidden = !hasMore;
+        let tbody = authorsListEl.querySelector("tbody");
+        if (reset || !tbody) {
             if (!authors.length) {
-                el.innerHTML = "<p>Авторов нет</p>";
+                authorsListEl.innerHTML = "<p>Авторов нет</p>";
                 return;
             }
-
-            let html = `<table class="table">
+            authorsListEl.innerHTML = `<table class="table">
                 <thead>
                     <tr><th>ID</th><th>Полное имя</th><th></th></tr>
                 </thead>
-                <tbody>`;
+                <tbody></tbody></table>`;
+            tbody = authorsListEl.querySelector("tbody");
+        }
 
-            authors.forEach((a) => {
-                html += `
-                    <tr data-author-id="${a.author_id}">
-                        <td>${a.author_id}</td>
-                        <td><input type="text" value="${a.full_name}" class="input"></td>
-                        <td class="table__actions">
-                            <button class="btn btn_ghost btn_sm admin-author-save">Сохранить</button>
-                            <button class="btn btn_danger btn_sm admin-author-delete">Удалить</button>
-                        </td>
-                    </tr>
-                `;
-            });
+        let html = "";
+        authors.forEach((a) => {
+            html += `
+                <tr data-author-id="${a.author_id}">
+                    <td>${a.author_id}</td>
+                    <td><input type="text" value="${a.full_name}" class="input"></td>
+                    <td class="table__actions">
+                        <button class="btn btn_ghost btn_sm admin-author-save">Сохранить</button>
+                        <button class="btn btn_danger btn_sm admin-author-delete">Удалить</button>
+                    </td>
+                </tr>
+            `;
+        });
+        tbody.insertAdjacentHTML("beforeend", html);
+    };
+    const authorsPager = dictPager("/admin/authors", renderAuthorRows);
 
-            html += "</tbody></table>";
-            el.innerHTML = html;
+    async function loadAuthors() {
+        if (!authorsListEl.querySelector("tbody")) authorsListEl.innerHTML = "Загрузка...";
+        try {
+            await authorsPager.load(authorsSearch?.value || "");
+        } catch (e) {
+            authorsListEl.innerHTML = `<p class="message message_error">${e.message}</p>`;
+        }
+    }
 
-            el.querySelectorAll(".admin-author-save").forEach((btn) => {
-                btn.addEventListener("click", async (e) => {
-                    const tr = e.target.closest("tr");
-                    const id = tr.getAttribute("data-author-id");
-                    const nameInput = tr.querySelector("input");
-                    try {
-                        await apiFetch(`/admin/authors/${id}`, {
-                            method: "PATCH",
-                            body: JSON.stringify({ full_name: nameInput.value.trim() }),
-                        });
-                        await loadAuthors();
-                    } catch (err) {
-                        alert("Ошибка: " + err.message);
-                    }
-                });
-            });
+    authorsSearch?.addEventListener("input", debounce(() => loadAuthors()));
+    authorsMoreBtn?.addEventListener("click", async () => {
+        try {
+            await authorsPager.more();
+        } catch (e) {
+            alert("Ошибка: " + e.message);
+        }
+    });
 
-            el.querySelectorAll(".admin-author-delete").forEach((btn) => {
-                btn.addEventListener("click", async (e) => {
-                    const tr = e.target.closest("tr");
-                    const id = tr.getAttribute("data-author-id");
-                    if (!confirm(`Удалить автора #${id}?`)) return;
-                    try {
-                        await apiFetch(`/admin/authors/${id}`, { method: "DELETE" });
-                        await loadAuthors();
-                    } catch (err) {
-                        alert("Ошибка: " + err.message);
-                    }
+    // строки дописываются страницами, поэтому обработчики — на весь список
+    authorsListEl?.addEventListener("click", async (e) => {
+        const tr = e.target.closest("tr[data-author-id]");
+        if (!tr) return;
+        const id = tr.getAttribute("data-author-id");
+
+        if (e.target.closest(".admin-author-save")) {
+            const nameInput = tr.querySelector("input");
+            try {
+                await apiFetch(`/admin/authors/${id}`, {
+                    method: "PUT",
+                    body: JSON.stringify({ full_name: nameInput.value.trim() }),
                 });
-            });
-        } catch (e) {
-            el.innerHTML = `<p class="message message_error">${e.message}</p>`;
+                await loadAuthors();
+            } catch (err) {
+                alert("Ошибка: " + err.message);
+            }
         }
-    }
+
+        if (e.target.closest(".admin-author-delete")) {
+            if (!confirm(`Удалить автора #${id}?`)) return;
+            try {
+                await apiFetch(`/admin/authors/${id}`, { method: "DELETE" });
+                await loadAuthors();
+            } catch (err) {
+                alert("Ошибка: " + err.message);
+            }
+        }
+    });
 
     async function loadPublishers() {
         const el = document.getElementById("admin-publishers-list");
@@ -0,0 +1,61 @@
+"""Стоимость аутентификации запроса по bearer-токену: с кэшем и без.
+
+    python -m benchmarks.auth_decode --repeat 20000
+
+  jwt.decode                 — проверка подписи и claims без кэша;
+  decode_access_token (miss) — то же плюс sha256 ключа и запись в кэш;
+  decode_access_token (hit)  — повторный токен из кэша проверенных JWT;
+  get_current_user (hit)     — вся зависимость: токен и пользователь из кэшей.
+"""
+import argparse
+import statistics
+import time
+
+from app.api.deps import get_current_user
+from app.database import SessionLocal
+from app.services import auth_service, principal_cache
+from app.schemas.user import UserRead
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    email = "bench@example.com"
+    token = auth_service.create_access_token({"sub": email})
+    principal_cache.principals.set(
+        email, UserRead(user_id=1, email=email, full_name="Bench", is_admin=False)
+    )
+
+    def miss() -> None:
+        auth_service.verified_tokens.clear()
+        auth_service.decode_access_token(token)
+
+    db = SessionLocal()
+    try:
+        cases = {
+            "jwt.decode": lambda: auth_service._decode(token),
+            "decode_access_token (miss)": miss,
+            "decode_access_token (hit)": lambda: auth_service.decode_access_token(token),
+            "get_current_user (hit)": lambda: get_current_user(token=token, db=db),
+        }
+        print(f"{'path':28} {'µs':>8}")
+        for name, fn in cases.items():
+            fn()
+            print(f"{name:28} {timed(fn, args.repeat):8.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
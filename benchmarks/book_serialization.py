@@ -0,0 +1,92 @@
+"""Стоимость сериализации страницы книг: модели Pydantic против готовых фрагментов.
+
+    python -m benchmarks.book_serialization --page-size 100
+
+Замеряется только сборка тела ответа для одной страницы, без БД:
+  orm -> BookRead -> JSON  — промах кэша каталога: валидация из атрибутов ORM
+                             и кодирование, как делает response_model;
+  BookRead -> JSON         — попадание в кэш каталога до фрагментов: FastAPI
+                             всё равно перепроверяет модели и кодирует их;
+  fragments                — book_fragments.render на попаданиях: склейка байтов.
+"""
+import argparse
+import statistics
+import time
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.models import Author, Book, Genre, Publisher
+from app.schemas.book import BookRead
+from app.services import book_fragments
+
+PAGE = TypeAdapter(List[BookRead])
+
+
+def make_books(n: int) -> List[Book]:
+    genre = Genre(genre_id=1, name="Роман")
+    publisher = Publisher(publisher_id=1, name="Азбука")
+    books = []
+    for i in range(1, n + 1):
+        books.append(Book(
+            book_id=i,
+            title=f"Книга номер {i}",
+            description="Описание книги. " * 20,
+            price=Decimal("499.00") + i,
+            publication_year=2000 + i % 25,
+            pages=300 + i,
+            isbn=f"978-5-00000-{i:03d}-0",
+            cover_image=f"/static/covers/{i}.jpg",
+            genre_id=genre.genre_id,
+            genre=genre,
+            publisher_id=publisher.publisher_id,
+            publisher=publisher,
+            authors=[Author(author_id=i, full_name=f"Автор {i}")],
+        ))
+    return books
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    books = make_books(args.page_size)
+    models = [BookRead.model_validate(book) for book in books]
+    ids = [book.book_id for book in books]
+    book_fragments.store_many(models, book_fragments.stamp())
+
+    def from_orm():
+        return PAGE.dump_json(PAGE.validate_python(
+            [BookRead.model_validate(book) for book in books]
+        ))
+
+    def from_models():
+        return PAGE.dump_json(PAGE.validate_python(models))
+
+    def from_fragments():
+        return book_fragments.render(ids, lambda missing: {})
+
+    assert PAGE.validate_json(from_fragments()) == PAGE.validate_json(from_models())
+    print(f"{'path':28} {'µs / page':>10} {'bytes':>8}")
+    for name, fn in (
+        ("orm -> BookRead -> JSON", from_orm),
+        ("BookRead -> JSON", from_models),
+        ("fragments", from_fragments),
+    ):
+        print(f"{name:28} {timed(fn, args.repeat):10.1f} {len(fn()):8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Сравнение колоночного снимка каталога с SQL-путём на синтетических данных.
+
+    python -m benchmarks.catalog_engine --sizes 100000,1000000,5000000
+
+Для каждого размера генерируются книги (цена, год с пропусками, жанр,
+издательство, 1–3 автора), строится снимок, а для SQL — временная SQLite-БД
+с той же схемой. Замеряется медианное время страницы (limit=20) для набора
+фильтров и сортировок. SQL-путь материализует ORM-объекты, как в API;
+колоночный возвращает id (их гидратация идёт из кэша каталога и сюда
+не входит). --sql-max ограничивает размер, до которого гоняется SQL:
+заливка 5M строк в SQLite занимает минуты.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Book, BookAuthor, Genre, Publisher
+from app.repositories import BookRepository
+from app.services.columnar_catalog import ColumnarCatalog
+
+GENRES = 50
+PUBLISHERS = 500
+AUTHORS_PER_BOOK = (1, 3)
+
+QUERIES = [
+    ("no filters, by id", {}),
+    ("genre, price_asc", {"genre_id": 7, "order_by": "price_asc"}),
+    ("price range, year_desc", {"min_price": 300, "max_price": 900, "order_by": "year_desc"}),
+    ("author, title_asc", {"author_id": 42, "order_by": "title_asc"}),
+    ("years + publisher, price_desc", {
+        "min_year": 1990, "max_year": 2010, "publisher_id": 13, "order_by": "price_desc",
+    }),
+    ("title_asc, page 5 (skip)", {"order_by": "title_asc", "skip": 80}),
+]
+
+
+def generate(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    authors = max(10, n // 4)
+    rows, pairs = [], []
+    for book_id in range(1, n + 1):
+        rows.append((
+            book_id,
+            rng.randrange(100, 500000),  # копейки
+            None if rng.random() < 0.05 else rng.randrange(1950, 2025),
+            rng.randrange(1, GENRES + 1),
+            rng.randrange(1, PUBLISHERS + 1),
+            f"Title {rng.randrange(n):09d}",
+        ))
+        for author_id in rng.sample(range(1, authors + 1), rng.randint(*AUTHORS_PER_BOOK)):
+            pairs.append((author_id, book_id))
+    return rows, pairs
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def sqlite_session(path: str, rows, pairs):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Genre), [{"genre_id": i, "name": f"G{i}"} for i in range(1, GENRES + 1)])
+        conn.execute(
+            insert(Publisher),
+            [{"publisher_id": i, "name": f"P{i}"} for i in range(1, PUBLISHERS + 1)],
+        )
+        authors = {a for a, _ in pairs}
+        conn.exec_driver_sql(
+            "INSERT INTO authors (author_id, full_name) VALUES (?, ?)",
+            [(a, f"A{a}") for a in authors],
+        )
+        for start in range(0, len(rows), 50000):
+            conn.execute(insert(Book), [
+                {
+                    "book_id": r[0], "price": r[1] / 100, "publication_year": r[2],
+                    "genre_id": r[3], "publisher_id": r[4], "title": r[5],
+                }
+                for r in rows[start: start + 50000]
+            ])
+        for start in range(0, len(pairs), 50000):
+            conn.execute(insert(BookAuthor), [
+                {"author_id": a, "book_id": b} for a, b in pairs[start: start + 50000]
+            ])
+    return sessionmaker(bind=engine)()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="100000,1000000,5000000")
+    parser.add_argument("--sql-max", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    for n in (int(size) for size in args.sizes.split(",")):
+        rows, pairs = generate(n)
+        catalog = ColumnarCatalog()
+        build = timed(lambda: catalog.load(rows, pairs), 1)
+        stats = catalog.stats()
+        print(f"\n== {n:,} books: snapshot built in {build:.0f} ms, "
+              f"{stats['bytes'] / 2**20:.1f} MiB")
+
+        session = None
+        if n <= args.sql_max:
+            tmp = tempfile.mkdtemp()
+            session = sqlite_session(os.path.join(tmp, "bench.db"), rows, pairs)
+            repo = BookRepository(session)
+
+        print(f"{'query':32} {'columnar ms':>12} {'sql ms':>10}")
+        for name, params in QUERIES:
+            columnar_ms = timed(lambda: catalog.page(limit=20, **params), args.repeat)
+            sql_ms = None
+            if session is not None:
+                sql_ms = timed(
+                    lambda: (repo.list_books_page(limit=20, **params), session.expunge_all()),
+                    args.repeat,
+                )
+            sql = f"{sql_ms:10.2f}" if sql_ms is not None else f"{'-':>10}"
+            print(f"{name:32} {columnar_ms:12.2f} {sql}")
+        if session is not None:
+            session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Логины под нагрузкой: пропускная способность и p99 каталога рядом с ними.
+
+    python -m benchmarks.login_load --workers 0,2 --login-threads 16 --duration 10
+
+Для каждого значения PASSWORD_HASH_WORKERS поднимается отдельный uvicorn
+(один воркер, временная SQLite-БД с несколькими десятками книг). Затем
+--login-threads потоков непрерывно логинятся, а --catalog-threads потоков
+параллельно читают /api/books/. Печатаются логины в секунду, число ответов
+503 (пул переполнен) и задержки каталога: p50/p99.
+
+workers=0 — хэширование в потоке запроса, как было до пула.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+
+PASSWORD = "Bench1!pass"
+
+
+def start_server(port: int, workers: int, db_path: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        PASSWORD_HASH_WORKERS=str(workers),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            httpx.get(f"{base}/api/books/?limit=1", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def seed(base: str, books: int) -> None:
+    token = httpx.post(
+        f"{base}/api/auth/login", json={"email": "admin@example.com", "password": "123456"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(books):
+        httpx.post(
+            f"{base}/api/books/",
+            json={"title": f"Bench {i}", "description": "Описание " * 10, "price": 100 + i},
+            headers=headers,
+        )
+    httpx.post(
+        f"{base}/api/auth/register",
+        json={"email": "bench@example.com", "password": PASSWORD, "full_name": "Bench"},
+    )
+
+
+def run_load(base: str, login_threads: int, catalog_threads: int, duration: float) -> Dict:
+    stop = time.monotonic() + duration
+    lock = threading.Lock()
+    logins = {"ok": 0, "busy": 0, "other": 0}
+    latencies: List[float] = []
+
+    def login_loop() -> None:
+        with httpx.Client(base_url=base, timeout=30) as client:
+            while time.monotonic() < stop:
+                status = client.post(
+                    "/api/auth/login", json={"email": "bench@example.com", "password": PASSWORD}
+                ).status_code
+                key = "ok" if status == 200 else "busy" if status == 503 else "other"
+                with lock:
+                    logins[key] += 1
+
+    def catalog_loop() -> None:
+        with httpx.Client(base_url=base, timeout=30) as client:
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                client.get("/api/books/?limit=20")
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(login_threads)]
+    threads += [threading.Thread(target=catalog_loop) for _ in range(catalog_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    return {
+        "logins_per_s": logins["ok"] / duration,
+        "busy": logins["busy"],
+        "other": logins["other"],
+        "catalog_requests": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1e3 if latencies else float("nan"),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1e3 if latencies else float("nan"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workers", default="0,2", help="значения PASSWORD_HASH_WORKERS")
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--catalog-threads", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--books", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'hash workers':>12} {'logins/s':>9} {'503':>6} {'other':>6} "
+          f"{'catalog req':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in (int(w) for w in args.workers.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = start_server(args.port, workers, os.path.join(tmp, "bench.db"))
+            try:
+                base = f"http://127.0.0.1:{args.port}"
+                seed(base, args.books)
+                # без нагрузки: каталог прогрет, кэши заполнены
+                run_load(base, 0, args.catalog_threads, 1.0)
+                r = run_load(base, args.login_threads, args.catalog_threads, args.duration)
+            finally:
+                proc.terminate()
+                proc.wait()
+        print(f"{workers:>12} {r['logins_per_s']:9.1f} {r['busy']:6} {r['other']:6} "
+              f"{r['catalog_requests']:11} {r['p50_ms']:8.1f} {r['p99_ms']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Кодирование и сжатие ответов: время и байты на ответ.
+
+    python -m benchmarks.responses --page-size 100
+
+Для страницы книг (BookRead) сравниваются кодировщики JSON: путь FastAPI
+по умолчанию (pydantic-core сразу в байты), FastJSONResponse (orjson или
+json поверх уже приведённых к JSON-типам данных) и стандартный json. Затем
+для той же страницы и для app.js — размер без сжатия, gzip и brotli (если
+установлен) и время сжатия с уровнями из настроек.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import zlib
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.api import responses
+from app.compression import brotli
+from app.config import BASE_DIR, COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL
+from app.schemas.book import BookRead
+from benchmarks.book_serialization import make_books
+
+PAGE = TypeAdapter(List[BookRead])
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    obj = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return obj.compress(data) + obj.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    models = [BookRead.model_validate(book) for book in make_books(args.page_size)]
+    encoders = {
+        "pydantic dump_json (default)": lambda: PAGE.dump_json(PAGE.validate_python(models)),
+        f"FastJSONResponse ({'orjson' if responses.orjson else 'json'})": lambda: responses.dumps(
+            PAGE.dump_python(PAGE.validate_python(models), mode="json")
+        ),
+        "stdlib json": lambda: json.dumps(
+            PAGE.dump_python(PAGE.validate_python(models), mode="json")
+        ).encode(),
+    }
+    print(f"== {args.page_size}-book page: encode")
+    print(f"{'encoder':34} {'µs':>8}")
+    for name, fn in encoders.items():
+        print(f"{name:34} {timed(fn, args.repeat):8.1f}")
+
+    with open(os.path.join(BASE_DIR, "static", "js", "app.js"), "rb") as f:
+        app_js = f.read()
+    bodies = {"books page": PAGE.dump_json(models), "app.js": app_js}
+    compressors = {"gzip": gzip_bytes}
+    if brotli is not None:
+        compressors["br"] = lambda data: brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+
+    print("\n== compression")
+    print(f"{'body':12} {'encoding':9} {'bytes':>8} {'ratio':>6} {'µs':>9}")
+    for body_name, body in bodies.items():
+        print(f"{body_name:12} {'identity':9} {len(body):8} {1:6.2f} {0:9.1f}")
+        for encoding, compress in compressors.items():
+            packed = compress(body)
+            print(
+                f"{body_name:12} {encoding:9} {len(packed):8} "
+                f"{len(packed) / len(body):6.2f} {timed(lambda: compress(body), args.repeat):9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,15 @@ if ROOT_DIR not in sys.path:
 
 # перед импортом app подменяем DATABASE_URL
 os.environ["DATABASE_URL"] = "sqlite:///./app/test.db"
+# общие версии каталога сверяются только после своих записей (или когда тест
+# сбрасывает catalog_cache._next_shared_check): счёт запросов не зависит от таймингов
+os.environ.setdefault("CATALOG_VERSION_CHECK_INTERVAL", "3600")
+
+from contextlib import contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from app.main import app
 from app.database import Base, engine, SessionLocal
@@ -60,3 +66,22 @@ def create_user(db_session):
         return user
 
     return _create_user
+
+
+@pytest.fixture
+def count_queries():
+    """Контекст-менеджер, считающий SQL-запросы, ушедшие в БД."""
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def _before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _before_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _before_execute)
+
+    return _count_queries
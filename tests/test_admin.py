@@ -52,3 +52,273 @@ def test_admin_access_and_basic_endpoints(client: TestClient, db_session: Sessio
     assert resp.status_code == 200
     genres = resp.json()
     assert any(g["name"] == "Test Genre" for g in genres)
+
+
+def test_admin_bulk_import_books(client: TestClient, db_session: Session, create_user):
+    from app.models import Book
+
+    admin = create_user("adminimport@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {make_token(admin)}"}
+
+    csv_body = (
+        "title,price,isbn,genre_name,publisher_name,author_names,publication_year\n"
+        "Import One,100,imp-1,Import Genre,Import House,Import Author A;Import Author B,2001\n"
+        "Import Two,200,imp-2,Import Genre,,Import Author B,\n"
+        "Broken Row,not-a-price,imp-3,,,,\n"
+        "Import Three,300,,Other Import Genre,Import House,,2003\n"
+    )
+    resp = client.post(
+        "/api/admin/books/import",
+        files={"file": ("feed.csv", csv_body, "text/csv")},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert (report["created"], report["updated"], report["failed"]) == (3, 0, 1)
+    assert report["errors"][0]["row"] == 4
+
+    book = db_session.query(Book).filter(Book.isbn == "imp-1").one()
+    assert book.genre_name == "Import Genre"
+    assert book.publisher_name == "Import House"
+    assert sorted(book.author_names) == ["Import Author A", "Import Author B"]
+
+    # JSON Lines: upsert по ISBN и построчные ошибки
+    jsonl_body = (
+        '{"title": "Import One v2", "price": 150, "isbn": "imp-1", "author_names": ["Import Author C"]}\n'
+        "{broken json\n"
+        '{"title": "Import Four", "price": 400, "isbn": "imp-4"}\n'
+    )
+    resp = client.post(
+        "/api/admin/books/import",
+        files={"file": ("feed.jsonl", jsonl_body, "application/x-ndjson")},
+        headers=headers,
+    )
+    report = resp.json()
+    assert (report["created"], report["updated"], report["failed"]) == (1, 1, 1)
+    assert report["errors"][0]["row"] == 2
+
+    db_session.expire_all()
+    book = db_session.query(Book).filter(Book.isbn == "imp-1").one()
+    assert book.title == "Import One v2"
+    assert book.author_names == ["Import Author C"]
+
+    # импортированные книги сразу видны в поиске
+    resp = client.get("/api/books/", params={"q": "Import Author C"})
+    assert [b["isbn"] for b in resp.json()] == ["imp-1"]
+
+    # повторный импорт без обложки, жанра и авторов не стирает их у книги
+    book.cover_image = "/static/covers/imp-1.jpg"
+    db_session.commit()
+    csv_body = (
+        "title,price,isbn,cover_image,genre_name,author_names,author_ids\n"
+        "Import One v3,175,imp-1,,,,\n"
+        "Bad Authors,10,imp-5,,,,999999\n"
+        # поле длиннее csv.field_size_limit — csv.Error на этой строке
+        f"{'x' * 200000},10,imp-6,,,,\n"
+    )
+    resp = client.post(
+        "/api/admin/books/import",
+        files={"file": ("feed.csv", csv_body, "text/csv")},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert (report["created"], report["updated"], report["failed"]) == (0, 1, 2)
+    errors = {e["row"]: e["error"] for e in report["errors"]}
+    assert sorted(errors) == [3, 4]
+    assert "999999" in errors[3] and "Invalid CSV" in errors[4]
+
+    db_session.expire_all()
+    book = db_session.query(Book).filter(Book.isbn == "imp-1").one()
+    assert (book.title, str(book.price)) == ("Import One v3", "175.00")
+    assert book.cover_image == "/static/covers/imp-1.jpg"
+    assert book.genre_name == "Import Genre"
+    assert book.author_names == ["Import Author C"]
+    resp = client.get("/api/books/", params={"q": "Import Author C"})
+    assert [b["title"] for b in resp.json()] == ["Import One v3"]
+
+
+def test_admin_export_books_streams_ndjson_and_csv(
+    client: TestClient, db_session: Session, create_user
+):
+    import csv
+    import io
+    import json
+
+    admin = create_user("adminexport@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {make_token(admin)}"}
+
+    for i, price in enumerate((100, 900)):
+        resp = client.post(
+            "/api/books/",
+            json={
+                "title": f"Exported Book {i}",
+                "price": price,
+                "genre_name": "Export Genre",
+                "author_names": ["Export Author"],
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    resp = client.get(
+        "/api/admin/books/export",
+        params={"q": "Exported", "min_price": 500},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["title"] for r in rows] == ["Exported Book 1"]
+    assert rows[0]["genre_name"] == "Export Genre"
+    assert rows[0]["author_names"] == ["Export Author"]
+
+    resp = client.get(
+        "/api/admin/books/export",
+        params={"q": "Exported", "format": "csv"},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [r["title"] for r in rows] == ["Exported Book 0", "Exported Book 1"]
+    assert rows[0]["author_names"] == "Export Author"
+
+    # без прав админа выгрузка недоступна
+    user = create_user("userexport@example.com", "userpass")
+    resp = client.get(
+        "/api/admin/books/export",
+        headers={"Authorization": f"Bearer {make_token(user)}"},
+    )
+    assert resp.status_code == 403
+
+
+def test_dictionaries_prefix_search_and_pages(client: TestClient, db_session: Session, create_user):
+    from sqlalchemy import text
+
+    from app.models import Author
+
+    names = ["Толстой Лев", "толстая Татьяна", "Тургенев Иван", "Tolkien J.R.R.", "tolle Eckhart"]
+    db_session.add_all([Author(full_name=name) for name in names])
+    db_session.commit()
+
+    # префикс без учёта регистра, в том числе для кириллицы
+    resp = client.get("/api/dicts/authors", params={"q": "ТОЛ"})
+    assert resp.status_code == 200
+    assert [a["full_name"] for a in resp.json()] == ["толстая Татьяна", "Толстой Лев"]
+    assert resp.headers["X-Total-Count"] == "2"
+    assert resp.headers["X-Has-More"] == "false"
+
+    # keyset-страницы по одной записи у админской ручки
+    admin = create_user("admindicts@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {make_token(admin)}"}
+    seen, cursor = [], None
+    while True:
+        params = {"q": "tol", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/admin/authors", params=params, headers=headers)
+        assert resp.headers["X-Total-Count"] == "2"
+        seen += [a["full_name"] for a in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == ["Tolkien J.R.R.", "tolle Eckhart"]
+
+    resp = client.get("/api/dicts/authors", params={"cursor": "garbage"})
+    assert resp.status_code == 400
+
+    # поиск идёт по индексу на копии full_name_lower, а не полным сканированием
+    plan = db_session.execute(
+        text(
+            "EXPLAIN QUERY PLAN SELECT author_id FROM authors "
+            "WHERE full_name_lower >= 'tol' AND full_name_lower < 'tol\U0010ffff' "
+            "ORDER BY full_name_lower, author_id"
+        )
+    ).all()
+    assert any("ix_authors_full_name_lower_id" in row[-1] for row in plan)
+    # копия пишется и при переименовании через ORM
+    author = db_session.query(Author).filter_by(full_name="Толстой Лев").one()
+    author.full_name = "ТОЛСТОЙ Л."
+    db_session.commit()
+    assert author.full_name_lower == "толстой л."
+
+
+def test_schema_upgrade_merges_duplicate_authors(tmp_path):
+    import sqlite3
+
+    from sqlalchemy import create_engine, event, text
+
+    from app.repositories.schema import ensure_schema
+
+    # таблицы в том виде, в каком их создавали прежние версии: ФИО не уникальны,
+    # индексы — на lower(...) и на своей функции unicode_lower(...)
+    path = tmp_path / "old.db"
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(
+        engine,
+        "connect",
+        lambda conn, record: conn.create_function("unicode_lower", 1, str.lower, deterministic=True),
+    )
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE authors (author_id INTEGER PRIMARY KEY, full_name VARCHAR(255) NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX ix_authors_full_name_lower ON authors (lower(full_name), author_id)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX ix_authors_full_name_unicode_lower ON authors (unicode_lower(full_name), author_id)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE book_authors (book_id INTEGER NOT NULL, author_id INTEGER NOT NULL, "
+            "CONSTRAINT pk_book_author PRIMARY KEY (book_id, author_id))"
+        ))
+        conn.execute(text("INSERT INTO authors VALUES (1, 'Пушкин'), (2, 'Пушкин'), (3, 'Гоголь')"))
+        conn.execute(text("INSERT INTO book_authors VALUES (10, 1), (10, 2), (11, 2), (12, 3)"))
+
+    ensure_schema(engine)
+    ensure_schema(engine)  # повторный запуск ничего не меняет
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT author_id FROM authors ORDER BY 1")).scalars().all() == [1, 3]
+        assert conn.execute(text("SELECT * FROM book_authors ORDER BY 1")).all() == [
+            (10, 1), (11, 1), (12, 3),
+        ]
+        # теперь работает вставка авторов по именам с ON CONFLICT
+        conn.execute(text(
+            "INSERT INTO authors (full_name) VALUES ('Гоголь') ON CONFLICT (full_name) DO NOTHING"
+        ))
+        assert conn.execute(text("SELECT count(*) FROM authors")).scalar() == 2
+        indexes = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'authors'")
+        ).scalars().all()
+        assert "ix_authors_full_name_lower_id" in indexes
+        assert "ix_authors_full_name_lower" not in indexes
+        assert "ix_authors_full_name_unicode_lower" not in indexes
+        assert conn.execute(
+            text("SELECT full_name_lower FROM authors ORDER BY author_id")
+        ).scalars().all() == ["пушкин", "гоголь"]
+
+    # БД снова доступна на запись клиентам без функций приложения
+    with sqlite3.connect(path) as plain:
+        plain.execute("INSERT INTO authors (full_name) VALUES ('Лермонтов')")
+        plain.execute("UPDATE authors SET full_name = 'Гоголь Н.' WHERE author_id = 3")
+    ensure_schema(engine)
+    with engine.connect() as conn:
+        assert conn.execute(
+            text("SELECT full_name_lower FROM authors ORDER BY author_id")
+        ).scalars().all() == ["пушкин", "гоголь н.", "лермонтов"]
+
+
+def test_create_author_duplicate_name(client: TestClient, create_user):
+    admin = create_user("admindupauthor@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {make_token(admin)}"}
+    first = client.post("/api/admin/authors", json={"full_name": "Дубль Автор"}, headers=headers)
+    assert first.status_code == 201
+    second = client.post("/api/admin/authors", json={"full_name": "Дубль Автор"}, headers=headers)
+    assert second.status_code == 400
+    other = client.post("/api/admin/authors", json={"full_name": "Другой Автор"}, headers=headers).json()
+    renamed = client.put(
+        f"/api/admin/authors/{other['author_id']}", json={"full_name": "Дубль Автор"}, headers=headers
+    )
+    assert renamed.status_code == 400
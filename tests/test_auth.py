@@ -38,3 +38,130 @@ def test_register_and_login_and_me(client: TestClient):
     assert resp.status_code == 200
     me = resp.json()
     assert me["email"] == "user1@example.com"
+
+
+def test_password_hashing_pool_backpressure(client: TestClient, monkeypatch):
+    from app import passwords
+
+    hashed = passwords.get_password_hash("Secret1!")
+    assert passwords.verify_password("Secret1!", hashed)
+    assert not passwords.verify_password("wrong", hashed)
+
+    monkeypatch.setattr(passwords, "max_pending", 0)
+    resp = client.post(
+        "/api/auth/register",
+        json={"email": "busy@example.com", "password": "Secret1!", "full_name": "Busy"},
+    )
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert passwords.pending() == 0
+
+
+def test_verified_token_cache(monkeypatch):
+    from datetime import timedelta
+
+    from app.services import auth_service
+
+    calls = []
+    decode = auth_service._decode
+    monkeypatch.setattr(auth_service, "_decode", lambda token: calls.append(token) or decode(token))
+
+    token = auth_service.create_access_token({"sub": "cached@example.com"})
+    assert auth_service.decode_access_token(token).email == "cached@example.com"
+    assert auth_service.decode_access_token(token).email == "cached@example.com"
+    assert len(calls) == 1
+
+    # просроченные и подделанные токены не проходят и не кэшируются
+    expired = auth_service.create_access_token(
+        {"sub": "cached@example.com"}, expires_delta=timedelta(seconds=-1)
+    )
+    assert auth_service.decode_access_token(expired) is None
+    assert auth_service.decode_access_token(token[:-2] + "xx") is None
+    assert auth_service.decode_access_token(expired) is None
+    assert len(calls) == 4
+
+
+def test_refresh_logout_and_revocation(client: TestClient, create_user, db_session, count_queries):
+    from datetime import datetime, timezone
+
+    from app.models import RefreshToken
+    from app.services import token_revocation
+
+    user = create_user("session@example.com", "Secret1!")
+    tokens = client.post(
+        "/api/auth/login", json={"email": "session@example.com", "password": "Secret1!"}
+    ).json()
+    assert tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    # проверка отзыва не ходит в БД (сверка только что прошла)
+    token_revocation._sync()
+    with count_queries() as statements:
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert statements == []
+
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refreshed.status_code == 200
+    new_headers = {"Authorization": f"Bearer {refreshed.json()['access_token']}"}
+    assert client.get("/api/auth/me", headers=new_headers).status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": "bogus"}).status_code == 401
+
+    assert client.post("/api/auth/logout", headers=new_headers).status_code == 204
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.get("/api/auth/me", headers=new_headers).status_code == 401
+    assert client.post(
+        "/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    ).status_code == 401
+
+    # сессия, отозванная другим воркером, подхватывается при сверке с БД
+    other = client.post(
+        "/api/auth/login", json={"email": "session@example.com", "password": "Secret1!"}
+    ).json()
+    other_headers = {"Authorization": f"Bearer {other['access_token']}"}
+    assert client.get("/api/auth/me", headers=other_headers).status_code == 200
+    db_session.query(RefreshToken).filter(RefreshToken.user_id == user.user_id).update(
+        {"revoked_at": datetime.now(timezone.utc)}
+    )
+    db_session.commit()
+    token_revocation._next_sync = 0
+    assert client.get("/api/auth/me", headers=other_headers).status_code == 401
+
+
+def test_logout_by_refresh_token_and_prune(client: TestClient, create_user, db_session):
+    from datetime import datetime, timedelta, timezone
+
+    from app.models import RefreshToken
+    from app.services import token_revocation
+
+    user = create_user("logout@example.com", "Secret1!")
+    tokens = client.post(
+        "/api/auth/login", json={"email": "logout@example.com", "password": "Secret1!"}
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # access-токен не нужен: сессия находится по refresh-токену
+    assert client.post("/api/auth/logout").status_code == 401
+    response = client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 204
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.post(
+        "/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    ).status_code == 401
+    assert client.post("/api/auth/logout", json={"refresh_token": "bogus"}).status_code == 204
+
+    # истёкшие сессии удаляются при сверке, отозванные действующие остаются
+    expired = RefreshToken(
+        user_id=user.user_id,
+        token_hash="expired",
+        expires_at=datetime.now(timezone.utc) - timedelta(days=1),
+    )
+    db_session.add(expired)
+    db_session.commit()
+    token_revocation._next_prune = 0
+    token_revocation._sync()
+    db_session.expire_all()
+    rows = db_session.query(RefreshToken).filter(RefreshToken.user_id == user.user_id).all()
+    hashes = {row.token_hash for row in rows}
+    assert "expired" not in hashes
+    assert len(hashes) == 1
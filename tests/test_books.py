@@ -1,4 +1,10 @@
 # tests/test_books.py
+import base64
+import json
+import os
+import re
+
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
@@ -218,3 +224,620 @@ def test_admin_update_book_all_fields(client: TestClient, db_session, create_use
     assert db_book.genre is not None and db_book.genre.name == update_payload["genre_name"]
     assert db_book.publisher is not None and db_book.publisher.name == update_payload["publisher_name"]
     assert {a.full_name for a in db_book.authors} == set(update_payload["author_names"])
+
+
+def test_book_loader_profiles_query_count(
+    client: TestClient, db_session, create_user, count_queries
+):
+    from app.models import Cart, CartItem
+    from app.repositories import BookRepository, CartRepository
+
+    admin = create_user("adminprofiles@example.com", "adminpass", is_admin=True)
+    admin_id = admin.user_id
+    token = create_access_token({"sub": admin.email})
+
+    book_ids = []
+    for i in range(5):
+        resp = client.post(
+            "/api/books/",
+            json={
+                "title": f"Profile Book {i}",
+                "price": 100 + i,
+                "genre_name": f"Profile Genre {i}",
+                "publisher_name": f"Profile Publisher {i}",
+                "author_names": [f"Profile Author {i}", f"Profile Coauthor {i}"],
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert resp.status_code == 201
+        book_ids.append(resp.json()["book_id"])
+
+    cart = Cart(user_id=admin_id)
+    db_session.add(cart)
+    db_session.flush()
+    for book_id in book_ids:
+        db_session.add(CartItem(cart_id=cart.cart_id, book_id=book_id, quantity=1))
+    db_session.commit()
+    db_session.expunge_all()
+
+    def touch(book):
+        return book.genre_name, book.publisher_name, book.author_names
+
+    repo = BookRepository(db_session)
+
+    # list: книги + авторы одним SELECT ... IN
+    with count_queries() as statements:
+        books = repo.list_books(q="Profile Book", profile="list")
+        for book in books:
+            touch(book)
+    assert len(books) == 5
+    assert len(statements) == 2
+    db_session.expunge_all()
+
+    # detail: одна книга со всеми связями одним запросом
+    with count_queries() as statements:
+        book = repo.get_by_id(book_ids[0], profile="detail")
+        assert touch(book) == (
+            "Profile Genre 0",
+            "Profile Publisher 0",
+            ["Profile Author 0", "Profile Coauthor 0"],
+        )
+    assert len(statements) == 1
+    db_session.expunge_all()
+
+    # cart: корзина + позиции с книгами + авторы
+    with count_queries() as statements:
+        loaded = CartRepository(db_session).get_cart_by_user(
+            admin_id, profile="cart"
+        )
+        for item in loaded.items:
+            touch(item.book)
+    assert len(loaded.items) == 5
+    assert len(statements) == 3
+
+
+def test_books_cursor_pagination(client: TestClient, db_session, create_user):
+    admin = create_user("admincursor@example.com", "adminpass", is_admin=True)
+    token = create_access_token({"sub": admin.email})
+
+    # одинаковые цены и пустой год — проверяем тайбрейкер по book_id и NULL-ы
+    for i, (price, year) in enumerate(
+        [(100, 2001), (100, None), (200, 2001), (50, 1999), (200, None), (100, 2010)]
+    ):
+        resp = client.post(
+            "/api/books/",
+            json={
+                "title": f"Cursor Book {i}",
+                "price": price,
+                "publication_year": year,
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert resp.status_code == 201
+
+    for order_by in (
+        "price_asc", "price_desc", "year_asc", "year_desc", "title_asc", "title_desc", None
+    ):
+        params = {"q": "Cursor Book", "limit": 100}
+        if order_by:
+            params["order_by"] = order_by
+        resp = client.get("/api/books/", params=params)
+        assert resp.status_code == 200
+        assert resp.headers["X-Has-More"] == "false"
+        expected = [b["book_id"] for b in resp.json()]
+        assert len(expected) == 6
+
+        collected = []
+        params["limit"] = 4
+        while True:
+            resp = client.get("/api/books/", params=params)
+            assert resp.status_code == 200
+            collected.extend(b["book_id"] for b in resp.json())
+            if resp.headers["X-Has-More"] == "false":
+                assert "X-Next-Cursor" not in resp.headers
+                break
+            params["cursor"] = resp.headers["X-Next-Cursor"]
+        assert collected == expected, order_by
+
+    resp = client.get("/api/books/", params={"cursor": "garbage"})
+    assert resp.status_code == 400
+
+
+def test_books_full_text_search(client: TestClient, db_session, create_user):
+    admin = create_user("adminsearch@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+
+    def create_book(title, description, authors, price):
+        resp = client.post(
+            "/api/books/",
+            json={
+                "title": title,
+                "description": description,
+                "price": price,
+                "author_names": authors,
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        return resp.json()["book_id"]
+
+    in_title = create_book("Zephyrine Chronicles", "", ["Ann Writer"], 300)
+    in_description = create_book("Plain Novel", "A story about zephyrine winds", [], 100)
+    by_author = create_book("Another Novel", "", ["Oswin Zephyrine"], 200)
+
+    # находит по названию, описанию и автору; совпадение в названии — первым
+    resp = client.get("/api/books/", params={"q": "zephyr"})
+    assert resp.status_code == 200
+    ids = [b["book_id"] for b in resp.json()]
+    assert set(ids) == {in_title, in_description, by_author}
+    assert ids[0] == in_title
+
+    # фильтры применяются поверх результатов поиска
+    resp = client.get("/api/books/", params={"q": "zephyrine", "min_price": 150})
+    assert {b["book_id"] for b in resp.json()} == {in_title, by_author}
+
+    # индекс следует за изменениями и удалением
+    resp = client.put(
+        f"/api/books/{in_description}",
+        json={"description": "Nothing to see"},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    resp = client.delete(f"/api/books/{by_author}", headers=headers)
+    assert resp.status_code == 204
+
+    resp = client.get("/api/books/", params={"q": "zephyrine"})
+    assert [b["book_id"] for b in resp.json()] == [in_title]
+
+
+
+def test_books_fuzzy_search(client: TestClient, db_session, create_user):
+    admin = create_user("adminfuzzy@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+
+    def create_book(title, authors):
+        resp = client.post(
+            "/api/books/",
+            json={"title": title, "price": 100, "author_names": authors},
+            headers=headers,
+        )
+        return resp.json()["book_id"]
+
+    exact = create_book("Quixotry Manual", ["Bartholomew Quillfeather"])
+    close = create_book("Feathers and Quills", ["Bartolomeo Quilfether"])
+    create_book("Unrelated Volume", ["Someone Else"])
+
+    # опечатка в имени автора: обычный поиск пуст, нечёткий находит
+    assert client.get("/api/books/", params={"q": "Quilfeather"}).json() == []
+    resp = client.get("/api/books/", params={"q": "Quilfeather", "fuzzy": "true"})
+    assert resp.status_code == 200
+    assert {b["book_id"] for b in resp.json()} == {exact, close}
+
+    # по убыванию похожести: точное имя выше искажённого
+    resp = client.get("/api/books/", params={"q": "Bartholomew Quillfeather", "fuzzy": "true"})
+    ids = [b["book_id"] for b in resp.json()]
+    assert ids[0] == exact and close in ids
+
+    # опечатка в названии; индекс следует за изменениями
+    resp = client.get("/api/books/", params={"q": "quixotri", "fuzzy": "true"})
+    assert [b["book_id"] for b in resp.json()] == [exact]
+    client.put(f"/api/books/{exact}", json={"title": "Plain Manual"}, headers=headers)
+    resp = client.get("/api/books/", params={"q": "quixotri", "fuzzy": "true"})
+    assert resp.json() == []
+
+
+def test_books_facets(client: TestClient, db_session, create_user, count_queries):
+    admin = create_user("adminfacets@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+
+    for title, price, genre, authors in [
+        ("Facet Alpha", 100, "Facet Poetry", ["Facet Poet"]),
+        ("Facet Beta", 700, "Facet Poetry", ["Facet Poet", "Facet Editor"]),
+        ("Facet Gamma", 6000, "Facet Drama", ["Facet Editor"]),
+    ]:
+        resp = client.post(
+            "/api/books/",
+            json={
+                "title": title,
+                "price": price,
+                "genre_name": genre,
+                "publisher_name": "Facet House",
+                "author_names": authors,
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    with count_queries() as statements:
+        resp = client.get("/api/books/facets", params={"q": "facet"})
+    assert resp.status_code == 200
+    # сверка общих версий для ETag (catalog_versions) не в счёт
+    assert len([s for s in statements if "catalog_versions" not in s]) == 4
+    facets = resp.json()
+
+    assert facets["total"] == 3
+    assert [(g["name"], g["count"]) for g in facets["genres"]] == [
+        ("Facet Poetry", 2),
+        ("Facet Drama", 1),
+    ]
+    assert [(p["name"], p["count"]) for p in facets["publishers"]] == [("Facet House", 3)]
+    assert {a["name"]: a["count"] for a in facets["authors"]} == {
+        "Facet Editor": 2,
+        "Facet Poet": 2,
+    }
+    assert [b["count"] for b in facets["prices"]] == [1, 1, 0, 0, 1]
+
+    # те же фильтры, что и у списка книг
+    resp = client.get("/api/books/facets", params={"q": "facet", "max_price": 1000})
+    facets = resp.json()
+    assert facets["total"] == 2
+    assert [(g["name"], g["count"]) for g in facets["genres"]] == [("Facet Poetry", 2)]
+
+
+def test_books_batch(client: TestClient, db_session, create_user, count_queries):
+    admin = create_user("adminbatch@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+
+    ids = []
+    for i in range(4):
+        resp = client.post(
+            "/api/books/",
+            json={"title": f"Batch Book {i}", "price": 10, "author_names": [f"Batch Author {i}"]},
+            headers=headers,
+        )
+        ids.append(resp.json()["book_id"])
+
+    requested = [ids[2], 999999, ids[0], ids[3]]
+    with count_queries() as statements:
+        resp = client.get("/api/books/batch", params={"ids": ",".join(map(str, requested))})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [b["book_id"] for b in body["items"]] == [ids[2], ids[0], ids[3]]
+    assert body["items"][0]["author_names"] == ["Batch Author 2"]
+    assert body["missing"] == [999999]
+    # книги + авторы, независимо от числа id (сверка версий для ETag не в счёт)
+    assert len([s for s in statements if "catalog_versions" not in s]) == 2
+
+    # POST-вариант: закэшированная ids[3] в БД не ходит — книги и авторы
+    # выбираются только для некэшированной ids[1]
+    with count_queries() as statements:
+        resp = client.post("/api/books/batch", json={"ids": [ids[3], ids[1]]})
+    assert [b["book_id"] for b in resp.json()["items"]] == [ids[3], ids[1]]
+    assert len(statements) == 2
+    assert "books.book_id IN (?)" in statements[0]
+    assert "book_authors.book_id IN (?)" in statements[1]
+
+    resp = client.get("/api/books/batch", params={"ids": "1,abc"})
+    assert resp.status_code == 400
+
+
+def test_create_book_resolves_names_in_batch(db_session, count_queries):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.database import SessionLocal
+    from app.schemas.book import BookCreate
+    from app.services import catalog_service
+
+    db_session.add(Author(full_name="Batch Name Existing"))
+    db_session.commit()
+    names = ["Batch Name Existing"] + [f"Batch Name {i}" for i in range(7)]
+    book_in = BookCreate(
+        title="Batch Names",
+        price=10,
+        genre_name="Batch Name Genre",
+        author_names=names,
+    )
+
+    with count_queries() as statements:
+        book = catalog_service.create_book(db_session, book_in)
+    # поиск имён одним IN, одна пакетная вставка и дочитывание id вставленных
+    assert sum(s.startswith("INSERT INTO authors") for s in statements) == 1
+    assert sum(bool(re.search(r"authors\.full_name IN", s)) for s in statements) == 2
+    assert sorted(a.full_name for a in book.authors) == sorted(names)
+
+    # параллельное создание одних и тех же новых имён не падает и не плодит дубли
+    race_names = [f"Race Author {i}" for i in range(3)]
+
+    def create(n):
+        db = SessionLocal()
+        try:
+            book = catalog_service.create_book(
+                db, BookCreate(title=f"Race {n}", price=1, author_names=race_names)
+            )
+            return sorted(a.author_id for a in book.authors)
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(create, range(8)))
+    assert all(r == results[0] for r in results)
+    assert (
+        db_session.query(Author).filter(Author.full_name.in_(race_names)).count()
+        == len(race_names)
+    )
+
+
+def test_columnar_catalog_matches_sql(client: TestClient, db_session, create_user, monkeypatch):
+    pytest.importorskip("numpy")
+    from app.repositories import BookRepository
+    from app.services import catalog_cache, columnar_catalog
+
+    admin = create_user("admincolumnar@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    for i in range(12):
+        client.post(
+            "/api/books/",
+            json={
+                "title": f"Columnar {i % 4}",
+                "price": 100 + (i % 3) * 50,
+                "publication_year": None if i % 5 == 0 else 1990 + i % 4,
+                "genre_name": f"Columnar Genre {i % 2}",
+                "author_names": [f"Columnar Author {i % 3}"],
+            },
+            headers=headers,
+        )
+
+    monkeypatch.setattr(columnar_catalog, "CATALOG_ENGINE", "columnar")
+    columnar_catalog.rebuild(db_session)
+    assert columnar_catalog.enabled()
+
+    repo = BookRepository(db_session)
+    genre_id = db_session.query(Genre.genre_id).filter(Genre.name == "Columnar Genre 1").scalar()
+    author_id = db_session.query(Author.author_id).filter(
+        Author.full_name == "Columnar Author 2"
+    ).scalar()
+    filter_sets = [
+        {},
+        {"genre_id": genre_id},
+        {"author_id": author_id, "min_price": 120},
+        {"min_year": 1991, "max_year": 1992, "max_price": 160},
+    ]
+    order_bys = [None, "price_asc", "price_desc", "year_asc", "year_desc", "title_asc", "title_desc"]
+
+    def walk(page_fn, **params):
+        pages, cursor = [], None
+        while True:
+            ids, cursor = page_fn(cursor, **params)
+            pages.append(ids)
+            if not cursor:
+                return pages
+
+    def sql_page(cursor, **params):
+        books, next_cursor = repo.list_books_page(limit=4, cursor=cursor, **params)
+        return [b.book_id for b in books], next_cursor
+
+    def columnar_page(cursor, **params):
+        return columnar_catalog.catalog.page(limit=4, cursor=cursor, **params)
+
+    for filters in filter_sets:
+        for order_by in order_bys:
+            expected = walk(sql_page, order_by=order_by, **filters)
+            assert walk(columnar_page, order_by=order_by, **filters) == expected, (filters, order_by)
+            books, _ = repo.list_books_page(skip=3, limit=5, order_by=order_by, **filters)
+            ids, _ = columnar_catalog.catalog.page(skip=3, limit=5, order_by=order_by, **filters)
+            assert ids == [b.book_id for b in books]
+
+    # записи каталога патчат снимок, а API отдаёт страницы из него
+    book_id = client.post(
+        "/api/books/",
+        json={"title": "Columnar Cheapest", "price": "0.01", "author_names": []},
+        headers=headers,
+    ).json()["book_id"]
+    catalog_cache.cache.clear()
+    resp = client.get("/api/books/", params={"order_by": "price_asc", "limit": 1})
+    assert [b["book_id"] for b in resp.json()] == [book_id]
+    assert resp.json()[0]["title"] == "Columnar Cheapest"
+    client.delete(f"/api/books/{book_id}", headers=headers)
+    resp = client.get("/api/books/", params={"order_by": "price_asc", "limit": 1})
+    assert [b["book_id"] for b in resp.json()] != [book_id]
+
+
+def test_mmap_catalog_snapshot(client: TestClient, db_session, create_user, monkeypatch, tmp_path):
+    pytest.importorskip("numpy")
+    from app.repositories import BookRepository
+    from app.services import catalog_cache, catalog_snapshot, columnar_catalog
+
+    admin = create_user("adminmmap@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    for i in range(6):
+        client.post(
+            "/api/books/",
+            json={
+                "title": f"Mapped {i % 3}",
+                "price": 200 + i,
+                "publication_year": None if i == 0 else 2000 + i,
+                "genre_name": "Mapped Genre",
+                "author_names": [f"Mapped Author {i % 2}"],
+            },
+            headers=headers,
+        )
+
+    monkeypatch.setattr(catalog_snapshot, "REBUILD_DELAY", 0)
+    monkeypatch.setattr(columnar_catalog, "CATALOG_ENGINE", "mmap")
+    writer = catalog_snapshot.MappedCatalog(str(tmp_path), check_interval=0)
+    monkeypatch.setattr(columnar_catalog, "catalog", writer)
+    columnar_catalog.rebuild(db_session)
+    assert columnar_catalog.enabled()
+
+    # второй "воркер" подключает тот же файл, а не строит свой снимок
+    reader = catalog_snapshot.MappedCatalog(str(tmp_path), check_interval=0)
+    reader.rebuild(db_session)
+    assert reader.snapshot().path == writer.snapshot().path
+
+    repo = BookRepository(db_session)
+    genre_id = db_session.query(Genre.genre_id).filter(Genre.name == "Mapped Genre").scalar()
+    author_id = db_session.query(Author.author_id).filter(
+        Author.full_name == "Mapped Author 1"
+    ).scalar()
+    for filters in ({"genre_id": genre_id}, {"author_id": author_id}):
+        for order_by in (None, "price_desc", "year_asc", "title_asc", "title_desc"):
+            books, cursor = repo.list_books_page(limit=2, order_by=order_by, **filters)
+            ids, mapped_cursor = reader.page(limit=2, order_by=order_by, **filters)
+            assert ids == [b.book_id for b in books]
+            books, _ = repo.list_books_page(limit=2, order_by=order_by, cursor=cursor, **filters)
+            ids, _ = reader.page(limit=2, order_by=order_by, cursor=mapped_cursor, **filters)
+            assert ids == [b.book_id for b in books]
+
+    # карточка книги — готовый JSON из снимка
+    book_id = ids[0]
+    catalog_cache.cache.clear()
+    assert json.loads(reader.book_json(book_id)) == client.get(f"/api/books/{book_id}").json()
+
+    # запись: у записавшего воркера книга сразу читается из БД, снимок
+    # пересобирается в фоне, другой воркер переотображает его по файлу версии
+    client.put(f"/api/books/{book_id}", json={"title": "Mapped Renamed"}, headers=headers)
+    assert client.get(f"/api/books/{book_id}").json()["title"] == "Mapped Renamed"
+    assert writer.sync(timeout=10)
+    assert columnar_catalog.enabled()
+    assert json.loads(reader.book_json(book_id))["title"] == "Mapped Renamed"
+    assert len(os.listdir(tmp_path)) <= 4  # CURRENT, .lock и два последних снимка
+
+    # обложка тоже запись в книгу: читается сразу и попадает в общий снимок
+    resp = client.post(
+        f"/api/admin/books/{book_id}/cover",
+        json={"filename": "mapped.png", "content": base64.b64encode(b"\x89PNG").decode()},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    cover = resp.json()["cover_image"]
+    try:
+        assert client.get(f"/api/books/{book_id}").json()["cover_image"] == cover
+        assert writer.sync(timeout=10)
+        assert json.loads(reader.book_json(book_id))["cover_image"] == cover
+    finally:
+        from app.main import BASE_DIR
+        os.remove(os.path.join(BASE_DIR, cover.lstrip("/")))
+
+
+def test_books_list_from_json_fragments(client: TestClient, db_session, create_user, count_queries):
+    from app.services import book_fragments, catalog_cache
+
+    admin = create_user("adminfragments@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    book_ids = [
+        client.post(
+            "/api/books/",
+            json={
+                "title": f"Fragment {i}",
+                "price": 10 + i,
+                "genre_name": "Fragment Genre",
+                "author_names": ["Fragment Author"],
+            },
+            headers=headers,
+        ).json()["book_id"]
+        for i in range(3)
+    ]
+    genre_id = db_session.query(Genre.genre_id).filter(Genre.name == "Fragment Genre").scalar()
+    params = {"genre_id": genre_id, "order_by": "price_asc"}
+
+    first = client.get("/api/books/", params=params)
+    assert [b["book_id"] for b in first.json()] == book_ids
+    assert first.json() == [client.get(f"/api/books/{i}").json() for i in book_ids]
+    assert first.headers["X-Has-More"] == "false" and first.headers["ETag"]
+
+    # страница вытеснена из кэша, но фрагменты книг остались: ни одной
+    # выборки книг, кроме самой страницы
+    catalog_cache.cache.clear()
+    hits = book_fragments.fragments.hits
+    with count_queries() as statements:
+        again = client.get("/api/books/", params=params)
+    assert again.content == first.content
+    assert book_fragments.fragments.hits - hits == 3
+    assert len([s for s in statements if "FROM books" in s]) == 1
+
+    # запись книги и переименование жанра меняют её фрагменты
+    client.put(f"/api/books/{book_ids[0]}", json={"title": "Fragment Renamed"}, headers=headers)
+    assert client.get("/api/books/", params=params).json()[0]["title"] == "Fragment Renamed"
+    client.put(f"/api/admin/genres/{genre_id}", json={"name": "Fragment Genre 2"}, headers=headers)
+    assert {b["genre_name"] for b in client.get("/api/books/", params=params).json()} == {
+        "Fragment Genre 2"
+    }
+
+
+def test_books_sparse_fields_and_card_view(client: TestClient, db_session, create_user, count_queries):
+    admin = create_user("adminsparse@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    for i in range(3):
+        client.post(
+            "/api/books/",
+            json={
+                "title": f"Sparse {i}",
+                "description": "Длинное описание " * 50,
+                "price": 30 + i,
+                "genre_name": "Sparse Genre",
+                "author_names": [f"Sparse Author {i}"],
+            },
+            headers=headers,
+        )
+    genre_id = db_session.query(Genre.genre_id).filter(Genre.name == "Sparse Genre").scalar()
+    params = {"genre_id": genre_id, "order_by": "title_desc", "limit": 2}
+
+    with count_queries() as statements:
+        resp = client.get("/api/books/", params={**params, "view": "card"})
+    assert resp.status_code == 200
+    cards = resp.json()
+    assert [c["title"] for c in cards] == ["Sparse 2", "Sparse 1"]
+    assert set(cards[0]) == {"book_id", "title", "price", "cover_image", "author_names"}
+    assert cards[0]["author_names"] == ["Sparse Author 2"]
+    book_selects = [s for s in statements if "FROM books" in s]
+    assert book_selects and all("description" not in s for s in book_selects)
+
+    # курсор по названию работает и для компактного вида
+    resp = client.get(
+        "/api/books/",
+        params={**params, "view": "card", "cursor": resp.headers["X-Next-Cursor"]},
+    )
+    assert [c["title"] for c in resp.json()] == ["Sparse 0"]
+
+    resp = client.get("/api/books/", params={**params, "fields": "genre_name, title"})
+    assert resp.json() == [
+        {"title": "Sparse 2", "genre_name": "Sparse Genre"},
+        {"title": "Sparse 1", "genre_name": "Sparse Genre"},
+    ]
+    full = client.get("/api/books/", params=params)
+    assert full.headers["ETag"] != resp.headers["ETag"]
+    assert full.json()[0]["description"].startswith("Длинное описание")
+
+    resp = client.get("/api/books/", params={"fields": "title,password"})
+    assert resp.status_code == 400
+
+
+def test_server_rendered_pages(client: TestClient, create_user, count_queries):
+    admin = create_user("adminssr@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    genre = client.post("/api/admin/genres", json={"name": "SSR жанр"}, headers=headers).json()
+    book = client.post(
+        "/api/books/",
+        json={"title": "SSR <книга>", "price": 10, "genre_id": genre["genre_id"]},
+        headers=headers,
+    ).json()
+
+    html = client.get("/?q=SSR").text
+    assert "SSR &lt;книга&gt;" in html
+    assert f'<option value="{genre["genre_id"]}">SSR жанр</option>' in html
+    raw = re.search(r'<script id="initial-data" type="application/json">(.*?)</script>', html).group(1)
+    assert "<" not in raw
+    data = json.loads(raw)
+    assert [b["book_id"] for b in data["books"]] == [book["book_id"]]
+    assert data["has_more"] is False
+    # авторов сверх первой страницы фронтенд дочитывает по курсору
+    assert "authors_next_cursor" in data
+
+    page = client.get(f"/books/{book['book_id']}")
+    assert page.status_code == 200 and "SSR &lt;книга&gt;" in page.text
+    # фрагменты закэшированы: повторный рендер не ходит в БД
+    with count_queries() as statements:
+        assert client.get(f"/books/{book['book_id']}").text == page.text
+    assert statements == []
+
+    client.put(
+        f"/api/books/{book['book_id']}",
+        json={"title": "SSR обновлена", "price": 10},
+        headers=headers,
+    )
+    assert "SSR обновлена" in client.get(f"/books/{book['book_id']}").text
+    assert "SSR обновлена" in client.get("/?q=SSR").text
+
+    missing = client.get("/books/999999")
+    assert missing.status_code == 404
+    assert '{"book": null}' in missing.text
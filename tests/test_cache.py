@@ -0,0 +1,286 @@
+# tests/test_cache.py
+import threading
+import time
+
+import anyio
+from fastapi.testclient import TestClient
+
+from app.cache import SingleFlight, TTLCache
+from app.database import SessionLocal
+from app.repositories import CatalogVersionRepository
+from app.services import catalog_cache, catalog_service
+from app.services.auth_service import create_access_token
+
+
+def test_ttl_cache_lru_and_expiry():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" становится самым свежим
+    cache.set("c", 3)  # вытесняет "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    cache.set("short", 4, ttl=1)
+    now[0] = 5
+    assert cache.get("short") is None
+    assert cache.get("c") == 3
+    now[0] = 20
+    assert cache.get("c") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 3
+    assert stats["size"] == 0
+
+
+def test_catalog_cache_hits_and_invalidation(
+    client: TestClient, create_user, count_queries
+):
+    admin = create_user("admincache@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+
+    resp = client.post(
+        "/api/books/",
+        json={"title": "Cached Book", "price": 10, "genre_name": "Cached Genre"},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    book_id = resp.json()["book_id"]
+
+    client.get(f"/api/books/{book_id}")
+    client.get("/api/dicts/genres")
+    hits_before = catalog_cache.stats()["hits"]
+
+    # повторные чтения не ходят в БД
+    with count_queries() as statements:
+        assert client.get(f"/api/books/{book_id}").json()["genre_name"] == "Cached Genre"
+        assert any(g["name"] == "Cached Genre" for g in client.get("/api/dicts/genres").json())
+    assert statements == []
+    assert catalog_cache.stats()["hits"] == hits_before + 2
+
+    # переименование жанра сбрасывает и справочник, и книги с этим жанром
+    genre_id = resp.json()["genre_id"]
+    resp = client.put(
+        f"/api/admin/genres/{genre_id}",
+        json={"name": "Renamed Genre"},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    assert client.get(f"/api/books/{book_id}").json()["genre_name"] == "Renamed Genre"
+    assert any(g["name"] == "Renamed Genre" for g in client.get("/api/dicts/genres").json())
+
+    resp = client.get("/api/admin/cache", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["versions"]["genres"] >= 1
+
+
+def test_single_flight_runs_compute_once():
+    flight = SingleFlight()
+    workers = 8
+    calls = []
+    # вычисление стоит на барьере с тестом, пока остальные потоки не встанут в ожидание
+    gate = threading.Barrier(2, timeout=5)
+
+    def compute():
+        calls.append(1)
+        gate.wait()
+        gate.wait()
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    gate.wait()  # лидер внутри compute
+    deadline = time.monotonic() + 5
+    while flight.waiting("key") < workers - 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert flight.waiting("key") == workers - 1
+    assert len(calls) == 1
+    gate.wait()  # отпускаем вычисление
+
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(results) == workers
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_cached_async_coalesces_async_callers():
+    callers = 30
+    calls = []
+    release = threading.Event()
+    params = {"q": "async"}
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    async def main():
+        results, ticks = [], []
+        key = catalog_cache.make_key("genres", params)
+
+        async def call():
+            results.append(await catalog_cache.cached_async("genres", params, compute))
+
+        async def heartbeat():
+            while not release.is_set():
+                ticks.append(1)
+                await anyio.sleep(0.001)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(heartbeat)
+            for _ in range(callers):
+                tg.start_soon(call)
+            with anyio.fail_after(5):
+                while catalog_cache.flights.waiting(key) < callers - 1:
+                    await anyio.sleep(0.001)
+            # ожидание вычисления не блокирует event loop
+            ticks_before = len(ticks)
+            await anyio.sleep(0.02)
+            assert len(ticks) > ticks_before
+            assert len(calls) == 1
+            release.set()
+
+        # попадание отдаётся из кэша без нового вычисления
+        results.append(await catalog_cache.cached_async("genres", params, compute))
+        return results
+
+    results = anyio.run(main)
+    assert len(calls) == 1
+    assert len(results) == callers + 1
+    assert all(result is results[0] for result in results)
+    assert catalog_cache.flights.in_flight() == 0
+
+
+def test_concurrent_identical_list_requests_hit_db_once(
+    client: TestClient, create_user, count_queries
+):
+    admin = create_user("adminflight@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    for i in range(3):
+        resp = client.post(
+            "/api/books/",
+            json={"title": f"Flight Book {i}", "price": 10 + i},
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    workers = 16
+    barrier = threading.Barrier(workers)
+    results = []
+
+    def worker():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            books, _ = catalog_service.list_books_page(
+                db, q="Flight Book", order_by="price_desc"
+            )
+            results.append([b.book_id for b in books])
+        finally:
+            db.close()
+
+    with count_queries() as statements:
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    book_queries = [s for s in statements if "FROM books" in s]
+    assert len(book_queries) == 1
+    assert len(results) == workers
+    assert all(ids == results[0] and len(ids) == 3 for ids in results)
+
+
+def test_conditional_get_with_etag(client: TestClient, create_user, count_queries, monkeypatch):
+    from app.repositories import BookRepository, GenreRepository
+    from app.services import admin_service
+
+    admin = create_user("adminetag@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    resp = client.post(
+        "/api/books/",
+        json={"title": "Etag Book", "price": 10},
+        headers=headers,
+    )
+    book_id = resp.json()["book_id"]
+
+    urls = ("/api/books/?q=Etag", f"/api/books/{book_id}", "/api/dicts/genres")
+    etags = {}
+    for url in urls:
+        resp = client.get(url)
+        assert resp.status_code == 200
+        etags[url] = resp.headers["ETag"]
+        assert resp.headers["Cache-Control"]
+
+    # актуальная версия у клиента — 304 по одним версиям разделов: ни сервисы,
+    # ни репозитории не вызываются, даже если кэш процесса пуст
+    def forbidden(*args, **kwargs):
+        raise AssertionError("304 must not build the response")
+
+    with monkeypatch.context() as patch:
+        for target, name in (
+            (catalog_service, "list_books_page_json"),
+            (catalog_service, "read_book"),
+            (admin_service, "list_genres"),
+            (BookRepository, "__init__"),
+            (GenreRepository, "__init__"),
+        ):
+            patch.setattr(target, name, forbidden)
+        catalog_cache.cache.clear()
+        for url in urls:
+            with count_queries() as statements:
+                resp = client.get(url, headers={"If-None-Match": etags[url]})
+            assert resp.status_code == 304
+            assert resp.content == b""
+            assert resp.headers["ETag"] == etags[url]
+            assert all("catalog_versions" in s for s in statements)
+
+    list_url = urls[0]
+    client.put(f"/api/books/{book_id}", json={"price": 20}, headers=headers)
+    resp = client.get(list_url, headers={"If-None-Match": etags[list_url]})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etags[list_url]
+
+    # запись другого воркера: общая версия в БД поднята, кэш этого процесса не тронут
+    etag = resp.headers["ETag"]
+    db = SessionLocal()
+    try:
+        CatalogVersionRepository(db).bump([catalog_cache.BOOKS])
+    finally:
+        db.close()
+    catalog_cache._next_shared_check = 0  # не ждём интервала сверки
+    assert client.get(list_url, headers={"If-None-Match": etag}).status_code == 200
+
+def test_book_fragments_invalidate_evicts_and_skips_racing_load():
+    from app.services import book_fragments
+
+    book_id = 900001
+
+    def load(ids):
+        return {i: b'{"book_id":%d}' % i for i in ids}
+
+    book_fragments.render([book_id], load)
+    key = book_fragments._key(book_id)
+    assert book_fragments.fragments.peek(key) is not None
+    book_fragments.invalidate([book_id])
+    assert book_fragments.fragments.peek(key) is None
+
+    # книгу переписали, пока она грузилась: прочитанное в кэш не попадает
+    def racing(ids):
+        book_fragments.invalidate(ids)
+        return load(ids)
+
+    assert book_fragments.render([book_id], racing) == b'[{"book_id":900001}]'
+    assert book_fragments.fragments.peek(key) is None
@@ -0,0 +1,118 @@
+# tests/test_compression.py
+import gzip
+import json
+import os
+import re
+
+from fastapi.testclient import TestClient
+
+from app.api.responses import FastJSONResponse
+from app.compression import choose_encoding
+from app.services.auth_service import create_access_token
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "static")
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    assert choose_encoding("") is None
+
+
+def test_fast_json_response_render():
+    body = FastJSONResponse({"title": "Книга", "ids": [1, 2]}).body
+    assert json.loads(body) == {"title": "Книга", "ids": [1, 2]}
+    assert "Книга".encode() in body
+
+
+def test_api_responses_compressed(client: TestClient, create_user):
+    admin = create_user("admingzip@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+    for i in range(20):
+        client.post(
+            "/api/books/",
+            json={"title": f"Gzip {i}", "description": "Описание " * 20, "price": 5},
+            headers=headers,
+        )
+
+    plain = client.get("/api/books/?q=Gzip", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    packed = client.get("/api/books/?q=Gzip", headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in packed.headers["vary"]
+    assert int(packed.headers["content-length"]) < len(plain.content) / 3
+    assert packed.json() == plain.json()
+    assert packed.headers["X-Has-More"] == plain.headers["X-Has-More"]
+
+    # у сжатых байтов свой ETag, и по нему тоже приходит 304
+    assert packed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    again = client.get(
+        "/api/books/?q=Gzip",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": packed.headers["etag"]},
+    )
+    assert again.status_code == 304
+    assert again.headers["etag"] == packed.headers["etag"]
+
+    # короткие ответы не сжимаются
+    small = client.get("/api/books/?q=NoSuchBookAtAll", headers={"Accept-Encoding": "gzip"})
+    assert small.json() == [] and "content-encoding" not in small.headers
+
+
+def test_static_precompressed(client: TestClient):
+    resp = client.get("/static/js/app.js", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "javascript" in resp.headers["content-type"]
+    with open(os.path.join(STATIC_DIR, "js", "app.js"), "rb") as f:
+        assert resp.content == f.read()
+    with open(os.path.join(STATIC_DIR, "js", "app.js.gz"), "rb") as f:
+        packed = f.read()
+    assert int(resp.headers["content-length"]) == len(packed)
+    assert gzip.decompress(packed) == resp.content
+
+    again = client.get(
+        "/static/js/app.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["etag"]},
+    )
+    assert again.status_code == 304
+
+
+def test_fingerprinted_assets(client: TestClient):
+    from app import assets
+
+    html = client.get("/").text
+    match = re.search(r'src="(/assets/js/app\.([0-9a-f]{10})\.js)"', html)
+    assert match and re.search(r'href="/assets/css/styles\.[0-9a-f]{10}\.css"', html)
+    url, digest = match.groups()
+    assert digest == assets.fingerprint(os.path.join(STATIC_DIR, "js", "app.js"))
+
+    resp = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert resp.headers["content-encoding"] == "gzip"
+    with open(os.path.join(STATIC_DIR, "js", "app.js"), "rb") as f:
+        assert resp.content == f.read()
+
+    assert assets.asset_url("no/such.file") == "/static/no/such.file"
+
+
+def test_assets_build_only_bundled(tmp_path):
+    from app import assets
+
+    source = tmp_path / "static"
+    for name, data in (
+        ("css/site.css", b"body { color: red; }" * 10),
+        ("favicon.ico.png", b"\x89PNG"),
+        ("covers/upload.jpg", b"\xff\xd8"),
+    ):
+        (source / name).parent.mkdir(parents=True, exist_ok=True)
+        (source / name).write_bytes(data)
+
+    manifest = assets.build(str(source), str(tmp_path / "assets"))
+    assert set(manifest) == {"css/site.css", "favicon.ico.png"}
+    built = {path.name for path in (tmp_path / "assets").rglob("*")}
+    assert manifest["css/site.css"].split("/")[-1] + ".gz" in built
+    assert manifest["favicon.ico.png"] + ".gz" not in built
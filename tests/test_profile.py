@@ -101,3 +101,37 @@ def test_address_crud_and_default(client: TestClient, create_user):
     remaining = client.get("/api/users/me/addresses", headers=headers).json()
     assert remaining
     assert remaining[0]["is_default"] is True
+
+
+def test_principal_cache_and_invalidation(client: TestClient, create_user, count_queries):
+    create_user("principal@example.com", "Oldpass1!")
+    create_user("principaladmin@example.com", "Oldpass1!", is_admin=True)
+    headers = {"Authorization": f"Bearer {login(client, 'principal@example.com', 'Oldpass1!')}"}
+    admin_headers = {
+        "Authorization": f"Bearer {login(client, 'principaladmin@example.com', 'Oldpass1!')}"
+    }
+
+    me = client.get("/api/auth/me", headers=headers).json()
+    with count_queries() as statements:
+        assert client.get("/api/auth/me", headers=headers).json() == me
+    assert not any("FROM users" in s for s in statements)
+
+    # права меняются сразу, без ожидания TTL
+    assert client.get("/api/admin/users", headers=headers).status_code == 403
+    resp = client.patch(
+        f"/api/admin/users/{me['user_id']}", json={"is_admin": True}, headers=admin_headers
+    )
+    assert resp.status_code == 200
+    assert client.get("/api/admin/users", headers=headers).status_code == 200
+    client.patch(f"/api/admin/users/{me['user_id']}", json={"is_admin": False}, headers=admin_headers)
+    # снятие прав закрывает сессии пользователя
+    assert client.get("/api/admin/users", headers=headers).status_code == 401
+    headers = {"Authorization": f"Bearer {login(client, 'principal@example.com', 'Oldpass1!')}"}
+    assert client.get("/api/admin/users", headers=headers).status_code == 403
+
+    client.put(
+        "/api/users/me",
+        headers=headers,
+        json={"full_name": "Cached User", "email": "principal@example.com", "phone": None},
+    )
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Cached User"
@@ -0,0 +1,69 @@
+# tests/test_search.py
+from fastapi.testclient import TestClient
+
+from app.services.auth_service import create_access_token
+from app.services.suggest_service import PrefixIndex
+
+
+def test_prefix_index_words_updates_and_bulk_merge():
+    index = PrefixIndex()
+    index.build([(1, "Война и мир"), (2, "Мир Полудня"), (3, "Мастер и Маргарита")])
+
+    # по началу строки и по началу слова, без учёта регистра, без дублей
+    assert [ref for ref, _ in index.search("МИР")] == [1, 2]
+    assert [ref for ref, _ in index.search("ма", limit=1)] == [3]
+    assert index.search("и") == []  # короткие слова не индексируются, строк на "и" нет
+
+    index.update([(2, "Полдень, XXII век")], removed=[1])
+    assert index.search("мир") == []
+    assert index.search("полд") == [(2, "Полдень, XXII век")]
+
+    # крупная пачка идёт через слияние, результат тот же
+    index.update([(ref, f"Book {ref}") for ref in range(10, 210)], removed=[3])
+    assert index.search("маргарита") == []
+    assert len(index.search("book", limit=500)) == 200
+    stats = index.stats()
+    assert stats["entities"] == 201
+    assert stats["bytes_per_entry"] > 0
+
+
+def test_suggest_endpoint_follows_catalog_writes(client: TestClient, create_user):
+    admin = create_user("adminsuggest@example.com", "adminpass", is_admin=True)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email})}"}
+
+    resp = client.post(
+        "/api/books/",
+        json={
+            "title": "Suggestible Spring",
+            "price": 10,
+            "genre_name": "Suggestive Poetry",
+            "author_names": ["Sugden Alice"],
+        },
+        headers=headers,
+    )
+    book_id = resp.json()["book_id"]
+
+    resp = client.get("/api/search/suggest", params={"q": "sug"})
+    assert resp.status_code == 200
+    assert {(s["kind"], s["label"]) for s in resp.json()} == {
+        ("book", "Suggestible Spring"),
+        ("genre", "Suggestive Poetry"),
+        ("author", "Sugden Alice"),
+    }
+    # по началу слова внутри названия
+    assert [s["id"] for s in client.get("/api/search/suggest", params={"q": "spri"}).json()] == [
+        book_id
+    ]
+
+    client.put(f"/api/books/{book_id}", json={"title": "Renamed Spring"}, headers=headers)
+    labels = [s["label"] for s in client.get("/api/search/suggest", params={"q": "sug"}).json()]
+    assert "Suggestible Spring" not in labels
+    assert {"kind": "book", "id": book_id, "label": "Renamed Spring"} in client.get(
+        "/api/search/suggest", params={"q": "renamed"}
+    ).json()
+
+    client.delete(f"/api/books/{book_id}", headers=headers)
+    assert client.get("/api/search/suggest", params={"q": "renamed sp"}).json() == []
+
+    stats = client.get("/api/admin/suggest", headers=headers).json()
+    assert stats["entries"] >= stats["entities"] > 0